@@ -0,0 +1,81 @@
+"""
+Compares two benchmark suite results and flags regressions.
+
+A benchmark regresses when its median time grows by more than `--threshold`
+(relative) and by more than `--min-delta-ms` (absolute, to ignore jitter on
+very fast benchmarks). Exits with status 1 if any benchmark regressed, so it
+can gate CI.
+
+Usage (from backend/):
+    python -m benchmarks.compare benchmarks/results/main.json benchmarks/results/branch.json --threshold 0.10
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float,
+    min_delta_ms: float,
+    metric: str = "median_ms"
+) -> List[Dict[str, Any]]:
+    rows = []
+    for name in sorted(set(baseline["results"]) | set(current["results"])):
+        before = baseline["results"].get(name, {}).get(metric)
+        after = current["results"].get(name, {}).get(metric)
+        row = {"name": name, "before_ms": before, "after_ms": after, "change": None, "status": "ok"}
+        if before is None or after is None:
+            row["status"] = "added" if before is None else "removed"
+        else:
+            row["change"] = (after - before) / before if before else 0.0
+            if row["change"] > threshold and after - before > min_delta_ms:
+                row["status"] = "REGRESSION"
+            elif row["change"] < -threshold and before - after > min_delta_ms:
+                row["status"] = "improved"
+        rows.append(row)
+    return rows
+
+
+def _params_differ(baseline: Dict[str, Any], current: Dict[str, Any]) -> bool:
+    # The repeat count changes precision, not what is measured
+    def dataset(report: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in report["meta"].get("params", {}).items() if k != "repeat"}
+    return dataset(baseline) != dataset(current)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown counted as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0)
+    parser.add_argument("--metric", default="median_ms", choices=["median_ms", "min_ms", "mean_ms"])
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    if _params_differ(baseline, current):
+        print("Warning: runs used different parameters; timings may not be comparable.", file=sys.stderr)
+
+    rows = compare(baseline, current, args.threshold, args.min_delta_ms, args.metric)
+    print(f"{'benchmark':<40} {'before':>10} {'after':>10} {'change':>8}  status")
+    for row in rows:
+        before = f"{row['before_ms']:.1f}" if row["before_ms"] is not None else "-"
+        after = f"{row['after_ms']:.1f}" if row["after_ms"] is not None else "-"
+        change = f"{row['change']:+.1%}" if row["change"] is not None else "-"
+        print(f"{row['name']:<40} {before:>10} {after:>10} {change:>8}  {row['status']}")
+
+    regressions = [row["name"] for row in rows if row["status"] == "REGRESSION"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
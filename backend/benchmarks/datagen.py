@@ -0,0 +1,111 @@
+"""
+Synthetic dataset generator for the benchmarks.
+
+Builds a DataFrame with a configurable number of rows and columns, dtype mix,
+categorical cardinality and null rate, and writes it as CSV or XLSX. The same
+arguments and seed always produce the same bytes, so runs are comparable.
+
+Usage (from backend/):
+    python -m benchmarks.datagen --rows 100000 --columns 12 --mix float=4,int=2,category=3,text=1,date=1,bool=1 \\
+        --cardinality 50 --null-rate 0.02 --output /tmp/bench.csv
+"""
+import argparse
+import io
+import os
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+DTYPES = ("float", "int", "category", "text", "date", "bool")
+DEFAULT_MIX = "float=4,int=2,category=3,text=1,date=1,bool=1"
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DTYPES:
+            raise ValueError(f"Unknown dtype in mix: {name} (choose from {', '.join(DTYPES)})")
+        weights[name] = int(weight or 1)
+    return weights
+
+
+def _column(kind: str, rows: int, cardinality: int, rng: np.random.Generator, index: int) -> pd.Series:
+    if kind == "float":
+        # Heavy-tailed so the anomaly detectors have something to find
+        return pd.Series((rng.standard_t(4, rows) * 25 + 100 * (index + 1)).round(2))
+    if kind == "int":
+        return pd.Series(rng.integers(0, 1000, rows))
+    if kind == "category":
+        labels = np.array([f"cat_{index}_{i}" for i in range(cardinality)])
+        # Zipf-like skew: a few frequent labels and a long tail
+        weights = 1.0 / np.arange(1, cardinality + 1)
+        return pd.Series(rng.choice(labels, rows, p=weights / weights.sum()))
+    if kind == "text":
+        words = np.array(["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel"])
+        ids = rng.integers(0, max(cardinality * 100, 1), rows)
+        return pd.Series(np.char.add(np.char.add(rng.choice(words, rows), " "), ids.astype(str)))
+    if kind == "date":
+        start = np.datetime64("2023-01-01T00:00")
+        return pd.Series(start + np.sort(rng.integers(0, 2 * 365 * 24 * 60, rows)).astype("timedelta64[m]"))
+    return pd.Series(rng.random(rows) < 0.5)
+
+
+def generate(
+    rows: int,
+    columns: int = 12,
+    mix: str = DEFAULT_MIX,
+    cardinality: int = 50,
+    null_rate: float = 0.0,
+    seed: int = 0
+) -> pd.DataFrame:
+    """
+    `columns` are distributed over the dtypes in proportion to the `mix`
+    weights; `null_rate` of the cells in every column are left empty.
+    """
+    rng = np.random.default_rng(seed)
+    weights = parse_mix(mix)
+    kinds = [kind for kind, weight in weights.items() for _ in range(weight)]
+    data = {}
+    for i in range(columns):
+        kind = kinds[i % len(kinds)]
+        series = _column(kind, rows, cardinality, rng, i)
+        if null_rate > 0:
+            series = series.where(rng.random(rows) >= null_rate)
+        data[f"{kind}_{i}"] = series
+    return pd.DataFrame(data)
+
+
+def to_bytes(df: pd.DataFrame, fmt: str) -> bytes:
+    """Serializes the frame the way a user upload would arrive (CSV or XLSX)."""
+    if fmt == "csv":
+        return df.to_csv(index=False).encode()
+    if fmt == "xlsx":
+        buffer = io.BytesIO()
+        df.to_excel(buffer, index=False, engine="openpyxl")
+        return buffer.getvalue()
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Relative weights per dtype")
+    parser.add_argument("--cardinality", type=int, default=50, help="Distinct labels per category column")
+    parser.add_argument("--null-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="Path ending in .csv or .xlsx")
+    args = parser.parse_args()
+
+    df = generate(args.rows, args.columns, args.mix, args.cardinality, args.null_rate, args.seed)
+    fmt = os.path.splitext(args.output)[1].lstrip(".").lower()
+    with open(args.output, "wb") as f:
+        f.write(to_bytes(df, fmt))
+    print(f"Wrote {len(df)} rows x {df.shape[1]} columns to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: Excel ingest through ExcelReader vs the original pd.read_excel path.
+
+Writes a multi-sheet .xlsx workbook, then times:
+  - legacy: pd.read_excel on in-memory bytes, default engine (first sheet only)
+  - reader, first sheet: ExcelReader from the spooled file path
+  - legacy, all sheets: pd.read_excel(sheet_name=None) + concat
+  - reader, all sheets: sheets parsed in parallel worker processes
+  - sheet listing from workbook metadata
+
+Usage (from backend/):
+    python -m benchmarks.excel_ingest --rows 100000 --sheets 4
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.excel_reader import ExcelReader, ALL_SHEETS, HAS_CALAMINE  # noqa: E402
+
+
+def make_workbook(path: str, rows: int, sheets: int) -> None:
+    import openpyxl
+    rng = np.random.default_rng(0)
+    book = openpyxl.Workbook(write_only=True)
+    for s in range(sheets):
+        sheet = book.create_sheet(f"Month {s + 1}")
+        sheet.append(["order_id", "revenue", "quantity", "category", "date"])
+        revenue = rng.gamma(2.0, 50.0, rows).round(2)
+        quantity = rng.integers(1, 20, rows)
+        category = rng.choice(["A", "B", "C", "D"], rows)
+        for i in range(rows):
+            sheet.append([i, float(revenue[i]), int(quantity[i]), str(category[i]), f"2024-{s % 12 + 1:02d}-{i % 28 + 1:02d}"])
+    book.save(path)
+
+
+def timed(func, repeat: int) -> tuple:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 1), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000, help="Rows per sheet")
+    parser.add_argument("--sheets", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        make_workbook(path, args.rows, args.sheets)
+        with open(path, "rb") as f:
+            payload = f.read()
+
+        legacy_ms, legacy = timed(lambda: pd.read_excel(io.BytesIO(payload)), args.repeat)
+        first_ms, first = timed(lambda: ExcelReader.read(path, "bench.xlsx"), args.repeat)
+        legacy_all_ms, _ = timed(
+            lambda: pd.concat(pd.read_excel(io.BytesIO(payload), sheet_name=None).values(), ignore_index=True),
+            args.repeat
+        )
+        ExcelReader.read(path, "bench.xlsx", ALL_SHEETS)  # Warm the worker processes
+        all_ms, combined = timed(lambda: ExcelReader.read(path, "bench.xlsx", ALL_SHEETS), args.repeat)
+        list_ms, sheets = timed(lambda: ExcelReader.list_sheets(path, "bench.xlsx"), args.repeat)
+
+        result = {
+            "workbook_mb": round(len(payload) / (1024 * 1024), 2),
+            "sheets": args.sheets,
+            "rows_per_sheet": args.rows,
+            "engine": ExcelReader.engine("bench.xlsx"),
+            "calamine_installed": HAS_CALAMINE,
+            "legacy_first_sheet_ms": legacy_ms,
+            "reader_first_sheet_ms": first_ms,
+            "legacy_all_sheets_ms": legacy_all_ms,
+            "reader_all_sheets_ms": all_ms,
+            "list_sheets_ms": list_ms,
+            "first_sheet_matches": bool(legacy.equals(first)),
+            "all_sheets_rows": len(combined),
+            "listed": sheets,
+        }
+        print(json.dumps(result, indent=2))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(result, f, indent=2)
+    finally:
+        ExcelReader.shutdown()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
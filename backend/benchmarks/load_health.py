@@ -0,0 +1,131 @@
+"""
+Load test: /health latency while large uploads are in flight.
+
+Starts the API under uvicorn, measures /health latency on an idle server,
+then again while several concurrent clients upload a large CSV in a loop.
+With parsing and profiling off the event loop the two p99s should stay
+close.
+
+Usage (from backend/):
+    python -m benchmarks.load_health --rows 500000 --uploaders 4 --seconds 20
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_csv(rows: int) -> bytes:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "order_id": np.arange(rows),
+        "revenue": rng.gamma(2.0, 50.0, rows).round(2),
+        "quantity": rng.integers(1, 20, rows),
+        "category": rng.choice(["A", "B", "C", "D"], rows),
+        "date": pd.date_range("2024-01-01", periods=rows, freq="min").astype(str),
+    })
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue().encode()
+
+
+def percentile(samples: list, q: float) -> float:
+    return float(np.percentile(samples, q)) if samples else float("nan")
+
+
+def probe_health(base_url: str, seconds: float) -> list:
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            client.get("/health")
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+    return latencies
+
+
+def upload_loop(base_url: str, payload: bytes, stop: threading.Event, results: list) -> None:
+    with httpx.Client(base_url=base_url, timeout=300) as client:
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = client.post("/api/upload", files={"file": ("load.csv", payload, "text/csv")})
+            results.append({"status": response.status_code, "ms": (time.perf_counter() - start) * 1000})
+
+
+def wait_until_ready(base_url: str, timeout: float = 30) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--uploaders", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        # The uploaders share one address; measure event-loop latency, not the rate limiter
+        env=dict(os.environ, RATE_LIMIT_ENABLED="false"),
+    )
+    try:
+        wait_until_ready(base_url)
+        payload = make_csv(args.rows)
+
+        idle = probe_health(base_url, args.seconds / 3)
+
+        stop = threading.Event()
+        uploads: list = []
+        workers = [
+            threading.Thread(target=upload_loop, args=(base_url, payload, stop, uploads))
+            for _ in range(args.uploaders)
+        ]
+        for worker in workers:
+            worker.start()
+        loaded = probe_health(base_url, args.seconds)
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+        result = {
+            "payload_mb": round(len(payload) / (1024 * 1024), 2),
+            "uploaders": args.uploaders,
+            "uploads_completed": len(uploads),
+            "upload_statuses": sorted({u["status"] for u in uploads}),
+            "health_idle_ms": {"p50": percentile(idle, 50), "p99": percentile(idle, 99), "n": len(idle)},
+            "health_loaded_ms": {"p50": percentile(loaded, 50), "p99": percentile(loaded, 99), "n": len(loaded)},
+        }
+        print(json.dumps(result, indent=2))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(result, f, indent=2)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Load test: per-client rate limits hold across gunicorn workers.
+
+Starts the API under gunicorn with several uvicorn workers (rate limit state
+shared through the memory-mapped bucket file), then for `--seconds`:
+  - `--abusers` clients each hammer POST /api/chat from several threads
+  - one polite client sends a request every few seconds, below its limit
+Clients are told apart by X-Forwarded-For (the server trusts one proxy).
+Chat requests carry an empty query, so admitted ones stop at validation (422)
+and the run measures the limiter rather than the model.
+
+Each abuser may be admitted at most burst + rate * seconds times in total,
+no matter which worker served it; the polite client should never see a 429.
+
+Usage (from backend/):
+    python -m benchmarks.load_rate_limit --workers 4 --abusers 3 --seconds 20
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+import httpx
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.load_health import wait_until_ready  # noqa: E402
+from config.security import RATE_LIMIT_CHAT  # noqa: E402
+
+
+def hammer(base_url: str, address: str, stop: threading.Event, results: List[Dict[str, Any]]) -> None:
+    headers = {"X-Forwarded-For": address}
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = client.post("/api/chat", json={"query": ""}, headers=headers)
+            results.append({
+                "status": response.status_code,
+                "ms": (time.perf_counter() - start) * 1000,
+                "retry_after": response.headers.get("retry-after"),
+            })
+
+
+def polite(base_url: str, interval: float, stop: threading.Event, results: List[Dict[str, Any]]) -> None:
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        while not stop.wait(interval):
+            response = client.post("/api/chat", json={"query": ""}, headers={"X-Forwarded-For": "10.0.0.250"})
+            results.append({"status": response.status_code})
+
+
+def summarize(samples: List[Dict[str, Any]], seconds: float) -> Dict[str, Any]:
+    admitted = sum(1 for s in samples if s["status"] != 429)
+    limited = [s for s in samples if s["status"] == 429]
+    latencies = [s["ms"] for s in samples]
+    return {
+        "requests": len(samples),
+        "admitted": admitted,
+        "limited": len(limited),
+        "max_allowed": int(RATE_LIMIT_CHAT + RATE_LIMIT_CHAT / 60 * seconds),
+        "retry_after_present": all(s["retry_after"] for s in limited),
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 2) if latencies else None,
+            "p99": round(float(np.percentile(latencies, 99)), 2) if latencies else None,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--abusers", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent connections per abusive client")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    state_dir = tempfile.mkdtemp(prefix="deanalyse_ratelimit_")
+    env = dict(
+        os.environ,
+        RATE_LIMIT_ENABLED="true",
+        RATE_LIMIT_TRUSTED_PROXIES="1",
+        RATE_LIMIT_STATE_FILE=os.path.join(state_dir, "ratelimit.bin"),
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "main:app",
+            "--worker-class", "uvicorn.workers.UvicornWorker",
+            "--workers", str(args.workers),
+            "--bind", f"127.0.0.1:{args.port}",
+            "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        wait_until_ready(base_url, timeout=60)
+
+        stop = threading.Event()
+        abusers: Dict[str, List[Dict[str, Any]]] = {f"10.0.0.{i + 1}": [] for i in range(args.abusers)}
+        polite_results: List[Dict[str, Any]] = []
+        # Polite client: half its per-minute rate
+        threads = [threading.Thread(target=polite, args=(base_url, 120 / RATE_LIMIT_CHAT, stop, polite_results))]
+        for address, samples in abusers.items():
+            threads += [
+                threading.Thread(target=hammer, args=(base_url, address, stop, samples))
+                for _ in range(args.threads)
+            ]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        clients = {address: summarize(samples, args.seconds) for address, samples in abusers.items()}
+        result = {
+            "workers": args.workers,
+            "seconds": args.seconds,
+            "limit_per_minute": RATE_LIMIT_CHAT,
+            "abusers": clients,
+            "limits_held": all(c["admitted"] <= c["max_allowed"] for c in clients.values()),
+            "polite": {
+                "requests": len(polite_results),
+                "limited": sum(1 for r in polite_results if r["status"] == 429),
+            },
+        }
+        print(json.dumps(result, indent=2))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(result, f, indent=2)
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: response encoding of summaries and row pages.
+
+Times the previous path (object-dtype conversion, jsonable_encoder, stdlib
+json) against `services.serialization.dumps` on native pandas/NumPy values,
+and reports the body size uncompressed, gzipped and (when installed) brotli.
+
+Usage (from backend/):
+    python -m benchmarks.serialization --columns 200 --rows 1000
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from config.performance import GZIP_LEVEL, BROTLI_QUALITY  # noqa: E402
+from services.serialization import dumps, orjson  # noqa: E402
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def make_frame(rows: int, columns: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    data = {}
+    for i in range(columns):
+        kind = i % 4
+        if kind == 0:
+            values = rng.normal(size=rows)
+            values[rng.random(rows) < 0.05] = np.nan
+        elif kind == 1:
+            values = rng.integers(0, 1_000_000, rows)
+        elif kind == 2:
+            values = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 10**6, rows), unit="s")
+        else:
+            values = rng.choice(["north", "south", "east", "west", None], rows)
+        data[f"col_{i}"] = values
+    return pd.DataFrame(data)
+
+
+def legacy(frame: pd.DataFrame) -> bytes:
+    records = frame.astype(object).where(pd.notnull(frame), None).to_dict(orient="records")
+    return json.dumps(jsonable_encoder({"preview": records})).encode()
+
+
+def fast(frame: pd.DataFrame) -> bytes:
+    return dumps({"preview": frame.to_dict(orient="records")})
+
+
+def timed(func, repeat: int) -> tuple:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 2), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--columns", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    args = parser.parse_args()
+
+    frame = make_frame(args.rows, args.columns)
+    legacy_ms, legacy_body = timed(lambda: legacy(frame), args.repeat)
+    fast_ms, body = timed(lambda: fast(frame), args.repeat)
+    gzip_ms, gzipped = timed(lambda: gzip.compress(body, GZIP_LEVEL), args.repeat)
+
+    result = {
+        "rows": args.rows,
+        "columns": args.columns,
+        "encoder": "orjson" if orjson is not None else "json",
+        "legacy_ms": legacy_ms,
+        "fast_ms": fast_ms,
+        "speedup": round(legacy_ms / fast_ms, 2) if fast_ms else None,
+        "matches": json.loads(legacy_body) == json.loads(body),
+        "bytes": len(body),
+        "gzip_bytes": len(gzipped),
+        "gzip_ms": gzip_ms,
+    }
+    if brotli is not None:
+        result["brotli_ms"], compressed = timed(lambda: brotli.compress(body, quality=BROTLI_QUALITY), args.repeat)
+        result["brotli_bytes"] = len(compressed)
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: DuckDB SQL analysis vs generated pandas code for the same questions.
+
+Persists a synthetic orders table and a customers table as Arrow files (as
+the dataset cache does), then times each question answered by
+  - pandas: load the Arrow files, then the pandas code the model would write
+  - sql: one SELECT over the memory-mapped Arrow files
+and checks that both engines return the same numbers.
+
+Usage (from backend/):
+    python -m benchmarks.sql_engine --rows 2000000 --repeat 3
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.sql_engine import SQLEngine  # noqa: E402
+
+
+# Each question as the pandas code the model would write and the equivalent SQL;
+# both return a `revenue` series so the results can be compared
+def revenue_by_category(orders: pd.DataFrame, customers: pd.DataFrame) -> pd.Series:
+    return orders.groupby("category")["revenue"].sum()
+
+
+def monthly_revenue(orders: pd.DataFrame, customers: pd.DataFrame) -> pd.Series:
+    return orders.set_index("date").resample("ME")["revenue"].sum()
+
+
+def top_customer_by_region(orders: pd.DataFrame, customers: pd.DataFrame) -> pd.Series:
+    totals = orders.groupby("customer_id", as_index=False)["revenue"].sum().merge(customers, on="customer_id")
+    return totals.groupby("region")["revenue"].max()
+
+
+QUESTIONS = {
+    "revenue_by_category": (
+        revenue_by_category,
+        "SELECT category, sum(revenue) AS revenue FROM orders GROUP BY 1 ORDER BY 1",
+    ),
+    "monthly_revenue": (
+        monthly_revenue,
+        "SELECT date_trunc('month', date) AS month, sum(revenue) AS revenue FROM orders GROUP BY 1 ORDER BY 1",
+    ),
+    "top_customer_by_region": (
+        top_customer_by_region,
+        "SELECT region, max(revenue) AS revenue FROM "
+        "(SELECT customer_id, sum(revenue) AS revenue FROM orders GROUP BY 1) t "
+        "JOIN customers USING (customer_id) GROUP BY 1 ORDER BY 1",
+    ),
+}
+
+
+def make_tables(rows: int) -> tuple:
+    rng = np.random.default_rng(0)
+    customers = pd.DataFrame({
+        "customer_id": np.arange(10_000),
+        "region": rng.choice(["North", "South", "East", "West"], 10_000),
+    })
+    orders = pd.DataFrame({
+        "order_id": np.arange(rows),
+        "customer_id": rng.integers(0, 10_000, rows),
+        "revenue": rng.gamma(2.0, 50.0, rows).round(2),
+        "category": rng.choice(["A", "B", "C", "D", "E"], rows),
+        "date": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 730 * 24 * 60, rows), unit="min"),
+    })
+    return orders, customers
+
+
+def write_arrow(df: pd.DataFrame, path: str) -> None:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def timed(func, repeat: int) -> tuple:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 1), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    args = parser.parse_args()
+
+    orders, customers = make_tables(args.rows)
+    work_dir = tempfile.mkdtemp(prefix="deanalyse_sql_bench_")
+    paths = {"orders": os.path.join(work_dir, "orders.arrow"), "customers": os.path.join(work_dir, "customers.arrow")}
+    write_arrow(orders, paths["orders"])
+    write_arrow(customers, paths["customers"])
+    engine = SQLEngine(spill_dir=os.path.join(work_dir, "spill"))
+
+    result = {"rows": args.rows, "sql_threads": engine.threads, "questions": {}}
+    try:
+        for name, (pandas_func, sql) in QUESTIONS.items():
+            # pandas needs the table loaded first; SQL reads the Arrow files in place
+            pandas_ms, expected = timed(
+                lambda: pandas_func(pd.read_feather(paths["orders"]), pd.read_feather(paths["customers"])),
+                args.repeat
+            )
+            sql_ms, (frame, _) = timed(lambda: engine.query(sql, paths), args.repeat)
+            result["questions"][name] = {
+                "pandas_ms": pandas_ms,
+                "sql_ms": sql_ms,
+                "speedup": round(pandas_ms / sql_ms, 2) if sql_ms else None,
+                "matches": bool(np.allclose(expected.to_numpy(), frame["revenue"].to_numpy())),
+            }
+    finally:
+        engine.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Offline stand-in for the OpenAI API used by the end-to-end benchmarks.
+
+`StubOpenAI` exposes `chat.completions.create` like AsyncOpenAI (install it
+with `llm_gateway.set_client`) and answers by prompt type: planning prompts
+get analysis code, KPI prompts a JSON list and everything else a short answer
+(streamed token by token when stream=True). `latency_ms` adds a fixed delay
+per call so runs can model a slow upstream, or stay at zero to measure only
+the server's own overhead.
+
+Run as a module it serves the same replies as a local OpenAI-compatible HTTP
+server, so the real client path (connection pool, timeouts, retries) can be
+exercised; `--error-rate` answers that share of requests with 429/503.
+
+Usage (from backend/):
+    python -m benchmarks.stub_llm --port 8001 --latency-ms 300 --error-rate 0.2
+    LLM_BASE_URL=http://127.0.0.1:8001/v1 uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import types
+from typing import Any, Dict, List
+
+PLAN_REPLY = """```python
+def analyze_data(df):
+    numeric = df.select_dtypes('number')
+    return {"rows": len(df), "totals": numeric.sum().round(2).to_dict()}
+```"""
+KPI_REPLY = json.dumps([
+    {"title": "Total Revenue", "value_type": "currency", "reason": "Tracks overall sales"},
+    {"title": "Average Order Value", "value_type": "currency", "reason": "Revenue per order"},
+    {"title": "Orders", "value_type": "count", "reason": "Volume of activity"},
+])
+ANSWER_REPLY = "Revenue grew steadily over the period, led by the top three categories."
+
+
+def _usage_dict(prompt: str, completion: str) -> Dict[str, int]:
+    # Rough token counts (4 characters per token) so usage metrics are populated
+    prompt_tokens, completion_tokens = len(prompt) // 4, len(completion) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _usage(prompt: str, completion: str) -> Any:
+    return types.SimpleNamespace(**_usage_dict(prompt, completion))
+
+
+class _Completions:
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    @staticmethod
+    def _reply(messages: List[Dict[str, str]]) -> str:
+        prompt = messages[-1]["content"]
+        if "Determine if you need to run Python code" in prompt:
+            return PLAN_REPLY
+        if "key performance indicators" in prompt:
+            return KPI_REPLY
+        return ANSWER_REPLY
+
+    async def create(self, messages: List[Dict[str, str]], stream: bool = False, **kwargs: Any) -> Any:
+        self.calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        reply = self._reply(messages)
+        prompt = "".join(m["content"] for m in messages)
+        if not stream:
+            message = types.SimpleNamespace(content=reply)
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=_usage(prompt, reply))
+
+        async def chunks():
+            for word in reply.split(" "):
+                delta = types.SimpleNamespace(content=word + " ")
+                yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)], usage=None)
+            yield types.SimpleNamespace(choices=[], usage=_usage(prompt, reply))
+        return chunks()
+
+
+class StubOpenAI:
+    def __init__(self, latency_ms: float = 0.0):
+        self.chat = types.SimpleNamespace(completions=_Completions(latency_ms))
+
+
+def create_app(latency_ms: float = 0.0, error_rate: float = 0.0) -> Any:
+    """ASGI app serving POST /v1/chat/completions (JSON or SSE) with the stub replies."""
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, StreamingResponse
+    from starlette.routing import Route
+
+    async def completions(request: Any) -> Any:
+        body = await request.json()
+        if error_rate and random.random() < error_rate:
+            status = random.choice((429, 503))
+            return JSONResponse(
+                {"error": {"message": "Injected failure", "type": "stub_error"}},
+                status_code=status,
+                headers={"Retry-After": "0.05"} if status == 429 else None
+            )
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        messages = body["messages"]
+        reply = _Completions._reply(messages)
+        usage = _usage_dict("".join(m["content"] for m in messages), reply)
+        base = {"id": "chatcmpl-stub", "created": int(time.time()), "model": body.get("model", "stub")}
+        if not body.get("stream"):
+            return JSONResponse(dict(
+                base,
+                object="chat.completion",
+                choices=[{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                usage=usage
+            ))
+
+        async def events():
+            for word in reply.split(" "):
+                delta = {"index": 0, "delta": {"content": word + " "}, "finish_reason": None}
+                yield f"data: {json.dumps(dict(base, object='chat.completion.chunk', choices=[delta]))}\n\n"
+            yield f"data: {json.dumps(dict(base, object='chat.completion.chunk', choices=[], usage=usage))}\n\n"
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/v1/chat/completions", completions, methods=["POST"])])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 429/503")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(args.latency_ms, args.error_rate), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Benchmark suite: DataService micro-benchmarks plus end-to-end upload, job and
+chat requests through the ASGI app with a stubbed OpenAI client.
+
+Each benchmark runs once to warm up, then `--repeat` times; the JSON result
+records min/median/mean milliseconds per benchmark along with the dataset
+parameters, library versions and git commit, so two runs can be compared with
+`python -m benchmarks.compare`.
+
+Usage (from backend/):
+    python -m benchmarks.suite --rows 200000 --repeat 5 --output benchmarks/results/main.json
+    python -m benchmarks.suite --only upload,chat --llm-latency-ms 300
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# Every e2e request comes from one client; per-client rate limits would throttle the runs
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from benchmarks.datagen import generate, to_bytes, DEFAULT_MIX  # noqa: E402
+from benchmarks.stub_llm import StubOpenAI  # noqa: E402
+
+
+def _stats(runs: List[float]) -> Dict[str, Any]:
+    return {
+        "min_ms": round(min(runs), 2),
+        "median_ms": round(statistics.median(runs), 2),
+        "mean_ms": round(statistics.fmean(runs), 2),
+        "runs": [round(r, 2) for r in runs],
+    }
+
+
+def measure(func: Callable[[int], Any], repeat: int) -> Dict[str, Any]:
+    # `func` gets the iteration number so a benchmark can vary its input (e.g. defeat caches)
+    func(-1)
+    runs = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func(i)
+        runs.append((time.perf_counter() - start) * 1000)
+    return _stats(runs)
+
+
+async def ameasure(func: Callable[[int], Awaitable[Any]], repeat: int) -> Dict[str, Any]:
+    await func(-1)
+    runs = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        await func(i)
+        runs.append((time.perf_counter() - start) * 1000)
+    return _stats(runs)
+
+
+def metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "only")},
+    }
+
+
+def run_micro(args: argparse.Namespace, paths: Dict[str, str], results: Dict[str, Any]) -> None:
+    from services.data_service import DataService
+    from services.profiling_executor import ProfilingExecutor
+
+    loaded, _ = DataService.load_file(paths["csv"], "bench.csv")
+    benchmarks = {
+        "micro.read_file.csv": lambda i: DataService.read_file(paths["csv"], "bench.csv"),
+        "micro.read_file.xlsx": lambda i: DataService.read_file(paths["xlsx"], "bench.xlsx"),
+        "micro.load_file.csv": lambda i: DataService.load_file(paths["csv"], "bench.csv"),
+        "micro.get_summary": lambda i: DataService.get_summary(loaded),
+        "micro.summarize_chunks.csv": lambda i: DataService.summarize_chunks(DataService.iter_chunks(paths["csv"], "bench.csv")),
+        "micro.detect_anomalies": lambda i: DataService.detect_anomalies(loaded),
+        "micro.detect_file_anomalies.csv": lambda i: DataService.detect_file_anomalies(paths["csv"], "bench.csv"),
+    }
+    executor = ProfilingExecutor()
+    try:
+        benchmarks["micro.profiling_executor.get_summary"] = lambda i: asyncio.run(executor.get_summary(loaded))
+        for name, func in benchmarks.items():
+            if selected(args, name):
+                results[name] = measure(func, args.repeat)
+                print(f"{name}: {results[name]['median_ms']} ms", file=sys.stderr)
+    finally:
+        executor.shutdown()
+
+
+async def run_e2e(args: argparse.Namespace, payload: bytes, results: Dict[str, Any]) -> int:
+    """Runs the selected end-to-end benchmarks; returns the number of stubbed model calls."""
+    import httpx
+    from main import app
+    from services.llm_gateway import llm_gateway
+
+    stub = StubOpenAI(latency_ms=args.llm_latency_ms)
+    llm_gateway.set_client(stub)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        async def post_upload(data: bytes) -> Dict[str, Any]:
+            response = await client.post("/api/upload", files={"file": ("bench.csv", data, "text/csv")})
+            response.raise_for_status()
+            return response.json()
+
+        # Trailing blank lines change the content hash but not the parsed data, so each run misses the caches
+        async def upload_cold(i: int) -> None:
+            await post_upload(payload + b"\n" * (i + 2))
+
+        async def upload_cached(i: int) -> None:
+            await post_upload(payload)
+
+        async def job_cold(i: int) -> None:
+            data = payload + b"\n" * (i + args.repeat + 3)
+            response = await client.post("/api/jobs", files={"file": ("bench.csv", data, "text/csv")})
+            response.raise_for_status()
+            created = response.json()
+            headers = {"X-Session-ID": created["session_id"]}
+            while True:
+                state = (await client.get(created["status_url"], headers=headers)).json()
+                if state["status"] in ("done", "failed"):
+                    break
+                await asyncio.sleep(0.005)
+            if state["status"] != "done":
+                raise RuntimeError(f"Upload job failed: {state['error']}")
+
+        session: Dict[str, str] = {}
+
+        # Distinct questions miss the response and plan caches: plan call, sandbox run, synthesis
+        async def chat_uncached(i: int) -> None:
+            response = await client.post("/api/chat", json={"query": f"What are the totals for run {i + 2}?"}, headers=session)
+            response.raise_for_status()
+
+        async def chat_cached(i: int) -> None:
+            response = await client.post("/api/chat", json={"query": "What are the totals?"}, headers=session)
+            response.raise_for_status()
+
+        async def chat_stream(i: int) -> None:
+            query = {"query": f"Summarize run {i + 2}"}
+            async with client.stream("POST", "/api/chat/stream", json=query, headers=session) as response:
+                response.raise_for_status()
+                async for _ in response.aiter_bytes():
+                    pass
+
+        benchmarks = {
+            "e2e.upload.cold": upload_cold,
+            "e2e.upload.cached": upload_cached,
+            "e2e.jobs.cold": job_cold,
+            "e2e.chat.uncached": chat_uncached,
+            "e2e.chat.cached": chat_cached,
+            "e2e.chat.stream": chat_stream,
+        }
+        names = [name for name in benchmarks if selected(args, name)]
+        if any(name.startswith("e2e.chat") for name in names):
+            session["X-Session-ID"] = (await post_upload(payload))["session_id"]
+        for name in names:
+            results[name] = await ameasure(benchmarks[name], args.repeat)
+            print(f"{name}: {results[name]['median_ms']} ms", file=sys.stderr)
+
+    return stub.chat.completions.calls
+
+
+def selected(args: argparse.Namespace, name: str) -> bool:
+    return not args.only or any(part in name for part in args.only.split(","))
+
+
+def shutdown_pools() -> None:
+    from services.sandbox import sandbox_pool
+    from services.excel_reader import ExcelReader
+    from routers import upload
+    sandbox_pool.shutdown()
+    ExcelReader.shutdown()
+    upload.profiling_executor.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--xlsx-rows", type=int, default=5_000, help="Rows in the XLSX variant (openpyxl is slow to write)")
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--cardinality", type=int, default=50)
+    parser.add_argument("--null-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Delay added to every stubbed model call")
+    parser.add_argument("--only", help="Comma-separated name filters, e.g. micro.get_summary,e2e.chat")
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    args = parser.parse_args()
+
+    # Keep benchmark uploads out of the shared dataset cache
+    cache_dir = tempfile.mkdtemp(prefix="deanalyse_bench_")
+    os.environ["DATASET_CACHE_DIR"] = cache_dir
+    os.chdir(BACKEND_DIR)
+
+    df = generate(args.rows, args.columns, args.mix, args.cardinality, args.null_rate, args.seed)
+    payload = to_bytes(df, "csv")
+    paths = {"csv": os.path.join(cache_dir, "bench.csv"), "xlsx": os.path.join(cache_dir, "bench.xlsx")}
+    with open(paths["csv"], "wb") as f:
+        f.write(payload)
+    if selected(args, "micro.read_file.xlsx"):
+        with open(paths["xlsx"], "wb") as f:
+            f.write(to_bytes(df.head(args.xlsx_rows), "xlsx"))
+
+    results: Dict[str, Any] = {}
+    try:
+        run_micro(args, paths, results)
+        llm_calls = asyncio.run(run_e2e(args, payload, results))
+    finally:
+        shutdown_pools()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    report = {"meta": dict(metadata(args), payload_mb=round(len(payload) / (1024 * 1024), 2), llm_calls=llm_calls), "results": results}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Performance Configuration for DeAnalyse Application
+This file contains tuning knobs for ingestion, profiling and caching.
+"""
+
+import os
+import tempfile
+
+# Upload Ingestion
+UPLOAD_CHUNK_SIZE_BYTES = 1024 * 1024  # Spool multipart bodies to disk 1MB at a time
+CSV_CHUNK_ROWS = 50_000  # Rows parsed per incremental CSV read
+
+# Excel Ingest ("auto" picks calamine when python-calamine is installed, else openpyxl/xlrd)
+EXCEL_ENGINE = os.getenv("EXCEL_ENGINE", "auto")
+EXCEL_MAX_ROWS = int(os.getenv("EXCEL_MAX_ROWS", 1_000_000))  # Per upload, checked from sheet metadata
+EXCEL_MAX_COLUMNS = int(os.getenv("EXCEL_MAX_COLUMNS", 500))
+EXCEL_SHEET_WORKERS = int(os.getenv("EXCEL_SHEET_WORKERS", min(4, os.cpu_count() or 1)))  # Processes for multi-sheet reads
+
+# Summary Statistics
+# "approximate" backs `unique` and p50/p95/p99 with bounded-memory sketches,
+# "exact" keeps every hash/value (memory grows with the data)
+SUMMARY_STATS_MODE = os.getenv("SUMMARY_STATS_MODE", "approximate")
+HLL_PRECISION = 14  # 16KB per column; distinct count relative std error ~0.81%
+DISTINCT_EXACT_LIMIT = int(os.getenv("DISTINCT_EXACT_LIMIT", 1_000_000))  # Counted exactly (8 bytes each) before switching to HLL
+KLL_K = 200  # Quantile rank error ~1.65% (99% confidence)
+
+# Profiling Executor
+PROFILING_WORKERS = int(os.getenv("PROFILING_WORKERS", os.cpu_count() or 1))
+PROFILING_EXECUTOR = os.getenv("PROFILING_EXECUTOR", "thread")  # "thread" or "process"
+
+# Request Concurrency
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", min(32, (os.cpu_count() or 1) + 4)))  # Parsing / exec pool
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", 4))  # Uploads processed at once per worker
+CHAT_CONCURRENCY = int(os.getenv("CHAT_CONCURRENCY", 16))  # Chat requests processed at once per worker
+ROUTE_QUEUE_TIMEOUT_SECONDS = 10  # Wait this long for a slot before answering 503
+
+# Background Upload Jobs
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", 4))  # Jobs processed at once per worker
+JOB_MAX_ENTRIES = 1000  # Jobs tracked in memory (older ones remain readable from disk)
+JOB_PERSIST_INTERVAL_SECONDS = 0.25  # Job state changes are written to disk at most this often
+JOB_PRUNE_INTERVAL_SECONDS = 300  # Expired job records are swept from disk this often
+
+# Dataset Store (expiry comes from SESSION_TIMEOUT_MINUTES / MAX_DATA_RETENTION_HOURS)
+DATASET_STORE_MAX_BYTES = int(os.getenv("DATASET_STORE_MAX_MB", 512)) * 1024 * 1024
+
+# On-disk Dataset Cache (Arrow IPC files shared by all workers on the host)
+DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", os.path.join(tempfile.gettempdir(), "deanalyse_datasets"))
+
+# Rate Limit Buckets (memory-mapped so all workers on the host share them;
+# kept out of DATASET_CACHE_DIR, whose expired files are pruned)
+RATE_LIMIT_STATE_FILE = os.getenv(
+    "RATE_LIMIT_STATE_FILE", os.path.join(tempfile.gettempdir(), "deanalyse_ratelimit", "buckets.bin")
+)
+RATE_LIMIT_SLOTS = 65536  # Client buckets tracked (24 bytes each)
+
+# Upload Result Cache (summary, anomalies and KPI suggestions keyed by content hash)
+RESULT_CACHE_ENTRIES = int(os.getenv("RESULT_CACHE_ENTRIES", 256))
+
+# Ingest-time Dtype Optimization
+INGEST_OPTIMIZE_DTYPES = os.getenv("INGEST_OPTIMIZE_DTYPES", "true").lower() == "true"
+INGEST_SAMPLE_ROWS = 10_000  # Rows inspected to pick date/category candidates
+CATEGORY_MAX_UNIQUE_RATIO = 0.5  # Text columns become category below this distinct/row ratio
+CSV_ENGINE = os.getenv("CSV_ENGINE", "c")  # "pyarrow" is multi-threaded but reads the file in one piece
+CSV_DTYPE_BACKEND = os.getenv("CSV_DTYPE_BACKEND") or None  # e.g. "pyarrow" or "numpy_nullable"
+
+# Anomaly Detection ("zscore", "mad", "iqr", "rolling"; rolling needs a date column)
+ANOMALY_METHODS = [m.strip() for m in os.getenv("ANOMALY_METHODS", "zscore").split(",") if m.strip()]
+ANOMALY_CHUNK_ROWS = 250_000  # Rows scored per block (bounds temporary float64 copies)
+ANOMALY_MAX_ROWS = 20  # Most severe rows reported per column and method
+ANOMALY_MIN_VALUES = 10  # Columns with fewer non-null values are skipped
+ANOMALY_ROLLING_WINDOW = int(os.getenv("ANOMALY_ROLLING_WINDOW", 24))
+
+# Dataset Query Endpoints (chart aggregates, row pages)
+DATASET_QUERY_CONCURRENCY = int(os.getenv("DATASET_QUERY_CONCURRENCY", 8))
+AGGREGATE_CACHE_ENTRIES = int(os.getenv("AGGREGATE_CACHE_ENTRIES", 1024))
+AGGREGATE_MAX_GROUPS = 1000  # Largest group-by / top-N series returned
+AGGREGATE_MAX_BUCKETS = 5000  # Largest time series returned
+ROWS_MAX_PAGE_SIZE = 1000
+ROW_ORDER_CACHE_ENTRIES = 64  # Filtered/sorted row orders kept (8 bytes per matching row)
+
+# Chat Response Cache (keyed by dataset fingerprint + normalized question)
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", 512))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 3600))
+
+# Generated-code Plan Cache (keyed by schema fingerprint + normalized question)
+PLAN_CACHE_ENTRIES = int(os.getenv("PLAN_CACHE_ENTRIES", 1024))
+PLAN_CACHE_TTL_SECONDS = int(os.getenv("PLAN_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+
+# Analysis Code Sandbox (warm worker processes running generated code)
+ANALYSIS_SANDBOX_ENABLED = os.getenv("ANALYSIS_SANDBOX_ENABLED", "true").lower() == "true"
+SANDBOX_WORKERS = int(os.getenv("SANDBOX_WORKERS", min(4, os.cpu_count() or 1)))
+SANDBOX_TIMEOUT_SECONDS = int(os.getenv("SANDBOX_TIMEOUT_SECONDS", 30))  # Wall-clock limit per job
+SANDBOX_MEMORY_LIMIT_MB = int(os.getenv("SANDBOX_MEMORY_LIMIT_MB", 2048))  # RSS limit per worker
+SANDBOX_MAX_JOBS_PER_WORKER = 100  # Recycle workers to bound leaks
+
+# SQL Analysis Engine (DuckDB, optional; ANALYSIS_ENGINE="sql" has the model write SQL instead of pandas)
+ANALYSIS_ENGINE = os.getenv("ANALYSIS_ENGINE", "pandas")
+SQL_THREADS = int(os.getenv("SQL_THREADS", os.cpu_count() or 1))
+SQL_MEMORY_LIMIT_MB = int(os.getenv("SQL_MEMORY_LIMIT_MB", 1024))  # Larger sorts/joins spill to disk
+SQL_TIMEOUT_SECONDS = int(os.getenv("SQL_TIMEOUT_SECONDS", 30))
+SQL_MAX_RESULT_ROWS = 200  # Result rows passed back to the model
+SESSION_MAX_TABLES = 8  # Uploads per session kept queryable (and joinable) by SQL
+
+# Chat Context Builder
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 1000))  # Tokens spent on the dataset summary per prompt
+CONTEXT_CACHE_ENTRIES = 256
+
+# Metrics (/metrics in Prometheus text format; it and /api/*/stats require "Authorization: Bearer <METRICS_TOKEN>")
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN") or None
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() == "true"  # Serve them without a token (local development only)
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Response Compression (negotiated from Accept-Encoding; brotli needs the optional `brotli` package)
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 1024))  # Smaller bodies are sent as-is
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))  # Near gzip -6 speed, smaller output
+
+# LLM Gateway (one shared client per worker process for chat and upload)
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL") or None  # e.g. a local OpenAI-compatible fake for tests
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))  # Upstream calls in flight; more wait their turn
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))  # Per attempt
+LLM_CONNECT_TIMEOUT_SECONDS = 5
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))  # On 429, 5xx, connection errors and timeouts
+LLM_RETRY_BASE_SECONDS = 0.5  # Backoff before retry n is uniform in [0, base * 2**n]
+LLM_RETRY_MAX_SECONDS = 8
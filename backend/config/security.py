@@ -3,10 +3,16 @@ Security Configuration for DeAnalyse Application
 This file contains all security-related constants and configurations.
 """
 
+import os
+import secrets
+
 # File Upload Security
 MAX_FILE_SIZE_MB = 10
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 ALLOWED_FILE_EXTENSIONS = ['.csv', '.xlsx', '.xls']
+ALLOWED_COMPRESSION_EXTENSIONS = ['.gz', '.zst']  # CSV only, e.g. data.csv.gz
+MAX_DECOMPRESSED_SIZE_MB = 100  # Compressed uploads are also limited after decompression
+MAX_DECOMPRESSED_SIZE_BYTES = MAX_DECOMPRESSED_SIZE_MB * 1024 * 1024
 ALLOWED_MIME_TYPES = [
     'text/csv',
     'application/vnd.ms-excel',
@@ -18,9 +24,14 @@ MAX_QUERY_LENGTH = 500
 MAX_FILENAME_LENGTH = 255
 MAX_CONTEXT_LENGTH = 5000
 
-# Rate Limiting (requests per minute)
+# Rate Limiting (requests per minute per client, also the burst size)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
 RATE_LIMIT_UPLOAD = 10
 RATE_LIMIT_CHAT = 30
+# Proxies in front of the app whose X-Forwarded-For entries are trusted
+# (0: use the connecting address, so clients cannot spoof their identity;
+# render.yaml sets 1 since every request arrives through Render's proxy)
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", 0))
 
 # LLM Security - Dangerous patterns to filter
 PROMPT_INJECTION_PATTERNS = [
@@ -50,6 +61,9 @@ ALLOWED_ORIGINS = [
 # Session Security
 SESSION_TIMEOUT_MINUTES = 30
 MAX_SESSIONS_PER_USER = 3
+# Signs row paging cursors so clients cannot forge them; every worker must share
+# one value (render.yaml generates it; unset, each process picks its own)
+ROW_CURSOR_SECRET = os.getenv("ROW_CURSOR_SECRET") or secrets.token_hex(32)
 
 # Data Retention
 MAX_DATA_RETENTION_HOURS = 24  # Auto-clear uploaded data after 24 hours
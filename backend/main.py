@@ -4,11 +4,47 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import Response
 from dotenv import load_dotenv
 import os
+import time
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="DeAnalyse API")
+from services.serialization import FastJSONResponse
+
+app = FastAPI(title="DeAnalyse API", default_response_class=FastJSONResponse)
+
+from config.performance import (
+    METRICS_ENABLED,
+    COMPRESSION_ENABLED,
+    COMPRESSION_MIN_BYTES,
+    GZIP_LEVEL,
+    BROTLI_QUALITY,
+    RATE_LIMIT_STATE_FILE,
+    RATE_LIMIT_SLOTS
+)
+from config.security import RATE_LIMIT_ENABLED, RATE_LIMIT_TRUSTED_PROXIES
+from services.metrics import HTTP_REQUEST_SECONDS
+from services.rate_limiter import create_bucket_store
+from routers.compression import CompressionMiddleware
+from routers.rate_limit import RateLimitMiddleware
+from routers.monitoring import route_template
+
+# Performance: Request latency per route template (not raw path, to bound label cardinality)
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route_template(request.scope),
+            status=str(status)
+        )
 
 # Security: Add security headers middleware
 @app.middleware("http")
@@ -31,6 +67,15 @@ async def add_security_headers(request: Request, call_next):
     
     return response
 
+# Security: Per-client rate limits on upload and chat, shared by all workers on the host
+# (added before CORS so 429 responses still carry CORS headers)
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=create_bucket_store(RATE_LIMIT_STATE_FILE, RATE_LIMIT_SLOTS),
+        trusted_proxies=RATE_LIMIT_TRUSTED_PROXIES
+    )
+
 # Security: Proper CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -43,20 +88,35 @@ app.add_middleware(
     ],
     allow_credentials=True,
     allow_methods=["GET", "POST", "HEAD"],
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Content-Type", "Authorization", "X-Session-ID"],
+    expose_headers=["X-Total-Count", "X-Row-Offset", "X-Next-Cursor", "Location", "Retry-After"],
 )
 
+# Performance: gzip/brotli response compression (summaries, row pages; not the chat event stream)
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_BYTES,
+        gzip_level=GZIP_LEVEL,
+        brotli_quality=BROTLI_QUALITY
+    )
+
 # Security: Prevent host header attacks
 app.add_middleware(
     TrustedHostMiddleware,
     allowed_hosts=["*"]  # Allowed all for cloud compatibility, CORS still protects the API
 )
 
-from routers import upload, chat
+from routers import upload, chat, datasets, jobs, metrics
 
 # Include routers
 app.include_router(upload.router, prefix="/api")
 app.include_router(chat.router, prefix="/api")
+app.include_router(datasets.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
+
+if METRICS_ENABLED:
+    app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
@@ -69,6 +129,8 @@ def health_check():
 
 app.include_router(upload.router, prefix="/api", tags=["Upload"])
 app.include_router(chat.router, prefix="/api", tags=["Chat"])
+app.include_router(datasets.router, prefix="/api", tags=["Datasets"])
+app.include_router(jobs.router, prefix="/api", tags=["Jobs"])
 
 if __name__ == "__main__":
     import uvicorn
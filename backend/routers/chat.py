@@ -1,10 +1,19 @@
-from fastapi import APIRouter, HTTPException
+import json
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, validator
-from services.ai_service import AIService
-from routers.upload import DATA_CONTEXT
+from services.ai_service import ai_service
+from services.context_builder import ContextBuilder
+from routers.upload import load_session_dataset, session_tables
+from routers.limits import RouteLimiter
+from routers.session import get_session_id
+from routers.monitoring import require_metrics_token
+from typing import Optional
+from config.performance import CHAT_CONCURRENCY, ROUTE_QUEUE_TIMEOUT_SECONDS
 
 router = APIRouter()
-ai_service = AIService()
+context_builder = ContextBuilder()
+chat_limiter = RouteLimiter(CHAT_CONCURRENCY, ROUTE_QUEUE_TIMEOUT_SECONDS)
 
 class ChatRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=500)
@@ -18,28 +27,70 @@ class ChatRequest(BaseModel):
         v = v.strip()
         return v
 
-@router.post("/chat")
-async def chat(request: ChatRequest):
+@router.post("/chat", dependencies=[Depends(chat_limiter)])
+async def chat(request: ChatRequest, session_id: Optional[str] = Depends(get_session_id)):
     try:
-        context_data = DATA_CONTEXT.get('latest')
+        entry = await load_session_dataset(session_id)
         
-        if not context_data:
+        if not entry:
             return {
                 "response": "I don't have any data loaded yet. Please upload a file first so I can analyze it."
             }
             
-        df = DATA_CONTEXT.get('df')
+        context_data = entry.summary
+        df = entry.df
         
-        # Create a string representation of the context
-        context_str = str(context_data)
+        # Render schema and stats compactly within the prompt token budget
+        context = context_builder.build(context_data, entry.dataset_id)
         
-        response = await ai_service.generate_response(context_str, request.query, df)
+        tables = session_tables(session_id, entry)
+        response = await ai_service.generate_response(context.text, request.query, df, entry.dataset_id, tables)
         
         return {
-            "response": response
+            "response": response,
+            "context_tokens": context.tokens
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         # Security: Don't expose internal errors
         raise HTTPException(status_code=500, detail="An error occurred processing your request")
+
+def _sse(event: str, data=None) -> str:
+    # JSON-encoded data keeps multi-line answers inside a single SSE data field
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/chat/stream", dependencies=[Depends(chat_limiter)])
+async def chat_stream(request: ChatRequest, session_id: Optional[str] = Depends(get_session_id)):
+    """
+    Same as /chat, streamed as server-sent events: "context", "planning",
+    "executing", one "token" event per answer delta, then "done" or "error".
+    """
+    entry = await load_session_dataset(session_id)
+
+    async def events():
+        if not entry:
+            yield _sse("token", "I don't have any data loaded yet. Please upload a file first so I can analyze it.")
+            yield _sse("done")
+            return
+
+        context = context_builder.build(entry.summary, entry.dataset_id)
+        yield _sse("context", {"tokens": context.tokens})
+        try:
+            tables = session_tables(session_id, entry)
+            async for event in ai_service.stream_response(context.text, request.query, entry.df, entry.dataset_id, tables):
+                yield _sse(event["event"], event.get("data"))
+        except Exception:
+            # Security: Don't expose internal errors
+            yield _sse("error", "An error occurred processing your request")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/chat/stats", dependencies=[Depends(require_metrics_token)])
+def chat_stats():
+    """Response cache hit rate, request coalescing and LLM gateway counters"""
+    return ai_service.cache_stats()
@@ -0,0 +1,112 @@
+import anyio.to_thread
+from typing import Dict
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+THREAD_MINIMUM_SIZE = 128 * 1024  # Larger chunks are compressed off the event loop
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Codings from an Accept-Encoding header with their q-values."""
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int, *, exclude_content_types: tuple):
+        super().__init__(app, minimum_size, exclude_content_types=exclude_content_types)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(self._compress_body, body, more_body)
+        return self._compress_body(body, more_body)
+
+    def _compress_body(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        data = self._compressor.process(body)
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best coding the client accepts: brotli when
+    the `brotli` package is installed, else gzip. Bodies under `minimum_size`
+    and already-compressed or streaming content types (including the chat
+    event stream, so tokens are not held back in a compressor buffer) are sent
+    uncompressed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        exclude_content_types: tuple = DEFAULT_EXCLUDED_CONTENT_TYPES
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exclude_content_types = exclude_content_types
+
+    def negotiate(self, accept_encoding: str) -> str:
+        codings = parse_accept_encoding(accept_encoding)
+        wildcard = codings.get("*", 0.0)
+        candidates = (("br", brotli is not None), ("gzip", True))
+        best, best_q = "identity", 0.0
+        for coding, available in candidates:
+            q = codings.get(coding, wildcard)
+            if available and q > best_q:
+                best, best_q = coding, q
+        return best
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coding = self.negotiate(Headers(scope=scope).get("Accept-Encoding", ""))
+        if coding == "br":
+            responder = BrotliResponder(
+                self.app,
+                self.minimum_size,
+                self.brotli_quality,
+                exclude_content_types=self.exclude_content_types
+            )
+        elif coding == "gzip":
+            responder = GZipResponder(
+                self.app,
+                self.minimum_size,
+                compresslevel=self.gzip_level,
+                thread_minimum_size=THREAD_MINIMUM_SIZE,
+                exclude_content_types=self.exclude_content_types
+            )
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size, exclude_content_types=self.exclude_content_types)
+        await responder(scope, receive, send)
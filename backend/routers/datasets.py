@@ -0,0 +1,130 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
+from services.aggregation_service import AggregationService
+from services.row_service import RowService
+from services.serialization import FastJSONResponse
+from services.concurrency import run_blocking
+from services.cache import TTLCache
+from services.dataset_store import DatasetEntry
+from routers.upload import load_session_dataset, dataset_cache
+from routers.limits import RouteLimiter
+from routers.session import get_session_id
+from routers.monitoring import require_metrics_token
+from typing import Any, List, Literal, Optional
+from config.security import MAX_DATA_RETENTION_HOURS
+from config.performance import (
+    DATASET_QUERY_CONCURRENCY,
+    ROUTE_QUEUE_TIMEOUT_SECONDS,
+    AGGREGATE_CACHE_ENTRIES,
+    AGGREGATE_MAX_GROUPS,
+    ROWS_MAX_PAGE_SIZE
+)
+
+router = APIRouter()
+dataset_limiter = RouteLimiter(DATASET_QUERY_CONCURRENCY, ROUTE_QUEUE_TIMEOUT_SECONDS)
+# Aggregates by (dataset content hash, query); datasets are immutable so entries never go stale
+aggregate_cache = TTLCache(AGGREGATE_CACHE_ENTRIES, ttl_seconds=MAX_DATA_RETENTION_HOURS * 3600)
+row_service = RowService()
+
+class AggregateRequest(BaseModel):
+    kind: Literal["groupby", "topn", "timeseries", "histogram"]
+    column: str = Field(..., min_length=1, max_length=255)
+    value: Optional[str] = Field(None, max_length=255)
+    agg: Literal["sum", "mean", "median", "min", "max", "count"] = "sum"
+    interval: Literal["hour", "day", "week", "month", "quarter", "year"] = "day"
+    limit: int = Field(20, ge=1, le=AGGREGATE_MAX_GROUPS)
+    bins: int = Field(20, ge=1, le=200)
+
+class RowFilter(BaseModel):
+    column: str = Field(..., min_length=1, max_length=255)
+    op: Literal["eq", "ne", "gt", "gte", "lt", "lte", "in", "contains", "isnull", "notnull"]
+    value: Any = None
+
+class RowsRequest(BaseModel):
+    columns: Optional[List[str]] = Field(None, max_length=500)
+    sort: Optional[str] = Field(None, max_length=255)
+    descending: bool = False
+    filters: List[RowFilter] = Field(default_factory=list, max_length=20)
+    offset: int = Field(0, ge=0)
+    cursor: Optional[str] = Field(None, max_length=512)
+    limit: int = Field(100, ge=1, le=ROWS_MAX_PAGE_SIZE)
+    format: Literal["json", "arrow"] = "json"
+
+async def get_session_dataset(dataset_id: str, session_id: Optional[str] = Depends(get_session_id)) -> DatasetEntry:
+    """
+    Resolves a dataset for the requesting session.
+    Security: a dataset is only reachable from the session that uploaded it.
+    """
+    entry = await load_session_dataset(session_id)
+    if entry is None or entry.dataset_id != dataset_id:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    return entry
+
+@router.post("/datasets/{dataset_id}/aggregate", dependencies=[Depends(dataset_limiter)])
+async def aggregate(request: AggregateRequest, entry: DatasetEntry = Depends(get_session_dataset)):
+    """Chart-ready aggregate (group-by, top-N, time buckets or histogram) of the stored dataset"""
+    query = request.model_dump()
+    key = (entry.dataset_id, tuple(sorted(query.items())))
+    cached = aggregate_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        result = await run_blocking(AggregationService.aggregate, entry.df, query)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        # Security: Don't expose internal errors
+        print(f"Error aggregating dataset: {str(e)}")  # Log internally
+        raise HTTPException(status_code=500, detail="An error occurred processing your request")
+    aggregate_cache.set(key, result)
+    return result
+
+@router.post("/datasets/{dataset_id}/rows", dependencies=[Depends(dataset_limiter)])
+async def rows(request: RowsRequest, entry: DatasetEntry = Depends(get_session_dataset)):
+    """
+    A page of rows with optional projection, filters and sort.
+    Continue with `nextCursor` (or `nextOffset`); `format="arrow"` returns an
+    Arrow IPC stream with paging metadata in X-* headers.
+    """
+    filters = [f.model_dump() for f in request.filters]
+    try:
+        offset = request.offset
+        if request.cursor:
+            fingerprint = RowService.fingerprint(request.sort, request.descending, filters)
+            offset = RowService.decode_cursor(request.cursor, fingerprint)
+        page = await run_blocking(
+            row_service.page, entry.df, entry.dataset_id, request.columns,
+            request.sort, request.descending, filters, offset, request.limit
+        )
+        if request.format == "arrow":
+            body = await run_blocking(RowService.to_arrow, page)
+            headers = {"X-Total-Count": str(page["total"]), "X-Row-Offset": str(page["offset"])}
+            if page["nextCursor"]:
+                headers["X-Next-Cursor"] = page["nextCursor"]
+            return Response(body, media_type="application/vnd.apache.arrow.stream", headers=headers)
+        payload = await run_blocking(RowService.to_json_payload, page)
+        return FastJSONResponse(payload)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        # Security: Don't expose internal errors
+        print(f"Error reading dataset rows: {str(e)}")  # Log internally
+        raise HTTPException(status_code=500, detail="An error occurred processing your request")
+
+@router.get("/datasets/tables")
+async def list_session_tables(session_id: Optional[str] = Depends(get_session_id)):
+    """The session's uploads by SQL table name (what SQL analysis can query and join)"""
+    entry = await load_session_dataset(session_id)
+    tables = dataset_cache.session_tables(session_id) if session_id else {}
+    return {
+        "tables": [
+            {"name": name, "dataset_id": dataset_id, "current": entry is not None and dataset_id == entry.dataset_id}
+            for name, dataset_id in tables.items()
+        ]
+    }
+
+@router.get("/datasets/stats", dependencies=[Depends(require_metrics_token)])
+def dataset_query_stats():
+    """Aggregate and row-order cache hit rates"""
+    return {"aggregates": aggregate_cache.stats(), "rowOrders": row_service.stats()}
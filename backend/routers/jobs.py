@@ -0,0 +1,67 @@
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from fastapi.responses import JSONResponse
+from services.serialization import FastJSONResponse
+from services.ingest_service import IngestService
+from services.job_manager import JobManager, UPLOAD_STAGES
+from routers.upload import validate_upload, spool, process_upload, upload_limiter
+from routers.session import get_session_id, new_session_id
+from routers.monitoring import require_metrics_token
+from typing import Optional
+import os
+from config.security import MAX_DATA_RETENTION_HOURS
+from config.performance import DATASET_CACHE_DIR, JOB_MAX_ENTRIES, JOB_CONCURRENCY
+
+router = APIRouter()
+# Job state is mirrored next to the dataset cache so any worker can answer a poll
+job_manager = JobManager(
+    max_jobs=JOB_MAX_ENTRIES,
+    ttl_seconds=MAX_DATA_RETENTION_HOURS * 3600,
+    concurrency=JOB_CONCURRENCY,
+    state_dir=os.path.join(DATASET_CACHE_DIR, "jobs")
+)
+
+@router.post("/jobs", status_code=202, dependencies=[Depends(upload_limiter)])
+async def create_upload_job(
+    file: UploadFile = File(...),
+    sheet: Optional[str] = Form(None, max_length=255),
+    session_id: Optional[str] = Depends(get_session_id)
+):
+    """
+    Background variant of /upload: stores the file and returns a job ID at
+    once; poll /jobs/{job_id} for per-stage progress and partial results.
+    """
+    session_id = session_id or new_session_id()
+    safe_filename, file_ext, compression = validate_upload(file)
+    try:
+        spooled = await spool(file, file_ext, compression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job = job_manager.create(list(UPLOAD_STAGES), session_id=session_id)
+
+    async def work():
+        try:
+            return await process_upload(job, spooled, safe_filename, file_ext, sheet, session_id)
+        finally:
+            IngestService.discard(spooled.path)
+
+    job_manager.submit(job, work, error_message="An error occurred processing your file")
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.job_id, "session_id": session_id, "status_url": f"/api/jobs/{job.job_id}"},
+        headers={"Location": f"/api/jobs/{job.job_id}"}
+    )
+
+@router.get("/jobs/stats", dependencies=[Depends(require_metrics_token)])
+def job_stats():
+    """Tracked and running background jobs"""
+    return job_manager.stats()
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str, session_id: Optional[str] = Depends(get_session_id)):
+    """Status, per-stage progress and timings, and results published so far"""
+    state = job_manager.get(job_id) if len(job_id) == 32 and job_id.isalnum() else None
+    # Security: jobs are only visible to the session that created them
+    if state is None or state.pop("session_id", None) != session_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return FastJSONResponse(state)
@@ -0,0 +1,60 @@
+import asyncio
+import math
+from typing import AsyncIterator, Optional
+from fastapi import HTTPException
+
+
+class RouteLimiter:
+    """
+    FastAPI dependency capping how many requests a route processes at once.
+    Excess requests queue for up to `wait_seconds` and are then rejected with
+    503 and a Retry-After header, so a burst applies backpressure instead of
+    piling up work on the worker.
+    """
+
+    def __init__(self, limit: int, wait_seconds: float):
+        self.limit = limit
+        self.wait_seconds = wait_seconds
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        return self._semaphore
+
+    def _abandon(self, acquire: "asyncio.Future[bool]") -> None:
+        acquire.cancel()
+        # A permit granted before the cancel lands would otherwise be lost
+        acquire.add_done_callback(
+            lambda task: task.cancelled() or task.exception() is not None or self.semaphore.release()
+        )
+
+    async def _acquire(self) -> bool:
+        if not self.semaphore.locked():
+            # A permit is free, so acquire() returns without suspending
+            return await self.semaphore.acquire()
+        # Not wait_for(acquire()): on Python 3.9 a permit granted as the
+        # timeout fires is dropped, shrinking the limit for good
+        acquire = asyncio.ensure_future(self.semaphore.acquire())
+        try:
+            await asyncio.wait({acquire}, timeout=self.wait_seconds)
+        except BaseException:
+            self._abandon(acquire)
+            raise
+        if acquire.done():
+            return acquire.result()
+        self._abandon(acquire)
+        return False
+
+    async def __call__(self) -> AsyncIterator[None]:
+        if not await self._acquire():
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy. Please try again shortly.",
+                headers={"Retry-After": str(math.ceil(self.wait_seconds))}
+            )
+        try:
+            yield
+        finally:
+            self.semaphore.release()
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+from services.metrics import registry, CONTENT_TYPE
+from services.sandbox import sandbox_pool
+from services.llm_gateway import llm_gateway
+from routers import upload, chat, datasets, jobs
+from routers.monitoring import require_metrics_token
+from typing import Any, Callable, Dict
+
+router = APIRouter()
+
+# Existing stats() counters exposed as scrape-time gauges/counters
+_caches: Dict[str, Callable[[], Dict[str, Any]]] = {
+    "results": upload.result_cache.stats,
+    "responses": chat.ai_service.response_cache.stats,
+    "plans": chat.ai_service.plan_cache.stats,
+    "aggregates": datasets.aggregate_cache.stats,
+    "row_orders": datasets.row_service.stats,
+}
+
+def _per_cache(field: str):
+    return lambda: [({"cache": name}, stats()[field]) for name, stats in _caches.items()]
+
+def _stat(stats: Callable[[], Dict[str, Any]], field: str):
+    return lambda: stats()[field]
+
+registry.callback("deanalyse_dataset_store_bytes", "Memory held by in-process session datasets", _stat(upload.dataset_store.stats, "bytes"))
+registry.callback("deanalyse_dataset_store_max_bytes", "Dataset store memory budget", _stat(upload.dataset_store.stats, "maxBytes"))
+registry.callback("deanalyse_dataset_store_entries", "Session datasets held in memory", _stat(upload.dataset_store.stats, "entries"))
+registry.callback("deanalyse_dataset_store_evictions_total", "Datasets evicted to stay within budget", _stat(upload.dataset_store.stats, "evictions"), type="counter")
+registry.callback("deanalyse_cache_entries", "Entries per cache", _per_cache("entries"))
+registry.callback("deanalyse_cache_hits_total", "Cache hits per cache", _per_cache("hits"), type="counter")
+registry.callback("deanalyse_cache_misses_total", "Cache misses per cache", _per_cache("misses"), type="counter")
+registry.callback("deanalyse_sandbox_workers", "Analysis sandbox worker processes", _stat(sandbox_pool.stats, "workers"))
+registry.callback("deanalyse_sandbox_idle_workers", "Idle analysis sandbox workers", _stat(sandbox_pool.stats, "idle"))
+registry.callback(
+    "deanalyse_sandbox_failures_total",
+    "Sandbox jobs ended by timeout, memory limit or crash",
+    lambda: [({"reason": reason}, sandbox_pool.stats()[key]) for reason, key in (("timeout", "timeouts"), ("memory", "memoryKills"), ("crash", "crashes"))],
+    type="counter"
+)
+registry.callback("deanalyse_llm_in_flight", "Model API calls in progress", _stat(llm_gateway.stats, "inFlight"))
+registry.callback("deanalyse_llm_waiting", "Model API calls queued behind the concurrency cap", _stat(llm_gateway.stats, "waiting"))
+registry.callback("deanalyse_jobs_running", "Background upload jobs in progress", _stat(jobs.job_manager.stats, "running"))
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+def metrics():
+    """Prometheus scrape endpoint (text exposition format)"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
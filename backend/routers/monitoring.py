@@ -0,0 +1,35 @@
+import hmac
+from typing import Optional
+from fastapi import Header, HTTPException
+from config.performance import METRICS_PUBLIC, METRICS_TOKEN
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Guards /metrics and the /api/*/stats endpoints behind
+    "Authorization: Bearer <METRICS_TOKEN>". They stay closed when no token is
+    configured unless METRICS_PUBLIC=true opts out (local development).
+    """
+    if METRICS_PUBLIC:
+        return
+    # Security: Constant-time comparison; with no token configured nothing matches
+    if not METRICS_TOKEN or not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+
+def route_template(scope) -> str:
+    """
+    Path template of the route that handled a request, e.g. "/api/jobs/{job_id}".
+    The matched route only knows its own path_format, so the prefix of the
+    router it was included under is recovered from the request path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+    try:
+        concrete = template.format(**{name: str(value) for name, value in scope.get("path_params", {}).items()})
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope.get("path", "")
+    return path[:len(path) - len(concrete)] + template if path.endswith(concrete) else template
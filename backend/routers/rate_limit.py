@@ -0,0 +1,87 @@
+import math
+from typing import Dict, Optional, Tuple
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from services.metrics import RATE_LIMITED
+from services.rate_limiter import TokenBucketStore
+from config.security import RATE_LIMIT_UPLOAD, RATE_LIMIT_CHAT
+
+# (method, path) -> (bucket, requests per minute). Background upload jobs
+# spend from the upload bucket, and streamed chat from the chat bucket.
+RATE_LIMIT_RULES: Dict[Tuple[str, str], Tuple[str, int]] = {
+    ("POST", "/api/upload"): ("upload", RATE_LIMIT_UPLOAD),
+    ("POST", "/api/jobs"): ("upload", RATE_LIMIT_UPLOAD),
+    ("POST", "/api/chat"): ("chat", RATE_LIMIT_CHAT),
+    ("POST", "/api/chat/stream"): ("chat", RATE_LIMIT_CHAT),
+}
+
+
+def client_address(scope: Scope, trusted_proxies: int = 0) -> str:
+    """
+    The client's IP: the connecting address, or with `trusted_proxies`
+    proxies in front, the X-Forwarded-For entry the outermost one added.
+    """
+    peer = scope.get("client")
+    address = peer[0] if peer else "unknown"
+    if trusted_proxies:
+        forwarded = [part.strip() for part in Headers(scope=scope).get("x-forwarded-for", "").split(",") if part.strip()]
+        if len(forwarded) >= trusted_proxies:
+            address = forwarded[-trusted_proxies]
+    return address
+
+
+class RateLimitMiddleware:
+    """
+    Per-client token buckets for the expensive routes (upload, chat). Each
+    client may burst up to the per-minute limit and then continues at that
+    rate; excess requests get 429 with Retry-After before their body is read.
+    With a shared store the limits hold across all worker processes.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: TokenBucketStore,
+        rules: Dict[Tuple[str, str], Tuple[str, int]] = RATE_LIMIT_RULES,
+        trusted_proxies: int = 0
+    ):
+        self.app = app
+        self.store = store
+        self.rules = rules
+        self.trusted_proxies = trusted_proxies
+
+    def check(self, scope: Scope) -> Optional[float]:
+        """Seconds the client must wait, or None if the request may proceed."""
+        rule = self.rules.get((scope["method"], scope["path"]))
+        if rule is None:
+            return None
+        bucket, per_minute = rule
+        key = f"{bucket}:{client_address(scope, self.trusted_proxies)}"
+        try:
+            allowed, retry_after = self.store.take(key, rate=per_minute / 60, capacity=per_minute)
+        except OSError as e:
+            # Fail open: an unreadable state file must not take the API down
+            print(f"Rate limit store error: {e}")
+            return None
+        if allowed:
+            return None
+        RATE_LIMITED.inc(bucket=bucket)
+        return retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self.check(scope)
+        if retry_after is None:
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse(
+            {"detail": "Too many requests. Please try again later."},
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,23 @@
+import re
+import uuid
+from typing import Optional
+from fastapi import Header, HTTPException
+
+SESSION_HEADER = "X-Session-ID"
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+def get_session_id(x_session_id: Optional[str] = Header(None)) -> Optional[str]:
+    """
+    Reads the client's session ID from the X-Session-ID header.
+    """
+    if x_session_id is None:
+        return None
+    # Security: Session IDs are used as store keys, so only accept safe tokens
+    if not SESSION_ID_PATTERN.match(x_session_id):
+        raise HTTPException(status_code=400, detail="Invalid session ID")
+    return x_session_id
@@ -1,6 +1,21 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 from services.data_service import DataService
-from services.ai_service import AIService
+from services.ai_service import ai_service
+from services.ingest_service import IngestService, SpooledUpload, COMPRESSIONS
+from services.job_manager import Job, UPLOAD_STAGES
+from services.excel_reader import ExcelReader
+from services.profiling_executor import ProfilingExecutor
+from services.concurrency import run_blocking
+from services.dataset_store import DatasetStore, DatasetEntry
+from services.dataset_cache import DatasetDiskCache
+from services.sql_engine import SQLEngine, TableSource
+from services.cache import TTLCache
+from services.serialization import FastJSONResponse
+from routers.limits import RouteLimiter
+from routers.session import get_session_id, new_session_id
+from routers.monitoring import require_metrics_token
+from typing import Any, Dict, Optional, Tuple
+import hashlib
 import re
 import os
 import sys
@@ -9,17 +24,70 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.security import (
     MAX_FILE_SIZE_BYTES,
+    MAX_DECOMPRESSED_SIZE_BYTES,
     ALLOWED_FILE_EXTENSIONS,
-    MAX_FILENAME_LENGTH
+    ALLOWED_COMPRESSION_EXTENSIONS,
+    MAX_FILENAME_LENGTH,
+    SESSION_TIMEOUT_MINUTES,
+    MAX_DATA_RETENTION_HOURS
+)
+from config.performance import (
+    UPLOAD_CHUNK_SIZE_BYTES,
+    UPLOAD_CONCURRENCY,
+    ROUTE_QUEUE_TIMEOUT_SECONDS,
+    DATASET_STORE_MAX_BYTES,
+    DATASET_CACHE_DIR,
+    RESULT_CACHE_ENTRIES,
+    SESSION_MAX_TABLES
 )
 
 router = APIRouter()
 data_service = DataService()
-ai_service = AIService()
+profiling_executor = ProfilingExecutor()
+upload_limiter = RouteLimiter(UPLOAD_CONCURRENCY, ROUTE_QUEUE_TIMEOUT_SECONDS)
+
+# Per-session storage of uploaded data, bounded by memory budget and expiry
+dataset_store = DatasetStore(
+    max_bytes=DATASET_STORE_MAX_BYTES,
+    ttl_seconds=MAX_DATA_RETENTION_HOURS * 3600,
+    idle_seconds=SESSION_TIMEOUT_MINUTES * 60
+)
+# Columnar copies of uploads shared by every worker on the host
+dataset_cache = DatasetDiskCache(DATASET_CACHE_DIR, retention_seconds=MAX_DATA_RETENTION_HOURS * 3600)
+# Processed summaries by content hash, so repeat uploads skip profiling and the KPI call
+result_cache = TTLCache(RESULT_CACHE_ENTRIES, ttl_seconds=MAX_DATA_RETENTION_HOURS * 3600)
+
+async def load_session_dataset(session_id: Optional[str]) -> Optional[DatasetEntry]:
+    """
+    Returns the session's dataset, restoring it from the on-disk cache when
+    this worker has not seen it (restart, or upload handled by another worker).
+    """
+    if not session_id:
+        return None
+    entry = dataset_store.get(session_id)
+    if entry is not None:
+        return entry
+
+    dataset_id = dataset_cache.session_dataset(session_id)
+    summary = dataset_cache.load_summary(dataset_id) if dataset_id else None
+    if summary is None:
+        return None
+    df = await run_blocking(dataset_cache.load, dataset_id)
+    if df is None:
+        return None
+    return dataset_store.put(session_id, summary, df, dataset_id)
 
-# In-memory storage for simple context retention (replaced by DB in prod)
-# Key: session_id or 'latest', Value: Summary Dict
-DATA_CONTEXT = {}
+def session_tables(session_id: Optional[str], entry: DatasetEntry) -> Dict[str, TableSource]:
+    """
+    Tables SQL analysis can query for this session: each upload still in the
+    on-disk cache by table name (as Arrow file paths), plus the current
+    dataset's in-memory frame as "data" if it could not be persisted.
+    """
+    tables = dataset_cache.session_tables(session_id) if session_id else {}
+    sources: Dict[str, TableSource] = {name: dataset_cache.dataset_path(dataset_id) for name, dataset_id in tables.items()}
+    if entry.dataset_id not in tables.values():
+        sources["data"] = entry.df
+    return sources
 
 def sanitize_filename(filename: str) -> str:
     """
@@ -38,56 +106,154 @@ def sanitize_filename(filename: str) -> str:
     
     return filename
 
-@router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+def validate_upload(file: UploadFile) -> Tuple[str, str, Optional[str]]:
+    """
+    Returns the sanitized filename, its extension and its compression
+    ("gzip"/"zstd" for .csv.gz/.csv.zst, else None), rejecting disallowed
+    types. For compressed uploads the filename and extension are those of
+    the CSV inside.
+    """
+    # Security: Sanitize filename
+    safe_filename = sanitize_filename(file.filename or "upload.csv")
+    
+    # Compressed CSV: validate the inner file name
+    compression = None
+    stem, suffix = os.path.splitext(safe_filename)
+    if suffix.lower() in ALLOWED_COMPRESSION_EXTENSIONS:
+        compression = COMPRESSIONS[suffix.lower()]
+        if not IngestService.can_decompress(compression):
+            raise HTTPException(status_code=400, detail=f"{suffix} uploads are not supported on this server.")
+        if not stem.lower().endswith('.csv'):
+            raise HTTPException(status_code=400, detail="Only CSV files may be uploaded compressed.")
+        safe_filename = stem
+    
+    # Security: Validate file type
+    file_ext = '.' + safe_filename.split('.')[-1].lower() if '.' in safe_filename else ''
+    if file_ext not in ALLOWED_FILE_EXTENSIONS:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"File type not allowed. Please upload CSV or Excel files only."
+        )
+    return safe_filename, file_ext, compression
+
+async def spool(file: UploadFile, file_ext: str, compression: Optional[str] = None) -> SpooledUpload:
+    # Security: Limit file size and reject empty files while streaming
+    # the body to disk, so the upload is never buffered whole in memory
+    spooled = await IngestService.spool_upload(
+        file,
+        suffix=file_ext,
+        max_bytes=MAX_FILE_SIZE_BYTES,
+        chunk_size=UPLOAD_CHUNK_SIZE_BYTES
+    )
+    if compression is None:
+        return spooled
+    # The size limit above applies to the compressed body; this one to its content
     try:
-        # Security: Sanitize filename
-        safe_filename = sanitize_filename(file.filename or "upload.csv")
-        
-        # Security: Validate file type
-        file_ext = '.' + safe_filename.split('.')[-1].lower() if '.' in safe_filename else ''
-        if file_ext not in ALLOWED_FILE_EXTENSIONS:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"File type not allowed. Please upload CSV or Excel files only."
-            )
-        
-        # Security: Limit file size
-        content = await file.read()
-        if len(content) > MAX_FILE_SIZE_BYTES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum size is {MAX_FILE_SIZE_BYTES // (1024*1024)}MB."
-            )
-        
-        # Security: Validate content is not empty
-        if len(content) == 0:
-            raise HTTPException(status_code=400, detail="File is empty")
-        
-        # 1. Process File
-        df = data_service.read_file(content, safe_filename)
+        return await run_blocking(
+            IngestService.decompress,
+            spooled,
+            compression,
+            suffix=file_ext,
+            max_bytes=MAX_DECOMPRESSED_SIZE_BYTES,
+            chunk_size=UPLOAD_CHUNK_SIZE_BYTES
+        )
+    finally:
+        IngestService.discard(spooled.path)
+
+async def process_upload(
+    job: Job,
+    spooled: SpooledUpload,
+    safe_filename: str,
+    file_ext: str,
+    sheet: Optional[str],
+    session_id: str
+) -> Dict[str, Any]:
+    """
+    Upload pipeline: parse (profiled chunk by chunk) -> anomalies -> KPIs.
+    Each stage is timed on `job` and its output published there as soon as it
+    is ready, so the statistical summary never waits on the slower stages.
+    """
+    # Excel: list sheets from workbook metadata; `sheet` picks one ("*" stacks all)
+    sheets = None
+    if file_ext in ('.xlsx', '.xls'):
+        sheets = await run_blocking(ExcelReader.list_sheets, spooled.path, safe_filename)
+    elif sheet is not None:
+        raise ValueError("Sheet selection is only supported for Excel files.")
+    
+    # Identical bytes were processed before: reuse the summary, anomalies
+    # and KPI suggestions, and reload the columnar copy instead of re-parsing
+    dataset_id = spooled.sha256
+    if sheet is not None:
+        dataset_id = hashlib.sha256(f"{spooled.sha256}:{sheet}".encode()).hexdigest()
+    job.publish(filename=safe_filename, session_id=session_id, dataset_id=dataset_id, sheets=sheets)
+    summary = result_cache.get(dataset_id) or dataset_cache.load_summary(dataset_id)
+    if summary is not None:
+        cache_status = "hit"
+        with job.stage("parse"):
+            df = await run_blocking(dataset_cache.load, dataset_id)
+            if df is None:
+                df, _ = await run_blocking(data_service.load_file, spooled.path, safe_filename, sheet=sheet, sheets=sheets)
+        job.skip("profile", "anomalies", "kpis")
+        result_cache.set(dataset_id, summary)
+        dataset_store.put(session_id, summary, df, dataset_id)
+        job.publish(summary=summary)
+    else:
+        cache_status = "miss"
         
-        # 2. Generate Summary
-        summary = data_service.get_summary(df)
+        # 1. Process File (parse, then compact dtypes) and 2. Generate Summary
+        # from the chunks as they are parsed, instead of re-reading the frame
+        with job.stage("parse"):
+            df, memory_report, summary = await run_blocking(data_service.ingest, spooled.path, safe_filename, sheet=sheet, sheets=sheets)
+        job.skip("profile", status="done")
+        summary['memory'] = memory_report
+        job.publish(summary=summary)
         
-        # 3. Detect Anomalies
-        anomalies = data_service.detect_anomalies(df)
+        # 3. Detect Anomalies on the profiling pool
+        with job.stage("anomalies"):
+            anomalies = await profiling_executor.detect_anomalies(df)
+        job.publish(anomalies=anomalies)
         summary['anomalies'] = anomalies
         
-        # 4. Save Context (Simulated Session)
-        DATA_CONTEXT['latest'] = summary
-        DATA_CONTEXT['df'] = df
+        # 4. Save Context for this session
+        dataset_store.put(session_id, summary, df, dataset_id)
         
         # 5. Get AI KPI Suggestions
         # This is async, so we await it
-        kpi_suggestions = await ai_service.suggest_kpis(summary)
+        with job.stage("kpis"):
+            kpi_suggestions = await ai_service.suggest_kpis(summary)
         summary['ai_kpis'] = kpi_suggestions
-        
-        return {
-            "message": "File processed successfully",
-            "filename": safe_filename,
-            "summary": summary
-        }
+        result_cache.set(dataset_id, summary)
+    
+    # 6. Persist a columnar copy so any worker can reload it without re-parsing
+    # (queryable by SQL analysis under `table`, alongside the session's earlier uploads)
+    table = SQLEngine.table_name(safe_filename, sheet)
+    if await run_blocking(dataset_cache.save, dataset_id, df, summary):
+        dataset_cache.bind_session(session_id, dataset_id, table=table, max_tables=SESSION_MAX_TABLES)
+    
+    return {
+        "message": "File processed successfully",
+        "filename": safe_filename,
+        "session_id": session_id,
+        "dataset_id": dataset_id,
+        "table": table,
+        "cache": cache_status,
+        "sheets": sheets,
+        "summary": summary
+    }
+
+@router.post("/upload", dependencies=[Depends(upload_limiter)])
+async def upload_file(
+    file: UploadFile = File(...),
+    sheet: Optional[str] = Form(None, max_length=255),
+    session_id: Optional[str] = Depends(get_session_id)
+):
+    spooled = None
+    session_id = session_id or new_session_id()
+    try:
+        safe_filename, file_ext, compression = validate_upload(file)
+        spooled = await spool(file, file_ext, compression)
+        result = await process_upload(Job(UPLOAD_STAGES), spooled, safe_filename, file_ext, sheet, session_id)
+        return FastJSONResponse(result)
         
     except HTTPException:
         raise  # Re-raise HTTP exceptions
@@ -97,8 +263,20 @@ async def upload_file(file: UploadFile = File(...)):
         # Security: Don't expose internal errors
         print(f"Error processing file: {str(e)}")  # Log internally
         raise HTTPException(status_code=500, detail="An error occurred processing your file")
+    finally:
+        if spooled:
+            IngestService.discard(spooled.path)
 
 @router.get("/context")
-def get_context():
+def get_context(session_id: Optional[str] = Depends(get_session_id)):
     """Debug endpoint to see current stored context"""
-    return DATA_CONTEXT.get('latest', {})
+    entry = dataset_store.get(session_id) if session_id else None
+    return FastJSONResponse(entry.summary if entry else {})
+
+@router.get("/context/stats", dependencies=[Depends(require_metrics_token)])
+def get_context_stats():
+    """Dataset store and result cache occupancy and hit/miss/eviction counters"""
+    return {
+        "datasets": dataset_store.stats(),
+        "results": result_cache.stats()
+    }
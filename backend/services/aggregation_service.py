@@ -0,0 +1,163 @@
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional
+from config.performance import AGGREGATE_MAX_GROUPS, AGGREGATE_MAX_BUCKETS
+
+AGGREGATIONS = ("sum", "mean", "median", "min", "max", "count")
+TIME_BUCKETS = {
+    "hour": ("h", 3600),
+    "day": ("D", 86400),
+    "week": ("W", 7 * 86400),
+    "month": ("MS", 28 * 86400),
+    "quarter": ("QS", 90 * 86400),
+    "year": ("YS", 365 * 86400),
+}
+
+
+def _json_value(value: Any) -> Any:
+    # Group keys and aggregates come back as numpy/pandas scalars
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+        return None if isinstance(value, float) and np.isnan(value) else value
+    if isinstance(value, (int, float, str, bool)):
+        return value
+    return str(value)
+
+
+class AggregationService:
+    """
+    Pre-aggregates a stored DataFrame into small chart-ready series, so the
+    dashboard receives a few hundred points at most instead of every row.
+    Queries are plain dicts (see routers/datasets.py for the request model).
+    """
+
+    @staticmethod
+    def _column(df: pd.DataFrame, name: Optional[str]) -> Any:
+        # Excel headers may be non-string labels; match on their string form
+        for col in df.columns:
+            if str(col) == name:
+                return col
+        raise ValueError(f"Unknown column: {name}")
+
+    @staticmethod
+    def _numeric(series: pd.Series) -> pd.Series:
+        if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+            raise ValueError(f"Column '{series.name}' is not numeric")
+        return series
+
+    @staticmethod
+    def _series(keys: pd.Index, values: pd.Series) -> List[Dict[str, Any]]:
+        return [{"key": _json_value(k), "value": _json_value(v)} for k, v in zip(keys, values.tolist())]
+
+    @staticmethod
+    def _grouped(df: pd.DataFrame, key: pd.Series, value_col: Any, agg: str) -> pd.Series:
+        if value_col is None:
+            return key.groupby(key, observed=True, dropna=False).size()
+        if agg == "count":
+            return df[value_col].groupby(key, observed=True, dropna=False).count()
+        values = AggregationService._numeric(df[value_col])
+        return values.groupby(key, observed=True, dropna=False).agg(agg)
+
+    @staticmethod
+    def group_by(df: pd.DataFrame, column: str, value: Optional[str], agg: str, limit: int) -> Dict[str, Any]:
+        """Aggregate per category, in key order, capped at `limit` groups."""
+        key = df[AggregationService._column(df, column)]
+        value_col = AggregationService._column(df, value) if value else None
+        grouped = AggregationService._grouped(df, key, value_col, agg)
+        try:
+            grouped = grouped.sort_index()
+        except TypeError:
+            pass  # Mixed key types keep first-seen order
+        return {
+            "series": AggregationService._series(grouped.index[:limit], grouped.iloc[:limit]),
+            "groups": len(grouped),
+            "truncated": len(grouped) > limit,
+        }
+
+    @staticmethod
+    def top_n(df: pd.DataFrame, column: str, value: Optional[str], agg: str, limit: int) -> Dict[str, Any]:
+        """Largest `limit` groups; additive aggregates also report the remainder."""
+        key = df[AggregationService._column(df, column)]
+        value_col = AggregationService._column(df, value) if value else None
+        grouped = AggregationService._grouped(df, key, value_col, agg)
+        top = grouped.nlargest(limit)
+        result = {
+            "series": AggregationService._series(top.index, top),
+            "groups": len(grouped),
+            "truncated": len(grouped) > limit,
+        }
+        if len(grouped) > limit and (agg in ("sum", "count") or value_col is None):
+            result["other"] = _json_value(grouped.sum() - top.sum())
+        return result
+
+    @staticmethod
+    def time_series(df: pd.DataFrame, column: str, value: Optional[str], agg: str, interval: str) -> Dict[str, Any]:
+        """Resample into calendar buckets of `interval` (hour ... year)."""
+        if interval not in TIME_BUCKETS:
+            raise ValueError(f"Unsupported interval: {interval}")
+        dates = df[AggregationService._column(df, column)]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                dates = pd.to_datetime(dates, errors='coerce')
+        if dates.notna().sum() == 0:
+            raise ValueError(f"Column '{column}' does not contain dates")
+
+        freq, seconds = TIME_BUCKETS[interval]
+        buckets = int((dates.max() - dates.min()).total_seconds() // seconds) + 1  # Upper bound
+        if buckets > AGGREGATE_MAX_BUCKETS:
+            raise ValueError(f"Too many time buckets ({buckets}); choose a coarser interval")
+
+        value_col = AggregationService._column(df, value) if value else None
+        if value_col is None:
+            values = pd.Series(1, index=dates.index)
+        else:
+            values = df[value_col] if agg == "count" else AggregationService._numeric(df[value_col])
+        valid = dates.notna().to_numpy()
+        resampled = pd.Series(values.to_numpy()[valid], index=pd.DatetimeIndex(dates[valid])).resample(freq)
+        grouped = resampled.count() if value_col is None or agg == "count" else resampled.agg(agg)
+        return {"series": AggregationService._series(grouped.index, grouped), "buckets": len(grouped)}
+
+    @staticmethod
+    def histogram(df: pd.DataFrame, column: str, bins: int) -> Dict[str, Any]:
+        """Equal-width bins over the finite values of a numeric column."""
+        series = AggregationService._numeric(df[AggregationService._column(df, column)])
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return {"bins": [], "count": 0}
+        counts, edges = np.histogram(values, bins=bins)
+        return {
+            "bins": [
+                {"start": float(edges[i]), "end": float(edges[i + 1]), "count": int(counts[i])}
+                for i in range(len(counts))
+            ],
+            "count": int(len(values)),
+        }
+
+    @staticmethod
+    def aggregate(df: pd.DataFrame, query: Dict[str, Any]) -> Dict[str, Any]:
+        kind = query["kind"]
+        agg = query.get("agg", "sum")
+        if agg not in AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation: {agg}")
+        limit = min(query.get("limit", 20), AGGREGATE_MAX_GROUPS)
+
+        if kind == "groupby":
+            result = AggregationService.group_by(df, query["column"], query.get("value"), agg, limit)
+        elif kind == "topn":
+            result = AggregationService.top_n(df, query["column"], query.get("value"), agg, limit)
+        elif kind == "timeseries":
+            result = AggregationService.time_series(df, query["column"], query.get("value"), agg, query.get("interval", "day"))
+        elif kind == "histogram":
+            result = AggregationService.histogram(df, query["column"], query.get("bins", 20))
+        else:
+            raise ValueError(f"Unsupported aggregate kind: {kind}")
+
+        result["query"] = query
+        return result
@@ -1,21 +1,38 @@
-from openai import OpenAI
-import os
 import json
+import time
+import functools
 import pandas as pd
-import traceback
-import io
-import sys
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from services.concurrency import run_blocking
+from services.cache import TTLCache, SingleFlight
+from services.sandbox import sandbox_pool, run_analysis_code
+from services.sql_engine import sql_engine, TableSource
+from services.metrics import ANALYSIS_SECONDS
+from services.llm_gateway import LLMGateway, llm_gateway
+from config.performance import (
+    RESPONSE_CACHE_ENTRIES,
+    RESPONSE_CACHE_TTL_SECONDS,
+    PLAN_CACHE_ENTRIES,
+    PLAN_CACHE_TTL_SECONDS,
+    ANALYSIS_SANDBOX_ENABLED,
+    ANALYSIS_ENGINE
+)
+import hashlib
 
 class AIService:
-    def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            print("Warning: OPENAI_API_KEY not found. AI features will not work.")
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=api_key)
-            self.model = "gpt-4o"
+    def __init__(self, gateway: Optional[LLMGateway] = None):
+        # Response cache for answers keyed by (dataset fingerprint, normalized question)
+        self.response_cache = TTLCache(RESPONSE_CACHE_ENTRIES, ttl_seconds=RESPONSE_CACHE_TTL_SECONDS)
+        self.response_flights = SingleFlight()
+        # Validated analysis code keyed by (schema fingerprint, normalized question)
+        self.plan_cache = TTLCache(PLAN_CACHE_ENTRIES, ttl_seconds=PLAN_CACHE_TTL_SECONDS)
+        # Model calls share the process-wide gateway (pooled client, concurrency cap, retries)
+        self.llm = gateway or llm_gateway
+        # "sql" has the model query the session's tables through DuckDB instead of writing pandas
+        self.analysis_engine = ANALYSIS_ENGINE
+        if self.analysis_engine == "sql" and not sql_engine.available:
+            print("Warning: duckdb not installed. Falling back to pandas analysis.")
+            self.analysis_engine = "pandas"
 
     def _sanitize_input(self, text: str) -> str:
         """
@@ -80,45 +97,243 @@ class AIService:
             return code
         return ""
 
-    def _execute_analysis_code(self, code: str, df: pd.DataFrame) -> Any:
+    def _extract_sql_code(self, text: str) -> str:
+        """
+        Extracts a SQL query from markdown blocks.
+        """
+        if "```sql" in text:
+            return text.split("```sql")[1].split("```")[0].strip()
+        elif "```" in text:
+            return text.split("```")[1].split("```")[0].strip()
+        return ""
+
+    def _execute_analysis_code(self, code: str, df: pd.DataFrame, dataset_id: Optional[str] = None) -> Any:
         """
         Executes generated Python code on the dataframe.
+        Runs in the sandbox worker pool (time/memory limited, isolated from the
+        API process) unless ANALYSIS_SANDBOX_ENABLED is off.
         """
-        try:
-            # Create a localized environment
-            local_vars = {"df": df, "pd": pd, "result": None}
-            
-            # wrapper to capture print output
-            old_stdout = sys.stdout
-            redirected_output = io.StringIO()
-            sys.stdout = redirected_output
-            
-            # Execute the code
-            # We expect the code to define a function analyze_data(df) or set a variable 'result'
-            exec(code, local_vars)
-            
-            sys.stdout = old_stdout
-            captured_output = redirected_output.getvalue()
-            
-            # Check if analyze_data function exists and call it
-            if "analyze_data" in local_vars:
-                result = local_vars["analyze_data"](df)
-                return f"Analysis Result: {result}\nOutput: {captured_output}"
-            elif "result" in local_vars and local_vars["result"] is not None:
-                return f"Analysis Result: {local_vars['result']}\nOutput: {captured_output}"
-            else:
-                return f"Code executed but no result returned. Output: {captured_output}"
-                
-        except Exception as e:
-            return f"Error executing code: {str(e)}\n{traceback.format_exc()}"
+        start = time.perf_counter()
+        if ANALYSIS_SANDBOX_ENABLED:
+            result = sandbox_pool.run(code, df, dataset_id)
+        else:
+            result = run_analysis_code(code, df)
+        outcome = "error" if self._execution_failed(result) else "ok"
+        ANALYSIS_SECONDS.observe(time.perf_counter() - start, engine="pandas", outcome=outcome)
+        return result
+
+    def _execute_sql_code(self, code: str, tables: Dict[str, TableSource]) -> str:
+        """
+        Executes a generated SELECT over the session's tables with DuckDB
+        (multi-threaded, reads the memory-mapped Arrow copies directly).
+        """
+        start = time.perf_counter()
+        result = sql_engine.run(code, tables)
+        outcome = "error" if self._execution_failed(result) else "ok"
+        ANALYSIS_SECONDS.observe(time.perf_counter() - start, engine="sql", outcome=outcome)
+        return result
+
+    def _use_sql(self, tables: Optional[Dict[str, TableSource]]) -> bool:
+        return self.analysis_engine == "sql" and bool(tables)
+
+    def _answer_key(self, dataset_id: str, query: str, tables: Optional[Dict[str, TableSource]] = None) -> tuple:
+        # SQL answers may join any table in the session, so the table set is part of the key
+        sources = ()
+        if self._use_sql(tables):
+            sources = tuple(sorted((name, src) for name, src in tables.items() if isinstance(src, str)))
+        return (dataset_id, sources, self._normalize_query(self._sanitize_input(query)))
+
+    @staticmethod
+    def _sql_plan_prompt(safe_query: str, safe_context: str, schema: str) -> str:
+        return f"""You are a SQL Data Analyst. 
+User Question: {safe_query}
+Data Summary: 
+{safe_context}
+
+Tables (DuckDB SQL types):
+{schema}
+
+Determine if you need to run a SQL query on these tables to answer this question.
+
+CRITICAL: Questions asking for "insights", "summary", "trends", "patterns", "overview", "top products", "revenue", or "performance" ALMOST ALWAYS REQUIRE A QUERY to calculate the actual metrics. 
+Only simple questions about the number of rows or column names do not require a query.
+
+If YES (you need a query):
+Write ONE DuckDB SQL SELECT statement (CTEs with WITH are fine) that returns the answer.
+- Use only the tables listed above; JOIN them on shared key columns when the question spans several files.
+- Always double-quote column names, e.g. "Order Date".
+- Use date_trunc('month', "Date") for monthly trends.
+- Aggregate in SQL and return a compact result (at most a few hundred rows).
+- Wrap the query in ```sql ... ```.
+
+If NO (you don't need a query):
+Just answer the user question directly based on the summary provided.
+"""
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """
+        Canonical form of a question for cache lookups.
+        """
+        return " ".join(query.lower().split()).rstrip("?!. ")
 
-    async def generate_response(self, context: str, query: str, df: pd.DataFrame = None) -> str:
+    @staticmethod
+    def _column_kind(dtype: Any) -> str:
+        """
+        Coarse column type for plan caching. Exact dtypes vary between uploads
+        of the same data (int vs float with gaps, category vs plain text).
+        """
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return "datetime"
+        if pd.api.types.is_numeric_dtype(dtype):
+            return "numeric"
+        return "text"
+
+    def _plan_key(self, df: pd.DataFrame, safe_query: str) -> tuple:
+        """
+        Cache key for generated code: column names and kinds plus the question,
+        so a new upload with the same shape reuses the same analysis.
+        """
+        schema = "\n".join(f"{col}:{self._column_kind(dtype)}" for col, dtype in df.dtypes.items())
+        return (hashlib.sha256(schema.encode()).hexdigest(), self._normalize_query(safe_query))
+
+    @staticmethod
+    def _execution_failed(execution_result: str) -> bool:
+        return execution_result.startswith("Error executing code:")
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {
+            "responses": self.response_cache.stats(),
+            "plans": self.plan_cache.stats(),
+            "sandbox": sandbox_pool.stats(),
+            "coalescing": self.response_flights.stats(),
+            "llm": self.llm.stats(),
+        }
+
+    async def generate_response(
+        self,
+        context: str,
+        query: str,
+        df: pd.DataFrame = None,
+        dataset_id: Optional[str] = None,
+        tables: Optional[Dict[str, TableSource]] = None
+    ) -> str:
         """
         Generates a text response from OpenAI. If df is provided, it may generate and execute code.
+        In SQL mode the code is a query over `tables` (table name -> Arrow file or DataFrame).
+        When `dataset_id` is given, answers are cached per (dataset, normalized question) and
+        concurrent identical questions share a single upstream call.
         """
-        if not self.client:
+        if not self.llm.available:
             return "AI Service is not configured (Missing API Key)."
-        
+
+        try:
+            if dataset_id is None:
+                answer, _ = await self._generate_response(context, query, df, dataset_id, tables)
+                return answer
+
+            key = self._answer_key(dataset_id, query, tables)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+
+            async def compute() -> str:
+                answer, cacheable = await self._generate_response(context, query, df, dataset_id, tables)
+                if cacheable:
+                    self.response_cache.set(key, answer)
+                return answer
+
+            return await self.response_flights.do(key, compute)
+        except Exception as e:
+            return f"Error processing request: {str(e)}"
+
+    async def stream_response(
+        self,
+        context: str,
+        query: str,
+        df: pd.DataFrame = None,
+        dataset_id: Optional[str] = None,
+        tables: Optional[Dict[str, TableSource]] = None
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Streaming variant of `generate_response`. Yields phase events
+        ("planning", "executing"), answer "token" deltas as they arrive from
+        the model, then "done" (or "error").
+        """
+        if not self.llm.available:
+            yield {"event": "token", "data": "AI Service is not configured (Missing API Key)."}
+            yield {"event": "done"}
+            return
+
+        key = self._answer_key(dataset_id, query, tables) if dataset_id else None
+        cached = self.response_cache.get(key) if key else None
+        if cached is not None:
+            yield {"event": "token", "data": cached}
+            yield {"event": "done"}
+            return
+
+        parts, cacheable = [], True
+        try:
+            async for event in self._answer_events(context, query, df, dataset_id, tables, stream=True):
+                if event["event"] == "degraded":
+                    cacheable = False
+                    continue
+                if event["event"] == "token":
+                    parts.append(event["data"])
+                yield event
+        except Exception as e:
+            yield {"event": "error", "data": f"Error processing request: {str(e)}"}
+            return
+
+        answer = "".join(parts)
+        if key and cacheable and answer.strip():
+            self.response_cache.set(key, answer)
+        yield {"event": "done"}
+
+    async def _generate_response(
+        self,
+        context: str,
+        query: str,
+        df: pd.DataFrame = None,
+        dataset_id: Optional[str] = None,
+        tables: Optional[Dict[str, TableSource]] = None
+    ) -> Tuple[str, bool]:
+        """The answer, and whether it may be cached (see `_answer_events`)."""
+        parts, cacheable = [], True
+        async for event in self._answer_events(context, query, df, dataset_id, tables, stream=False):
+            if event["event"] == "token":
+                parts.append(event["data"])
+            elif event["event"] == "degraded":
+                cacheable = False
+        answer = "".join(parts)
+        return answer, cacheable and bool(answer.strip())
+
+    async def _complete(self, stream: bool, operation: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Yields the completion text, as token deltas when streaming or as one piece otherwise.
+        """
+        if not stream:
+            response = await self.llm.chat(operation, **kwargs)
+            yield response.choices[0].message.content
+            return
+        async for delta in self.llm.stream(operation, **kwargs):
+            yield delta
+
+    async def _answer_events(
+        self,
+        context: str,
+        query: str,
+        df: pd.DataFrame = None,
+        dataset_id: Optional[str] = None,
+        tables: Optional[Dict[str, TableSource]] = None,
+        stream: bool = False
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Runs the plan / execute / synthesize chain, yielding a "planning" and
+        "executing" event as each phase starts and "token" events for the answer.
+        A "degraded" event marks an answer that must not be cached: one built
+        from failed code, or the fallback reply after the analysis flow failed.
+        """
         # SECURITY: Sanitize inputs
         safe_query = self._sanitize_input(query)
         safe_context = self._sanitize_context(context)
@@ -127,9 +342,13 @@ class AIService:
         # 1. If df is available, ask AI if it needs to run code.
         # 2. If yes, generate code, execute, and feed result back.
         # 3. If no (or no df), use standard text generation.
+        synthesis = None
+        use_sql = self._use_sql(tables)
         
-        if df is not None:
+        if df is not None or use_sql:
              # Phase 1: Planning / Code Generation
+             language, extract_code = "python", self._extract_python_code
+             execute = functools.partial(self._execute_analysis_code, df=df, dataset_id=dataset_id)
              plan_prompt = f"""You are a Python Data Analyst. 
 User Question: {safe_query}
 Data Schema: 
@@ -160,24 +379,57 @@ If NO (you don't need code):
 Just answer the user question directly based on the summary provided.
 """
              try:
-                 response1 = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": plan_prompt}],
-                    temperature=0.1 # Lower temp for code
-                 )
-                 content1 = response1.choices[0].message.content
+                 if use_sql:
+                     # Same flow, but the model writes one SELECT over the session's tables
+                     schema = await run_blocking(sql_engine.describe, tables)
+                     plan_prompt = self._sql_plan_prompt(safe_query, safe_context, schema)
+                     language, extract_code = "sql", self._extract_sql_code
+                     execute = functools.partial(self._execute_sql_code, tables=tables)
+                     plan_key = (hashlib.sha256(schema.encode()).hexdigest(), self._normalize_query(safe_query), "sql")
+                 else:
+                     plan_key = self._plan_key(df, safe_query)
                  
-                 code = self._extract_python_code(content1)
+                 # A validated plan for the same schema and question skips the planning call
+                 code = self.plan_cache.get(plan_key)
+                 execution_result = None
                  
                  if code:
-                     # Phase 2: Execution
-                     execution_result = self._execute_analysis_code(code, df)
+                     yield {"event": "executing"}
+                     execution_result = await run_blocking(execute, code)
+                     if self._execution_failed(execution_result):
+                         self.plan_cache.discard(plan_key)
+                         code = None
+                 
+                 if not code:
+                     yield {"event": "planning"}
+                     response1 = await self.llm.chat(
+                        "plan",
+                        messages=[{"role": "user", "content": plan_prompt}],
+                        temperature=0.1 # Lower temp for code
+                     )
+                     content1 = response1.choices[0].message.content
+                     
+                     code = extract_code(content1)
                      
-                     # Phase 3: Synthesis
-                     final_prompt = f"""User Question: {safe_query}
+                     if not code:
+                         # No code generated, just use the first response if it looks like an answer
+                         yield {"event": "token", "data": content1}
+                         return
                      
+                     # Phase 2: Execution
+                     yield {"event": "executing"}
+                     execution_result = await run_blocking(execute, code)
+                     if not self._execution_failed(execution_result):
+                         self.plan_cache.set(plan_key, code)
+                 
+                 if self._execution_failed(execution_result):
+                     yield {"event": "degraded"}
+
+                 # Phase 3: Synthesis
+                 final_prompt = f"""User Question: {safe_query}
+                 
 I ran the following analysis code:
-```python
+```{language}
 {code}
 ```
 
@@ -187,21 +439,29 @@ The execution result was:
 Please provide a natural language answer to the user based on this result. Be concise, professional, and helpful. 
 Do not mention "I ran the code" or technical details unless asked. Just give the business insight/answer.
 """
-                     response2 = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=[{"role": "user", "content": final_prompt}],
-                        temperature=0.7
-                     )
-                     return response2.choices[0].message.content
-                     
-                 else:
-                     # No code generated, just use the first response if it looks like an answer
-                     return content1
+                 synthesis = {
+                    "messages": [{"role": "user", "content": final_prompt}],
+                    "temperature": 0.7
+                 }
                      
              except Exception as e:
                  print(f"Error in AI analysis flow: {e}")
                  # Fallback to standard flow if code generation fails
-                 pass
+                 yield {"event": "degraded"}
+
+        if synthesis is not None:
+            emitted = False
+            try:
+                async for delta in self._complete(stream, "synthesis", **synthesis):
+                    emitted = True
+                    yield {"event": "token", "data": delta}
+                return
+            except Exception as e:
+                if emitted:
+                    raise
+                print(f"Error in AI analysis flow: {e}")
+                # Fallback to standard flow if synthesis fails before any output
+                yield {"event": "degraded"}
 
         # Standard flow (Fallback or no DF)
         system_prompt = """You are a business analyst helping a small business owner understand their data.
@@ -214,26 +474,23 @@ If you don't have enough data to answer precisely, admit it but try to give gene
 
 User Question: {safe_query}"""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"Error processing request: {str(e)}"
+        standard = {
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 500
+        }
+        async for delta in self._complete(stream, "answer", **standard):
+            yield {"event": "token", "data": delta}
 
     async def suggest_kpis(self, data_summary: Dict[str, Any]) -> List[Dict[str, str]]:
         """
         Suggests relevant KPIs based on the dataset structure.
         Returns a JSON list of KPIs.
         """
-        if not self.client:
+        if not self.llm.available:
             return []
 
         # Simplify summary for the prompt to save tokens/avoid clutter
@@ -248,8 +505,8 @@ Return ONLY a JSON array of objects with 'title', 'value_type' (e.g. currency, p
 Do not include markdown formatting or backticks. Just the raw JSON."""
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self.llm.chat(
+                "kpis",
                 messages=[
                     {"role": "system", "content": "You are a data analyst. Return only valid JSON, no markdown."},
                     {"role": "user", "content": prompt}
@@ -271,3 +528,7 @@ Do not include markdown formatting or backticks. Just the raw JSON."""
         except Exception as e:
             print(f"Error generating KPIs: {e}")
             return []
+
+
+# Shared by the upload and chat routers
+ai_service = AIService()
@@ -0,0 +1,395 @@
+import warnings
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+from config.performance import (
+    SUMMARY_STATS_MODE,
+    KLL_K,
+    ANOMALY_METHODS,
+    ANOMALY_CHUNK_ROWS,
+    ANOMALY_MAX_ROWS,
+    ANOMALY_MIN_VALUES,
+    ANOMALY_ROLLING_WINDOW
+)
+from services.sketches import KLLSketch
+
+# Every detector scores a block of shape (rows, numeric columns) as float64,
+# with NaN for missing values. Severity is |deviation| / threshold, so a cell
+# is anomalous when its severity is > 1 and NaN means "not scored".
+
+
+class _BlockQuantiles:
+    """
+    Column-wise quantiles over a stream of blocks. Exact mode keeps the
+    blocks and takes each column's nanquantile in turn; approximate mode keeps
+    a KLL sketch per column so memory stays bounded across chunks.
+    """
+
+    def __init__(self, columns: int, exact: bool):
+        self.exact = exact
+        self.blocks: List[np.ndarray] = []
+        self.sketches = [KLLSketch(KLL_K, seed=i) for i in range(columns)] if not exact else []
+
+    def update(self, block: np.ndarray) -> None:
+        if self.exact:
+            self.blocks.append(block)
+            return
+        for j, sketch in enumerate(self.sketches):
+            values = block[:, j]
+            sketch.update(values[~np.isnan(values)])
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Returns an array of shape (len(qs), columns)."""
+        if self.exact:
+            result = np.empty((len(qs), self.blocks[0].shape[1] if self.blocks else 0))
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # All-NaN columns
+                for j in range(result.shape[1]):
+                    result[:, j] = np.nanquantile(np.concatenate([block[:, j] for block in self.blocks]), qs)
+            self.blocks = []
+            return result
+        result = [sketch.quantiles(list(qs)) for sketch in self.sketches]
+        return np.array([[np.nan if v is None else v for v in col] for col in result]).T.reshape(len(qs), -1)
+
+
+class Detector(ABC):
+    name = ""
+    reason = ""
+    passes = 0  # Fit passes over the data before scoring
+
+    def start(self, columns: int, exact: bool) -> None:
+        self.count = np.zeros(columns, dtype="int64")
+
+    def fit(self, block: np.ndarray, pass_index: int) -> None:
+        pass
+
+    def end_pass(self, pass_index: int) -> None:
+        pass
+
+    @abstractmethod
+    def severity(self, block: np.ndarray) -> np.ndarray:
+        """Per-value severity for a float64 block; values above 1 are anomalies"""
+
+    def _usable(self, scale: np.ndarray) -> np.ndarray:
+        return (self.count >= ANOMALY_MIN_VALUES) & (scale > 0)
+
+
+class ZScoreDetector(Detector):
+    name = "zscore"
+    reason = "Z-Score > 3 (Statistical Outlier)"
+    passes = 1
+
+    def __init__(self, threshold: float = 3.0):
+        self.threshold = threshold
+
+    def start(self, columns: int, exact: bool) -> None:
+        super().start(columns, exact)
+        self.mean = np.zeros(columns)
+        self.m2 = np.zeros(columns)
+
+    def fit(self, block: np.ndarray, pass_index: int) -> None:
+        # Chan's parallel update, for every column at once
+        valid = ~np.isnan(block)
+        n_b = valid.sum(axis=0)
+        deviation = np.where(valid, block, 0.0)
+        mean_b = np.divide(deviation.sum(axis=0), n_b, out=np.zeros(block.shape[1]), where=n_b > 0)
+        deviation -= mean_b
+        deviation[~valid] = 0.0
+        m2_b = np.einsum("ij,ij->j", deviation, deviation)
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        ratio = np.divide(n_b, n, out=np.zeros(block.shape[1]), where=n > 0)
+        self.mean += delta * ratio
+        self.m2 += m2_b + delta ** 2 * self.count * ratio
+        self.count = n
+
+    def end_pass(self, pass_index: int) -> None:
+        std = np.sqrt(np.divide(self.m2, self.count - 1, out=np.zeros_like(self.m2), where=self.count > 1))
+        self.scale = np.where(self._usable(std), std * self.threshold, np.nan)
+
+    def severity(self, block: np.ndarray) -> np.ndarray:
+        return np.abs(block - self.mean) / self.scale
+
+
+class MADDetector(Detector):
+    """Robust z-score: deviation from the median in units of 1.4826 * MAD."""
+    name = "mad"
+    reason = "Robust Z-Score (MAD) > 3.5"
+    passes = 2
+
+    def __init__(self, threshold: float = 3.5):
+        self.threshold = threshold
+
+    def start(self, columns: int, exact: bool) -> None:
+        super().start(columns, exact)
+        self.exact = exact
+        self.values = _BlockQuantiles(columns, exact)
+
+    def fit(self, block: np.ndarray, pass_index: int) -> None:
+        if pass_index == 0:
+            self.count += (~np.isnan(block)).sum(axis=0)
+            self.values.update(block)
+        else:
+            self.deviations.update(np.abs(block - self.median))
+
+    def end_pass(self, pass_index: int) -> None:
+        if pass_index == 0:
+            self.median = self.values.quantiles([0.5])[0]
+            self.deviations = _BlockQuantiles(len(self.median), self.exact)
+            self.values = None
+        else:
+            mad = self.deviations.quantiles([0.5])[0] * 1.4826
+            self.scale = np.where(self._usable(mad), mad * self.threshold, np.nan)
+
+    def severity(self, block: np.ndarray) -> np.ndarray:
+        return np.abs(block - self.median) / self.scale
+
+
+class IQRDetector(Detector):
+    """Tukey fences: below Q1 - 1.5*IQR or above Q3 + 1.5*IQR."""
+    name = "iqr"
+    reason = "Outside 1.5x IQR fences"
+    passes = 1
+
+    def __init__(self, multiplier: float = 1.5):
+        self.multiplier = multiplier
+
+    def start(self, columns: int, exact: bool) -> None:
+        super().start(columns, exact)
+        self.values = _BlockQuantiles(columns, exact)
+
+    def fit(self, block: np.ndarray, pass_index: int) -> None:
+        self.count += (~np.isnan(block)).sum(axis=0)
+        self.values.update(block)
+
+    def end_pass(self, pass_index: int) -> None:
+        self.q1, self.q3 = self.values.quantiles([0.25, 0.75])
+        iqr = self.q3 - self.q1
+        self.scale = np.where(self._usable(iqr), iqr * self.multiplier, np.nan)
+        self.values = None
+
+    def severity(self, block: np.ndarray) -> np.ndarray:
+        # Distance past the nearer quartile, so > 1 exactly outside the fences
+        return np.maximum(self.q1 - block, block - self.q3) / self.scale
+
+
+class RollingDetector(Detector):
+    """
+    Deviation from the mean of the preceding `window` rows, in units of that
+    window's standard deviation. Only meaningful on time-ordered data; the
+    engine feeds it rows in time order and it carries the window across chunks.
+    """
+    name = "rolling"
+    passes = 0
+    requires_time = True
+
+    def __init__(self, window: int = ANOMALY_ROLLING_WINDOW, threshold: float = 3.0):
+        self.window = window
+        self.threshold = threshold
+        self.reason = f"Deviates > {threshold:g} std from the previous {window} rows"
+
+    def start(self, columns: int, exact: bool) -> None:
+        super().start(columns, exact)
+        self.carry = np.empty((0, columns))
+
+    def severity(self, block: np.ndarray) -> np.ndarray:
+        frame = pd.DataFrame(np.vstack([self.carry, block]))
+        window = frame.rolling(self.window, min_periods=max(2, self.window // 2))
+        mean = window.mean().shift(1).to_numpy()[len(self.carry):]
+        std = window.std().shift(1).to_numpy()[len(self.carry):]
+        self.carry = frame.to_numpy()[-self.window:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(std > 0, np.abs(block - mean) / (std * self.threshold), np.nan)
+
+
+DETECTORS: Dict[str, Callable[[], Detector]] = {
+    "zscore": ZScoreDetector,
+    "mad": MADDetector,
+    "iqr": IQRDetector,
+    "rolling": RollingDetector,
+}
+
+
+class _Findings:
+    """Per (detector, column) counts, first examples and the most severe rows."""
+
+    def __init__(self, columns: int, max_rows: int):
+        self.max_rows = max_rows
+        self.count = np.zeros(columns, dtype="int64")
+        self.examples: List[list] = [[] for _ in range(columns)]
+        self.top: List[list] = [[] for _ in range(columns)]  # (severity, row, value)
+
+    def add(self, frame: pd.DataFrame, severity: np.ndarray, row_offset: int) -> None:
+        flagged = severity > 1
+        self.count += flagged.sum(axis=0)
+        for j in np.flatnonzero(flagged.any(axis=0)):
+            rows = np.flatnonzero(flagged[:, j])
+            scores = severity[rows, j]
+            if len(rows) > self.max_rows:
+                keep = np.argpartition(-scores, self.max_rows - 1)[:self.max_rows]
+                worst = rows[np.sort(keep)]
+            else:
+                worst = rows
+            values = frame.iloc[worst, j].tolist()
+            self.top[j].extend(zip(severity[worst, j].tolist(), (worst + row_offset).tolist(), values))
+            self.top[j] = sorted(self.top[j], key=lambda item: -item[0])[:self.max_rows]
+            if len(self.examples[j]) < 3:
+                self.examples[j].extend(frame.iloc[rows[:3 - len(self.examples[j])], j].tolist())
+
+
+@contextmanager
+def _opened(chunks: Callable[[], Iterable[pd.DataFrame]]) -> Iterator[Iterator[pd.DataFrame]]:
+    # Closes generator streams (and the file reader behind them) even when the
+    # caller stops early, instead of leaving that to garbage collection
+    iterator = iter(chunks())
+    try:
+        yield iterator
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+class AnomalyEngine:
+    """
+    Multi-method anomaly detection over all numeric columns at once.
+    Each detector fits column statistics on (rows x columns) float blocks in
+    one or more passes, then scores every cell in a final pass. Data can be
+    a DataFrame or a re-iterable stream of row chunks, so files larger than
+    memory are scanned chunk by chunk (quantiles then come from sketches
+    unless SUMMARY_STATS_MODE is "exact").
+    """
+
+    def __init__(
+        self,
+        methods: Optional[Sequence[str]] = None,
+        chunk_rows: int = ANOMALY_CHUNK_ROWS,
+        max_rows: int = ANOMALY_MAX_ROWS
+    ):
+        methods = ANOMALY_METHODS if methods is None else methods
+        unknown = [m for m in methods if m not in DETECTORS]
+        if unknown:
+            raise ValueError(f"Unknown anomaly detection method(s): {', '.join(unknown)}")
+        self.methods = list(methods)
+        self.chunk_rows = chunk_rows
+        self.max_rows = max_rows
+
+    @staticmethod
+    def find_time_column(df: pd.DataFrame) -> Optional[Any]:
+        for col in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                return col
+        return None
+
+    @staticmethod
+    def _block(frame: pd.DataFrame) -> np.ndarray:
+        return frame.to_numpy(dtype="float64", na_value=np.nan)
+
+    def detect(self, df: pd.DataFrame, time_column: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """
+        Detects anomalies in an in-memory DataFrame (exact statistics).
+        Rows are ordered by `time_column` (auto-detected when omitted) for the
+        rolling detector; without a time column it is skipped.
+        """
+        time_column = time_column if time_column is not None else self.find_time_column(df)
+        order = None
+        if "rolling" in self.methods and time_column is not None:
+            order = np.argsort(df[time_column].to_numpy(), kind="stable")
+            df = df.iloc[order]
+
+        def chunks() -> Iterable[pd.DataFrame]:
+            for start in range(0, len(df), self.chunk_rows):
+                yield df.iloc[start:start + self.chunk_rows]
+
+        anomalies = self._run(chunks, df, exact=True, time_ordered=time_column is not None)
+        if order is not None:
+            # Report row positions in the caller's original order
+            for anomaly in anomalies:
+                for row in anomaly["rows"]:
+                    row["row"] = int(order[row["row"]])
+        return anomalies
+
+    def detect_chunks(
+        self,
+        chunks: Callable[[], Iterable[pd.DataFrame]],
+        time_ordered: bool = False,
+        exact: bool = SUMMARY_STATS_MODE == "exact"
+    ) -> List[Dict[str, Any]]:
+        """
+        Detects anomalies over a stream of row chunks. `chunks` is called once
+        per pass and must yield the same rows each time. The rolling detector
+        only runs when `time_ordered` says the rows arrive in time order.
+        """
+        # Only the first chunk is needed here; the passes re-open the stream
+        with _opened(chunks) as iterator:
+            first = next(iterator, None)
+        if first is None:
+            return []
+        return self._run(chunks, first, exact=exact, time_ordered=time_ordered)
+
+    def _run(
+        self,
+        chunks: Callable[[], Iterable[pd.DataFrame]],
+        sample: pd.DataFrame,
+        exact: bool,
+        time_ordered: bool
+    ) -> List[Dict[str, Any]]:
+        columns = list(sample.select_dtypes(include=['number']).columns)
+        if not columns:
+            return []
+        detectors = [
+            DETECTORS[name]() for name in self.methods
+            if time_ordered or not getattr(DETECTORS[name], "requires_time", False)
+        ]
+        if not detectors:
+            return []
+        for detector in detectors:
+            detector.start(len(columns), exact)
+
+        def convert():
+            with _opened(chunks) as stream:
+                for chunk in stream:
+                    frame = chunk[columns]
+                    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in frame.dtypes):
+                        # A later chunk inferred text for a numeric column
+                        frame = frame.apply(pd.to_numeric, errors='coerce')
+                    yield frame, self._block(frame)
+
+        # Each pass converts chunk by chunk (in memory too), so at most one
+        # chunk's float64 block is alive beyond what the detectors keep
+        for pass_index in range(max(d.passes for d in detectors)):
+            fitting = [d for d in detectors if d.passes > pass_index]
+            for _, block in convert():
+                for detector in fitting:
+                    detector.fit(block, pass_index)
+            for detector in fitting:
+                detector.end_pass(pass_index)
+
+        findings = [_Findings(len(columns), self.max_rows) for _ in detectors]
+        offset = 0
+        for frame, block in convert():
+            for detector, found in zip(detectors, findings):
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    found.add(frame, detector.severity(block), offset)
+            offset += len(block)
+
+        anomalies = []
+        for j, col in enumerate(columns):
+            for detector, found in zip(detectors, findings):
+                if not found.count[j]:
+                    continue
+                anomalies.append({
+                    "column": col,
+                    "method": detector.name,
+                    "count": int(found.count[j]),
+                    "examples": found.examples[j],
+                    "reason": detector.reason,
+                    "severity": round(found.top[j][0][0], 3),
+                    "rows": [
+                        {"row": row, "value": value, "severity": round(severity, 3)}
+                        for severity, row, value in found.top[j]
+                    ],
+                })
+        return anomalies
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with an optional per-entry time-to-live.
+    Tracks hit/miss/eviction counters for reporting.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and self.ttl_seconds is not None and self.clock() - item[1] > self.ttl_seconds:
+                del self._entries[key]
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls that share a key: the first caller starts
+    the work as a task and every caller arriving while it is in flight awaits
+    the same result instead of starting a duplicate call. A caller that is
+    cancelled (e.g. its client disconnected) stops waiting without cancelling
+    the others; the work is cancelled only once nobody is waiting for it.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved so an unawaited failure isn't logged
+
+    async def do(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(work())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done: self._finished(key, done))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is task:
+                self._waiters[key] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inFlight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
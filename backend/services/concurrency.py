@@ -0,0 +1,17 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from config.performance import BLOCKING_WORKERS
+
+# Shared bounded pool for blocking work (file parsing, generated-code execution)
+_blocking_pool = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Runs a blocking callable on the shared worker pool so the event loop
+    stays free to serve other requests.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_blocking_pool, functools.partial(func, *args, **kwargs))
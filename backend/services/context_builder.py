@@ -0,0 +1,151 @@
+from typing import Dict, Any, Optional, Tuple
+from config.performance import CONTEXT_TOKEN_BUDGET, CONTEXT_CACHE_ENTRIES
+from config.security import MAX_CONTEXT_LENGTH
+from services.cache import TTLCache
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count using tiktoken when installed, else a ~4 characters/token estimate.
+    """
+    global _encoding
+    if tiktoken is not None and _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _fmt(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    text = str(value)
+    return text if len(text) <= 24 else text[:21] + "..."
+
+
+class BuiltContext:
+    def __init__(self, text: str, tokens: int, included_columns: int, omitted_columns: int):
+        self.text = text
+        self.tokens = tokens
+        self.included_columns = included_columns
+        self.omitted_columns = omitted_columns
+
+
+class ContextBuilder:
+    """
+    Renders a dataset summary as compact prompt text within a token budget.
+    Sections are added in priority order (shape, column schema, per-column
+    stats ranked by usefulness, anomalies, sample rows) until the budget is
+    spent; anything left out is listed as omitted rather than cut mid-text.
+    Output also stays under MAX_CONTEXT_LENGTH characters so the AIService
+    safety truncation never triggers. Results are memoized per (dataset, budget).
+    """
+
+    def __init__(self, token_budget: int = CONTEXT_TOKEN_BUDGET):
+        self.token_budget = token_budget
+        self._cache = TTLCache(CONTEXT_CACHE_ENTRIES)
+
+    @staticmethod
+    def _column_rank(col: Dict[str, Any], row_count: int) -> Tuple:
+        # Numeric columns with stats first, then mostly-complete low-cardinality
+        # columns (good group-by keys), then near-unique IDs and free text
+        completeness = 1 - col.get("missing", 0) / row_count if row_count else 0
+        unique_ratio = col.get("unique", 0) / row_count if row_count else 1
+        is_key_like = unique_ratio < 0.5
+        return ("stats" not in col, not is_key_like, -completeness)
+
+    @staticmethod
+    def _column_line(col: Dict[str, Any]) -> str:
+        parts = [f"missing={col.get('missing', 0)}", f"unique={col.get('unique', 0)}"]
+        stats = col.get("stats") or {}
+        parts.extend(f"{k}={_fmt(v)}" for k, v in stats.items() if v is not None)
+        return f"- {col['name']}: " + ", ".join(parts)
+
+    def build(self, summary: Dict[str, Any], dataset_id: Optional[str] = None) -> BuiltContext:
+        key = (dataset_id, self.token_budget)
+        if dataset_id is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+
+        built = self._render(summary)
+        if dataset_id is not None:
+            self._cache.set(key, built)
+        return built
+
+    def _render(self, summary: Dict[str, Any]) -> BuiltContext:
+        row_count = summary.get("rowCount", 0)
+        columns = summary.get("columns", [])
+        ranked = sorted(columns, key=lambda col: self._column_rank(col, row_count))
+        lines = [f"Rows: {row_count}, Columns: {summary.get('columnCount', len(columns))}"]
+        used = count_tokens(lines[0])
+        chars = len(lines[0])
+
+        def fits(text: str) -> bool:
+            nonlocal used, chars
+            cost = count_tokens(text) + 1
+            if used + cost > self.token_budget or chars + len(text) + 1 > MAX_CONTEXT_LENGTH:
+                return False
+            used += cost
+            chars += len(text) + 1
+            return True
+
+        # 1. Schema: every column name and type, or as many as fit (ranked)
+        schema = "Schema: " + ", ".join(f"{col['name']} ({col['type']})" for col in columns)
+        if fits(schema):
+            lines.append(schema)
+        else:
+            # Reserve room for the "+N more" note before filling in names
+            fits("+00000 more columns not shown.")
+            names = []
+            for col in ranked:
+                entry = f"{col['name']} ({col['type']})"
+                if not fits(entry):
+                    break
+                names.append(entry)
+            lines.append("Schema: " + ", ".join(names))
+            lines.append(f"+{len(columns) - len(names)} more columns not shown.")
+
+        # 2. Per-column stats, most useful columns first
+        detailed = []
+        for col in ranked:
+            if not fits(self._column_line(col)):
+                break
+            detailed.append(col)
+        if detailed:
+            # Keep schema order in the prompt for readability
+            position = {id(col): i for i, col in enumerate(columns)}
+            lines.append("Column stats:")
+            lines.extend(self._column_line(col) for col in sorted(detailed, key=lambda col: position[id(col)]))
+        omitted = len(columns) - len(detailed)
+        if omitted and fits(f"(stats omitted for {omitted} columns)"):
+            lines.append(f"(stats omitted for {omitted} columns)")
+
+        # 3. Anomalies and 4. a few sample rows, if budget remains
+        anomalies = summary.get("anomalies") or []
+        if anomalies:
+            anomaly_lines = [f"- {a['column']}: {a['count']} values, {a['reason']}" for a in anomalies]
+            section = "Anomalies:\n" + "\n".join(anomaly_lines)
+            if fits(section):
+                lines.append(section)
+
+        preview = summary.get("preview") or []
+        if preview and detailed:
+            names = [col["name"] for col in detailed]
+            rows = [", ".join(_fmt(row.get(name)) for name in names) for row in preview[:3]]
+            section = "Sample rows (" + ", ".join(map(str, names)) + "):\n" + "\n".join(rows)
+            if fits(section):
+                lines.append(section)
+
+        text = "\n".join(lines)
+        return BuiltContext(text, count_tokens(text), len(detailed), omitted)
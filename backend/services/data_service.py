@@ -1,88 +1,143 @@
 import pandas as pd
 import io
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterable, Iterator, Optional, Tuple, Union
+from config.performance import CSV_CHUNK_ROWS, CSV_ENGINE, CSV_DTYPE_BACKEND, INGEST_OPTIMIZE_DTYPES
+from services.stats_engine import SummaryAccumulator
+from services.dtype_optimizer import DtypeOptimizer
+from services.anomaly_engine import AnomalyEngine
+from services.excel_reader import ExcelReader
 
 class DataService:
     @staticmethod
-    def read_file(file_content: bytes, filename: str) -> pd.DataFrame:
+    def iter_chunks(
+        source: Union[bytes, str],
+        filename: str,
+        chunksize: int = CSV_CHUNK_ROWS,
+        sheet: Optional[str] = None,
+        sheets: Optional[List[Dict[str, Any]]] = None
+    ) -> Iterator[pd.DataFrame]:
         """
-        Reads CSV or Excel file into a Pandas DataFrame.
+        Yields the file as a sequence of DataFrames.
+        CSV is parsed incrementally `chunksize` rows at a time; Excel has no
+        incremental reader so the sheet is yielded as a single chunk, and the
+        multi-threaded pyarrow CSV engine likewise reads the file in one piece.
+        `source` is either raw bytes or a path to a spooled upload; `sheet`
+        selects an Excel sheet and `sheets` passes on an existing sheet listing
+        (see ExcelReader.read).
         """
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+
+        csv_options = {"dtype_backend": CSV_DTYPE_BACKEND} if CSV_DTYPE_BACKEND else {}
         if filename.lower().endswith('.csv'):
-            return pd.read_csv(io.BytesIO(file_content))
+            if CSV_ENGINE == "pyarrow":
+                yield pd.read_csv(source, engine="pyarrow", **csv_options)
+                return
+            with pd.read_csv(source, chunksize=chunksize, **csv_options) as reader:
+                for chunk in reader:
+                    yield chunk
         elif filename.lower().endswith(('.xls', '.xlsx')):
-            return pd.read_excel(io.BytesIO(file_content))
+            yield ExcelReader.read(source, filename, sheet, sheets)
         else:
             raise ValueError("Unsupported file format. Please upload CSV or Excel.")
 
+    @staticmethod
+    def read_file(
+        source: Union[bytes, str],
+        filename: str,
+        sheet: Optional[str] = None,
+        sheets: Optional[List[Dict[str, Any]]] = None
+    ) -> pd.DataFrame:
+        """
+        Reads CSV or Excel file into a Pandas DataFrame.
+        """
+        return DataService._join(list(DataService.iter_chunks(source, filename, sheet=sheet, sheets=sheets)))
+
+    @staticmethod
+    def _join(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+        if len(chunks) == 1:
+            return chunks[0]
+        if not chunks:
+            raise ValueError("File contains no data rows.")
+        return pd.concat(chunks, ignore_index=True)
+
+    @staticmethod
+    def _compact(df: pd.DataFrame, optimize: bool) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        if not optimize:
+            memory = int(df.memory_usage(deep=True).sum())
+            return df, {"beforeBytes": memory, "afterBytes": memory, "savedPercent": 0.0}
+        return DtypeOptimizer.optimize(df)
+
+    @staticmethod
+    def load_file(
+        source: Union[bytes, str],
+        filename: str,
+        optimize: bool = INGEST_OPTIMIZE_DTYPES,
+        sheet: Optional[str] = None,
+        sheets: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Reads the file and compacts its dtypes.
+        Returns the DataFrame and a before/after memory footprint report.
+        """
+        return DataService._compact(DataService.read_file(source, filename, sheet, sheets), optimize)
+
+    @staticmethod
+    def ingest(
+        source: Union[bytes, str],
+        filename: str,
+        optimize: bool = INGEST_OPTIMIZE_DTYPES,
+        sheet: Optional[str] = None,
+        sheets: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[pd.DataFrame, Dict[str, Any], Dict[str, Any]]:
+        """
+        Upload path: `load_file` plus the statistical summary, computed from
+        the chunk stream as it is parsed (as `summarize_chunks` does) rather
+        than by a second pass over the loaded frame.
+        Ingest memory is not flat: the session store, chat analysis and the
+        on-disk columnar copy all need the full frame, so the chunks are still
+        joined and compacted, briefly holding about twice the parsed data.
+        Returns the DataFrame, the memory footprint report and the summary.
+        """
+        accumulator = SummaryAccumulator()
+        chunks = []
+        for chunk in DataService.iter_chunks(source, filename, sheet=sheet, sheets=sheets):
+            accumulator.update(chunk)
+            chunks.append(chunk)
+        df, memory_report = DataService._compact(DataService._join(chunks), optimize)
+        return df, memory_report, accumulator.result()
+
     @staticmethod
     def get_summary(df: pd.DataFrame) -> Dict[str, Any]:
         """
         Generates a statistical summary of the dataframe.
         """
-        summary = {
-            "rowCount": len(df),
-            "columnCount": len(df.columns),
-            "columns": [],
-            "preview": df.head(5).astype(object).where(pd.notnull(df), None).to_dict(orient='records')
-        }
+        return SummaryAccumulator().update(df).result()
+
+    @staticmethod
+    def summarize_chunks(chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+        """
+        Generates the same summary as `get_summary` from a stream of row chunks,
+        without ever holding the full dataframe.
+        """
+        accumulator = SummaryAccumulator()
+        for chunk in chunks:
+            accumulator.update(chunk)
+        return accumulator.result()
 
-        for col in df.columns:
-            col_data = df[col]
-            col_info = {
-                "name": col,
-                "type": str(col_data.dtype),
-                "missing": int(col_data.isnull().sum()),
-                "unique": int(col_data.nunique()),
-            }
-            
-            # Numeric stats
-            if pd.api.types.is_numeric_dtype(col_data):
-                col_info["stats"] = {
-                    "min": float(col_data.min()) if not pd.isna(col_data.min()) else None,
-                    "max": float(col_data.max()) if not pd.isna(col_data.max()) else None,
-                    "mean": float(col_data.mean()) if not pd.isna(col_data.mean()) else None,
-                }
-            
-            summary["columns"].append(col_info)
-            
-        return summary
-    
     @staticmethod
     def detect_anomalies(df: pd.DataFrame) -> List[Dict[str, Any]]:
         """
-        Basic anomaly detection using Z-Score for numeric columns.
-        Returns a list of potential anomalies.
-        """
-        anomalies = []
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        
-        for col in numeric_cols:
-            col_data = df[col].dropna()
-            if len(col_data) < 10:
-                continue
-                
-            mean = col_data.mean()
-            std = col_data.std()
-            
-            if std == 0:
-                continue
-                
-            # Z-Score > 3
-            outliers = col_data[abs((col_data - mean) / std) > 3]
-            
-            if not outliers.empty:
-                # Sanitize outliers for JSON
-                try:
-                    examples = outliers.head(3).astype(object).where(pd.notnull(outliers), None).tolist()
-                except:
-                    examples = outliers.head(3).tolist()
-                    
-                anomalies.append({
-                    "column": col,
-                    "count": len(outliers),
-                    "examples": examples,
-                    "reason": "Z-Score > 3 (Statistical Outlier)"
-                })
-                
-        return anomalies
+        Anomaly detection over all numeric columns with the methods in
+        ANOMALY_METHODS (Z-Score > 3 by default).
+        Returns a list of potential anomalies with row positions and severity.
+        """
+        return AnomalyEngine().detect(df)
+
+    @staticmethod
+    def detect_file_anomalies(source: Union[bytes, str], filename: str, time_ordered: bool = False) -> List[Dict[str, Any]]:
+        """
+        Same as `detect_anomalies` but streams the file chunk by chunk
+        (one read per detector pass), for files too large to load.
+        """
+        return AnomalyEngine().detect_chunks(lambda: DataService.iter_chunks(source, filename), time_ordered=time_ordered)
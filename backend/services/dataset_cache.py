@@ -0,0 +1,165 @@
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional
+import pandas as pd
+from services.serialization import dumps
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    ipc = None
+
+
+class DatasetDiskCache:
+    """
+    Persists uploaded datasets as uncompressed Arrow IPC files keyed by the
+    upload's content hash, so any worker (or a restarted one) can reload them
+    by memory-mapping the file instead of re-parsing CSV/Excel.
+    Small JSON pointers map session IDs to dataset IDs across workers.
+    """
+
+    def __init__(self, root_dir: str, retention_seconds: float):
+        self.root_dir = root_dir
+        self.retention_seconds = retention_seconds
+        self.enabled = pa is not None
+        if not self.enabled:
+            print("Warning: pyarrow not installed. Datasets will not be persisted to disk.")
+            return
+        os.makedirs(os.path.join(root_dir, "sessions"), exist_ok=True)
+
+    def dataset_path(self, dataset_id: str) -> str:
+        return os.path.join(self.root_dir, f"{dataset_id}.arrow")
+
+    def _summary_path(self, dataset_id: str) -> str:
+        return os.path.join(self.root_dir, f"{dataset_id}.summary.json")
+
+    def _session_path(self, session_id: str) -> str:
+        return os.path.join(self.root_dir, "sessions", f"{session_id}.json")
+
+    @staticmethod
+    def _write_atomic(path: str, write) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def has(self, dataset_id: str) -> bool:
+        return self.enabled and os.path.exists(self.dataset_path(dataset_id))
+
+    def save(self, dataset_id: str, df: pd.DataFrame, summary: Dict[str, Any]) -> bool:
+        """
+        Writes the dataset once; re-saving an existing content hash is a no-op.
+        Returns False if the frame cannot be represented in Arrow.
+        """
+        if not self.enabled:
+            return False
+        if not self.has(dataset_id):
+            try:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+            except (pa.ArrowException, TypeError, ValueError) as e:
+                print(f"Could not persist dataset {dataset_id}: {e}")
+                return False
+
+            def write_table(path: str) -> None:
+                with pa.OSFile(path, "wb") as sink:
+                    with ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+
+            self._write_atomic(self.dataset_path(dataset_id), write_table)
+            self.prune()
+        else:
+            # Refresh the retention clock for repeat uploads
+            os.utime(self.dataset_path(dataset_id))
+
+        def write_summary(path: str) -> None:
+            with open(path, "wb") as f:
+                f.write(dumps(summary))
+
+        self._write_atomic(self._summary_path(dataset_id), write_summary)
+        return True
+
+    def load(self, dataset_id: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Memory-maps the Arrow file and converts only the requested columns.
+        """
+        if not self.has(dataset_id):
+            return None
+        with pa.memory_map(self.dataset_path(dataset_id), "r") as source:
+            table = ipc.open_file(source).read_all()
+            if columns is not None:
+                table = table.select([c for c in columns if c in table.column_names])
+            return table.to_pandas()
+
+    def load_summary(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._summary_path(dataset_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _read_pointer(self, session_id: str) -> Optional[Dict[str, Any]]:
+        path = self._session_path(session_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.retention_seconds:
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def bind_session(self, session_id: str, dataset_id: str, table: Optional[str] = None, max_tables: int = 8) -> None:
+        """
+        Makes `dataset_id` the session's current dataset. With `table`, it is
+        also kept in the session's table list (most recent `max_tables`) so
+        earlier uploads stay queryable alongside it.
+        """
+        if not self.enabled:
+            return
+        tables = (self._read_pointer(session_id) or {}).get("tables", {})
+        if table:
+            tables.pop(table, None)
+            tables[table] = dataset_id
+            while len(tables) > max_tables:
+                tables.pop(next(iter(tables)))
+
+        def write_pointer(path: str) -> None:
+            with open(path, "w") as f:
+                json.dump({"dataset_id": dataset_id, "tables": tables}, f)
+
+        self._write_atomic(self._session_path(session_id), write_pointer)
+
+    def session_dataset(self, session_id: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        return (self._read_pointer(session_id) or {}).get("dataset_id")
+
+    def session_tables(self, session_id: str) -> Dict[str, str]:
+        """Table name -> dataset ID for the session's uploads still on disk, oldest first."""
+        if not self.enabled:
+            return {}
+        tables = (self._read_pointer(session_id) or {}).get("tables", {})
+        return {name: dataset_id for name, dataset_id in tables.items() if self.has(dataset_id)}
+
+    def prune(self) -> None:
+        """
+        Deletes datasets and session pointers older than the retention window.
+        Only this cache's own files are touched, whatever else shares the directory.
+        """
+        cutoff = time.time() - self.retention_seconds
+        owned = (
+            (self.root_dir, (".arrow", ".summary.json")),
+            (os.path.join(self.root_dir, "sessions"), (".json",)),
+        )
+        for directory, suffixes in owned:
+            for entry in os.scandir(directory):
+                if entry.is_file() and entry.name.endswith(suffixes) and entry.stat().st_mtime < cutoff:
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
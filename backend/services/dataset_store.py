@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional
+import pandas as pd
+
+
+class DatasetEntry:
+    def __init__(self, summary: Dict[str, Any], df: pd.DataFrame, nbytes: int, now: float, dataset_id: Optional[str] = None):
+        self.dataset_id = dataset_id
+        self.summary = summary
+        self.df = df
+        self.nbytes = nbytes
+        self.created_at = now
+        self.last_access = now
+
+
+class DatasetStore:
+    """
+    Session-keyed store for uploaded DataFrames and their summaries.
+    Entries expire `ttl_seconds` after upload or `idle_seconds` after their
+    last access, and the least recently used entries are evicted whenever the
+    total DataFrame footprint exceeds `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        idle_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[str, DatasetEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _is_expired(self, entry: DatasetEntry, now: float) -> bool:
+        return (now - entry.created_at > self.ttl_seconds
+                or now - entry.last_access > self.idle_seconds)
+
+    def _remove(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id)
+        self.total_bytes -= entry.nbytes
+
+    def _expire(self, now: float) -> None:
+        for session_id in [sid for sid, entry in self._entries.items() if self._is_expired(entry, now)]:
+            self._remove(session_id)
+            self.expirations += 1
+
+    def _enforce_budget(self) -> None:
+        # Keep at least the most recent entry even if it alone exceeds the budget
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def put(self, session_id: str, summary: Dict[str, Any], df: pd.DataFrame, dataset_id: Optional[str] = None) -> DatasetEntry:
+        nbytes = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            now = self.clock()
+            if session_id in self._entries:
+                self._remove(session_id)
+            entry = DatasetEntry(summary, df, nbytes, now, dataset_id)
+            self._entries[session_id] = entry
+            self.total_bytes += nbytes
+            self._expire(now)
+            self._enforce_budget()
+            return entry
+
+    def get(self, session_id: str) -> Optional[DatasetEntry]:
+        with self._lock:
+            now = self.clock()
+            entry = self._entries.get(session_id)
+            if entry is not None and self._is_expired(entry, now):
+                self._remove(session_id)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            entry.last_access = now
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+            return entry
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            if session_id in self._entries:
+                self._remove(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(self.clock())
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,88 @@
+import warnings
+import pandas as pd
+from typing import Dict, Any, Tuple
+from config.performance import INGEST_SAMPLE_ROWS, CATEGORY_MAX_UNIQUE_RATIO
+
+
+class DtypeOptimizer:
+    """
+    Shrinks a freshly parsed DataFrame without changing any values.
+    Candidates are picked from a row sample; every conversion is then applied
+    to the full column and kept only if it is lossless. Numeric columns keep
+    their 64-bit dtypes: analysis code multiplies and sums them, and narrow
+    ints or float32 would overflow or lose precision there.
+    """
+
+    @staticmethod
+    def _memory(df: pd.DataFrame) -> int:
+        return int(df.memory_usage(deep=True).sum())
+
+    @staticmethod
+    def _looks_like_dates(sample: pd.Series) -> bool:
+        if sample.empty or pd.to_numeric(sample, errors='coerce').notna().all():
+            return False
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            parsed = pd.to_datetime(sample, errors='coerce')
+        return parsed.notna().mean() >= 0.95
+
+    @staticmethod
+    def _to_dates(col: pd.Series) -> pd.Series:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            parsed = pd.to_datetime(col, errors='coerce')
+        # Only keep the conversion if no value was lost to NaT
+        return parsed if parsed.isna().sum() == col.isna().sum() else col
+
+    @staticmethod
+    def _to_category(col: pd.Series, sample: pd.Series) -> pd.Series:
+        if sample.empty or sample.nunique() / len(sample) > CATEGORY_MAX_UNIQUE_RATIO:
+            return col
+        converted = col.astype('category')
+        if len(converted.cat.categories) / max(len(col), 1) > CATEGORY_MAX_UNIQUE_RATIO:
+            return col
+        return converted
+
+    @staticmethod
+    def optimize(df: pd.DataFrame, sample_rows: int = INGEST_SAMPLE_ROWS) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Parses date-like text once and turns repetitive text into
+        categoricals. Returns the optimized frame and a memory report.
+        """
+        before = DtypeOptimizer._memory(df)
+        sample = df.head(sample_rows)
+        optimized = {}
+
+        for col in df.columns:
+            col_data = df[col]
+            if pd.api.types.is_object_dtype(col_data) or pd.api.types.is_string_dtype(col_data):
+                col_sample = sample[col].dropna()
+                if DtypeOptimizer._looks_like_dates(col_sample.head(500)):
+                    optimized[col] = DtypeOptimizer._to_dates(col_data)
+                else:
+                    optimized[col] = DtypeOptimizer._to_category(col_data, col_sample)
+            else:
+                optimized[col] = col_data
+
+        result = pd.DataFrame(optimized, index=df.index)
+        after = DtypeOptimizer._memory(result)
+        return result, {
+            "beforeBytes": before,
+            "afterBytes": after,
+            "savedPercent": round(100 * (1 - after / before), 1) if before else 0.0,
+        }
+
+    @staticmethod
+    def for_analysis(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        The frame as generated analysis code expects it: categorical columns
+        become plain text again, so assigning new labels, string methods,
+        groupby and concat behave as on a freshly parsed file.
+        """
+        categorical = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+        if not categorical:
+            return df
+        restored = df.copy(deep=False)
+        for col in categorical:
+            restored[col] = df[col].astype(df[col].cat.categories.dtype)
+        return restored
@@ -0,0 +1,200 @@
+import io
+import multiprocessing
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Union
+from config.performance import EXCEL_ENGINE, EXCEL_MAX_ROWS, EXCEL_MAX_COLUMNS, EXCEL_SHEET_WORKERS
+
+try:
+    import python_calamine  # noqa: F401 - enables pandas' Rust-based "calamine" engine
+    HAS_CALAMINE = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_CALAMINE = False
+
+ALL_SHEETS = "*"
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_DIMENSION = re.compile(rb'<(?:\w+:)?dimension\s+ref="[A-Z]*(\d*)(?::([A-Z]+)(\d+))?"')
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _sheet_pool() -> ProcessPoolExecutor:
+    # Created lazily so importing the module never forks processes
+    global _pool
+    if _pool is None:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _pool = ProcessPoolExecutor(max_workers=EXCEL_SHEET_WORKERS, mp_context=multiprocessing.get_context(method))
+    return _pool
+
+
+class ExcelReader:
+    """
+    Excel ingest: sheet listing from workbook metadata, row/column limits
+    checked before parsing, and the fastest available engine (calamine when
+    installed, else openpyxl in read-only mode / xlrd for .xls). Reading every
+    sheet of a workbook on disk parses the sheets in parallel processes when
+    EXCEL_SHEET_WORKERS > 1, otherwise in one pass over the workbook.
+    """
+
+    @staticmethod
+    def engine(filename: str) -> Optional[str]:
+        if EXCEL_ENGINE != "auto":
+            return EXCEL_ENGINE
+        if HAS_CALAMINE:
+            return "calamine"
+        return "xlrd" if filename.lower().endswith(".xls") else "openpyxl"
+
+    @staticmethod
+    def _rewind(source: Union[io.BytesIO, str]) -> Union[io.BytesIO, str]:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return source
+
+    @staticmethod
+    def list_sheets(source: Union[io.BytesIO, str], filename: str) -> List[Dict[str, Any]]:
+        """
+        Sheet names with their data row and column counts, read from the
+        workbook's dimension metadata without parsing any cells (counts are
+        None when the writer did not record a dimension, and always for .xls,
+        whose sizes are only known once a sheet is loaded). Limits are checked
+        again on the parsed frames either way.
+        """
+        source = ExcelReader._rewind(source)
+        if filename.lower().endswith(".xls"):
+            import xlrd
+            # on_demand: only the workbook globals are parsed, no sheet is loaded
+            if isinstance(source, str):
+                book = xlrd.open_workbook(source, on_demand=True)
+            else:
+                book = xlrd.open_workbook(file_contents=source.read(), on_demand=True)
+            try:
+                return [{"name": name, "rows": None, "columns": None} for name in book.sheet_names()]
+            finally:
+                book.release_resources()
+
+        return ExcelReader._xlsx_sheets(source)
+
+    @staticmethod
+    def _column_number(letters: str) -> int:
+        number = 0
+        for letter in letters:
+            number = number * 26 + ord(letter) - ord("A") + 1
+        return number
+
+    @staticmethod
+    def _xlsx_sheets(source: Union[io.BytesIO, str]) -> List[Dict[str, Any]]:
+        # Reads xl/workbook.xml and the <dimension> tag at the top of each
+        # sheet part straight from the zip; loading the workbook through
+        # openpyxl would parse the whole shared-strings table first
+        with zipfile.ZipFile(source) as archive:
+            workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+            rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+            targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{_PKG_REL_NS}Relationship")}
+            sheets = []
+            for node in workbook.iter(f"{_MAIN_NS}sheet"):
+                target = targets.get(node.get(f"{_REL_NS}id"), "")
+                part = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+                rows = columns = None
+                try:
+                    with archive.open(part) as f:
+                        match = _DIMENSION.search(f.read(4096))
+                except KeyError:
+                    match = None
+                if match and match.group(2):
+                    rows = max(int(match.group(3)) - 1, 0)
+                    columns = ExcelReader._column_number(match.group(2).decode())
+                sheets.append({"name": node.get("name"), "rows": rows, "columns": columns})
+            return sheets
+
+    @staticmethod
+    def check_limits(sheet: Dict[str, Any], max_rows: int = EXCEL_MAX_ROWS, max_columns: int = EXCEL_MAX_COLUMNS) -> None:
+        if sheet["columns"] is not None and sheet["columns"] > max_columns:
+            raise ValueError(f"Sheet '{sheet['name']}' has {sheet['columns']} columns. Maximum is {max_columns}.")
+        if sheet["rows"] is not None and sheet["rows"] > max_rows:
+            raise ValueError(f"Sheet '{sheet['name']}' has {sheet['rows']} rows. Maximum is {max_rows}.")
+
+    @staticmethod
+    def read_sheet(
+        source: Union[io.BytesIO, str],
+        filename: str,
+        sheet: Union[str, int, List[str]] = 0,
+        max_rows: int = EXCEL_MAX_ROWS,
+        max_columns: int = EXCEL_MAX_COLUMNS
+    ) -> Union[pd.DataFrame, Dict[str, pd.DataFrame]]:
+        # nrows stops the parser early even if the dimension metadata was missing
+        # or wrong; the one extra row tells a sheet over the limit from one at it
+        result = pd.read_excel(
+            ExcelReader._rewind(source),
+            sheet_name=sheet,
+            engine=ExcelReader.engine(filename),
+            nrows=max_rows + 1
+        )
+        frames = result if isinstance(result, dict) else {sheet: result}
+        for name, frame in frames.items():
+            ExcelReader.check_limits({"name": name, "rows": len(frame), "columns": len(frame.columns)}, max_rows, max_columns)
+        return result
+
+    @staticmethod
+    def _resolve(sheets: List[Dict[str, Any]], sheet: Optional[str]) -> List[Dict[str, Any]]:
+        if not sheets:
+            raise ValueError("Workbook contains no sheets.")
+        if sheet is None:
+            return sheets[:1]
+        if sheet == ALL_SHEETS:
+            return sheets
+        for info in sheets:
+            if info["name"] == sheet:
+                return [info]
+        raise ValueError(f"Sheet not found: {sheet}")
+
+    @staticmethod
+    def read(
+        source: Union[io.BytesIO, str],
+        filename: str,
+        sheet: Optional[str] = None,
+        sheets: Optional[List[Dict[str, Any]]] = None
+    ) -> pd.DataFrame:
+        """
+        Reads the first sheet, the named `sheet`, or with sheet="*" every sheet
+        stacked into one frame with a `sheet` column (sheets must share columns).
+        `sheets` is the workbook's `list_sheets` result when the caller has it.
+        """
+        if sheets is None:
+            sheets = ExcelReader.list_sheets(source, filename)
+        selected = ExcelReader._resolve(sheets, sheet)
+        for info in selected:
+            ExcelReader.check_limits(info)
+        if sum(info["rows"] or 0 for info in selected) > EXCEL_MAX_ROWS:
+            raise ValueError(f"Workbook has more than {EXCEL_MAX_ROWS} rows in total.")
+
+        names = [info["name"] for info in selected]
+        if len(names) == 1:
+            return ExcelReader.read_sheet(source, filename, names[0])
+
+        if isinstance(source, str) and EXCEL_SHEET_WORKERS > 1:
+            # Each worker opens the file and parses only its own sheet
+            frames = list(_sheet_pool().map(ExcelReader.read_sheet, [source] * len(names), [filename] * len(names), names))
+        else:
+            # One pass over the workbook (shared strings are parsed once)
+            frames = list(ExcelReader.read_sheet(source, filename, names).values())
+
+        if sum(len(frame) for frame in frames) > EXCEL_MAX_ROWS:
+            raise ValueError(f"Workbook has more than {EXCEL_MAX_ROWS} rows in total.")
+        columns = list(frames[0].columns)
+        if any(list(frame.columns) != columns for frame in frames[1:]):
+            raise ValueError("Sheets have different columns. Please choose a single sheet.")
+        return pd.concat(frames, keys=names, names=["sheet", None]).reset_index(level=0).reset_index(drop=True)
+
+    @staticmethod
+    def shutdown() -> None:
+        global _pool
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
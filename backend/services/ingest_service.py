@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import os
+import tempfile
+import zlib
+from typing import Any
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Upload suffix -> compression format
+COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+# Corrupt or truncated compressed input
+DECOMPRESSION_ERRORS = (OSError, EOFError, zlib.error) + ((zstandard.ZstdError,) if zstandard else ())
+
+
+class SpooledUpload:
+    def __init__(self, path: str, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+
+class IngestService:
+    @staticmethod
+    async def spool_upload(upload: Any, suffix: str, max_bytes: int, chunk_size: int) -> SpooledUpload:
+        """
+        Streams an uploaded file to a temporary file in fixed-size chunks.
+        The size limit is enforced while reading so oversized uploads are
+        rejected without ever being held in memory, and the content hash is
+        computed on the way through. The caller is responsible for removing
+        the temp file.
+        """
+        fd, path = tempfile.mkstemp(prefix="deanalyse_", suffix=suffix)
+        digest = hashlib.sha256()
+        total = 0
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = await upload.read(chunk_size)
+                    if not chunk:
+                        break
+                    total += len(chunk)
+                    if total > max_bytes:
+                        raise ValueError(
+                            f"File too large. Maximum size is {max_bytes // (1024*1024)}MB."
+                        )
+                    digest.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            IngestService.discard(path)
+            raise
+
+        if total == 0:
+            IngestService.discard(path)
+            raise ValueError("File is empty")
+
+        return SpooledUpload(path, total, digest.hexdigest())
+
+    @staticmethod
+    def can_decompress(compression: str) -> bool:
+        return compression == "gzip" or (compression == "zstd" and zstandard is not None)
+
+    @staticmethod
+    def _open_compressed(f: Any, compression: str) -> Any:
+        if compression == "gzip":
+            return gzip.GzipFile(fileobj=f, mode="rb")
+        return zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+
+    @staticmethod
+    def decompress(
+        spooled: SpooledUpload,
+        compression: str,
+        suffix: str,
+        max_bytes: int,
+        chunk_size: int
+    ) -> SpooledUpload:
+        """
+        Streams a spooled .gz/.zst upload into a new temporary file holding
+        the plain content. Output is capped at `max_bytes` while decompressing
+        (so small "zip bomb" uploads cannot fill the disk), and the hash is of
+        the decompressed bytes, so a compressed upload shares cached results
+        with the same file uploaded uncompressed. The caller removes both files.
+        """
+        fd, path = tempfile.mkstemp(prefix="deanalyse_", suffix=suffix)
+        digest = hashlib.sha256()
+        total = 0
+        try:
+            with open(spooled.path, "rb") as f, os.fdopen(fd, "wb") as out, \
+                    IngestService._open_compressed(f, compression) as reader:
+                while True:
+                    chunk = reader.read(chunk_size)
+                    if not chunk:
+                        break
+                    total += len(chunk)
+                    if total > max_bytes:
+                        raise ValueError(
+                            f"File too large. Maximum decompressed size is {max_bytes // (1024*1024)}MB."
+                        )
+                    digest.update(chunk)
+                    out.write(chunk)
+        except DECOMPRESSION_ERRORS:
+            IngestService.discard(path)
+            raise ValueError("Could not decompress file. It may be corrupt or truncated.")
+        except BaseException:
+            IngestService.discard(path)
+            raise
+
+        if total == 0:
+            IngestService.discard(path)
+            raise ValueError("File is empty")
+
+        return SpooledUpload(path, total, digest.hexdigest())
+
+    @staticmethod
+    def discard(path: str) -> None:
+        """
+        Removes a spooled upload, ignoring files that are already gone.
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
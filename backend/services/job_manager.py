@@ -0,0 +1,245 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+from services.cache import TTLCache
+from services.concurrency import run_blocking
+from services.metrics import STAGE_SECONDS
+from services.serialization import dumps
+from config.performance import JOB_PERSIST_INTERVAL_SECONDS, JOB_PRUNE_INTERVAL_SECONDS
+
+UPLOAD_STAGES = ("parse", "profile", "anomalies", "kpis")
+
+
+class Job:
+    """
+    Progress record for one background upload. Stages are timed through
+    `stage()`, and results are published into `result` as each stage
+    finishes so pollers see the summary before the slower stages complete.
+    Stage durations are also recorded in the stage-duration metric.
+    """
+
+    def __init__(
+        self,
+        stages: List[str],
+        session_id: Optional[str] = None,
+        job_id: Optional[str] = None,
+        pipeline: str = "upload"
+    ):
+        self.job_id = job_id
+        self.pipeline = pipeline
+        self.session_id = session_id
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.stages = {name: {"name": name, "status": "pending", "durationMs": None} for name in stages}
+        self.result: Dict[str, Any] = {}
+        self.on_change: Optional[Callable[["Job"], None]] = None
+
+    def _changed(self) -> None:
+        self.updated_at = time.time()
+        if self.on_change is not None:
+            self.on_change(self)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        info = self.stages[name]
+        info["status"] = "running"
+        self._changed()
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            info["status"] = "failed"
+            raise
+        else:
+            info["status"] = "done"
+        finally:
+            elapsed = time.perf_counter() - start
+            info["durationMs"] = round(elapsed * 1000, 1)
+            outcome = "ok" if info["status"] == "done" else "error"
+            STAGE_SECONDS.observe(elapsed, pipeline=self.pipeline, stage=name, outcome=outcome)
+            self._changed()
+
+    def skip(self, *names: str, status: str = "cached") -> None:
+        for name in names:
+            self.stages[name]["status"] = status
+        self._changed()
+
+    def publish(self, **results: Any) -> None:
+        self.result.update(results)
+        self._changed()
+
+    def to_dict(self) -> Dict[str, Any]:
+        stages = list(self.stages.values())
+        finished = sum(1 for s in stages if s["status"] in ("done", "cached", "skipped"))
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "progress": round(finished / len(stages), 2) if stages else 1.0,
+            "stages": stages,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+            "result": self.result,
+        }
+
+
+class JobManager:
+    """
+    Runs jobs as background tasks on the event loop, at most `concurrency`
+    at a time (the stages themselves run on the shared worker pools).
+    Job state is kept in memory and, when `state_dir` is set, mirrored to
+    small JSON files so a poll landing on another worker process still finds it.
+    Changes are coalesced and written at most every `persist_interval` seconds
+    from the blocking pool; expired records are swept every `prune_interval`.
+    """
+
+    def __init__(
+        self,
+        max_jobs: int,
+        ttl_seconds: float,
+        concurrency: int,
+        state_dir: Optional[str] = None,
+        persist_interval: float = JOB_PERSIST_INTERVAL_SECONDS,
+        prune_interval: float = JOB_PRUNE_INTERVAL_SECONDS
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.concurrency = concurrency
+        self.state_dir = state_dir
+        self.persist_interval = persist_interval
+        self.prune_interval = prune_interval
+        self._jobs = TTLCache(max_jobs, ttl_seconds=ttl_seconds)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks = set()
+        self._writes = set()  # State writes and prunes in flight
+        self._dirty = set()  # Job IDs with a write scheduled
+        self._next_prune = 0.0
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    def _state_path(self, job_id: str) -> str:
+        return os.path.join(self.state_dir, f"{job_id}.json")
+
+    @staticmethod
+    def _spawn(coroutine: Awaitable[Any], tasks: set) -> None:
+        task = asyncio.ensure_future(coroutine)
+        # Keep a reference so the task isn't garbage-collected mid-flight
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    @staticmethod
+    def _snapshot(job: Job) -> bytes:
+        # Serialized on the event loop, where the job's result is mutated
+        return dumps(dict(job.to_dict(), session_id=job.session_id))
+
+    def _write(self, job_id: str, data: bytes) -> None:
+        path = self._state_path(job_id)
+        tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not persist job {job_id}: {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _persist(self, job: Job, delay: Optional[float] = None) -> None:
+        """Schedules a write of the job's state, unless one is already pending."""
+        if not self.state_dir or job.job_id in self._dirty:
+            return
+        self._dirty.add(job.job_id)
+        self._spawn(self._flush(job, self.persist_interval if delay is None else delay), self._writes)
+
+    async def _flush(self, job: Job, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        self._dirty.discard(job.job_id)
+        await run_blocking(self._write, job.job_id, self._snapshot(job))
+
+    def prune(self) -> None:
+        """Deletes persisted job records older than the TTL."""
+        if not self.state_dir:
+            return
+        cutoff = time.time() - self.ttl_seconds
+        for entry in os.scandir(self.state_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def create(self, stages: List[str], session_id: Optional[str] = None) -> Job:
+        job = Job(stages, session_id=session_id, job_id=uuid.uuid4().hex)
+        job.on_change = self._persist
+        self._jobs.set(job.job_id, job)
+        if self.state_dir and time.monotonic() >= self._next_prune:
+            self._next_prune = time.monotonic() + self.prune_interval
+            self._spawn(run_blocking(self.prune), self._writes)
+        # Written at once, so the first poll finds the job on any worker
+        self._persist(job, delay=0)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Current job state (with its owning session_id), or None if unknown
+        or expired.
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return dict(job.to_dict(), session_id=job.session_id)
+        if not self.state_dir:
+            return None
+        try:
+            path = self._state_path(job_id)
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def submit(self, job: Job, work: Callable[[], Awaitable[Dict[str, Any]]], error_message: str) -> None:
+        """
+        Schedules `work` in the background. Its return value is merged into
+        the job result; ValueErrors are reported to the client verbatim and
+        anything else as `error_message`.
+        """
+        self._spawn(self._run(job, work, error_message), self._tasks)
+
+    async def _run(self, job: Job, work: Callable[[], Awaitable[Dict[str, Any]]], error_message: str) -> None:
+        async with self.semaphore:
+            job.status = "running"
+            job._changed()
+            try:
+                job.result.update(await work())
+                job.status = "done"
+            except ValueError as e:
+                job.status, job.error = "failed", str(e)
+            except asyncio.CancelledError:
+                # Server shutting down: leave a final state for pollers
+                job.status, job.error = "failed", "Job was interrupted. Please upload again."
+                job.updated_at = time.time()
+                if self.state_dir:
+                    self._write(job.job_id, self._snapshot(job))  # The loop is stopping; write now
+                raise
+            except Exception as e:
+                # Security: Don't expose internal errors
+                print(f"Error in background job {job.job_id}: {str(e)}")  # Log internally
+                job.status, job.error = "failed", error_message
+            job._changed()
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._jobs.stats(), running=len(self._tasks))
@@ -0,0 +1,208 @@
+import asyncio
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+import openai
+from openai import AsyncOpenAI
+from services.metrics import LLM_REQUEST_SECONDS, LLM_RETRIES, record_usage
+from config.performance import (
+    LLM_MODEL,
+    LLM_BASE_URL,
+    LLM_MAX_CONCURRENCY,
+    LLM_TIMEOUT_SECONDS,
+    LLM_CONNECT_TIMEOUT_SECONDS,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_SECONDS,
+    LLM_RETRY_MAX_SECONDS
+)
+
+# Failures worth another attempt: rate limits (429), server errors (5xx),
+# dropped connections and timeouts. Anything else (bad request, auth) is final.
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError, asyncio.TimeoutError)
+
+
+def _retry_reason(error: BaseException) -> str:
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limit"
+    if isinstance(error, openai.InternalServerError):
+        return "server_error"
+    if isinstance(error, (openai.APITimeoutError, asyncio.TimeoutError)):
+        return "timeout"
+    return "connection"
+
+
+class LLMGateway:
+    """
+    The process-wide path to the model API, shared by chat and upload: one
+    AsyncOpenAI client (a keep-alive connection pool), at most
+    `max_concurrency` calls in flight with further calls queued, a timeout
+    per call, and jittered exponential backoff on retryable failures
+    (honouring Retry-After). Latency, retries and token usage of every call
+    are recorded in the metrics registry.
+
+    `set_client` swaps the upstream for a fake exposing
+    `chat.completions.create`; LLM_BASE_URL points the real client at a
+    local OpenAI-compatible server instead (see benchmarks/stub_llm.py).
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        model: str = LLM_MODEL,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        timeout_seconds: float = LLM_TIMEOUT_SECONDS,
+        max_retries: int = LLM_MAX_RETRIES,
+        retry_base_seconds: float = LLM_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = LLM_RETRY_MAX_SECONDS
+    ):
+        self.client = client
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._waiting = 0
+        self._calls = 0
+        self._retries = 0
+        self._failures = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMGateway":
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key and not LLM_BASE_URL:
+            print("Warning: OPENAI_API_KEY not found. AI features will not work.")
+            return cls()
+        return cls(cls.create_client(api_key or "local"))
+
+    @staticmethod
+    def create_client(
+        api_key: str,
+        base_url: Optional[str] = LLM_BASE_URL,
+        timeout_seconds: float = LLM_TIMEOUT_SECONDS
+    ) -> AsyncOpenAI:
+        # Retries happen in the gateway (with jitter and metrics), not in the SDK
+        return AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=openai.Timeout(timeout_seconds, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+            max_retries=0
+        )
+
+    @property
+    def available(self) -> bool:
+        return self.client is not None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def set_client(self, client: Any) -> None:
+        """Replaces the upstream client (e.g. with a local fake in tests and benchmarks)."""
+        self.client = client
+
+    async def _acquire(self) -> None:
+        self._waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self.semaphore.release()
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), self.retry_max_seconds)
+        except ValueError:
+            pass
+        # Full jitter keeps retries from a burst of failures from arriving together
+        return random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2 ** attempt))
+
+    async def _create(self, operation: str, **kwargs) -> Any:
+        """`chat.completions.create` with the timeout and retry policy applied."""
+        self._calls += 1
+        attempt = 0
+        while True:
+            try:
+                return await asyncio.wait_for(
+                    self.client.chat.completions.create(model=self.model, **kwargs),
+                    timeout=self.timeout_seconds
+                )
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    self._failures += 1
+                    raise
+                delay = self._backoff(attempt, e)
+                self._retries += 1
+                LLM_RETRIES.inc(operation=operation, reason=_retry_reason(e))
+                print(f"Retrying {operation} call in {delay:.2f}s after: {type(e).__name__}")
+                attempt += 1
+                await asyncio.sleep(delay)
+            except Exception:
+                self._failures += 1
+                raise
+
+    async def chat(self, operation: str, **kwargs) -> Any:
+        """
+        Non-streaming completion, recording its latency and token usage under `operation`.
+        """
+        await self._acquire()
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._create(operation, **kwargs)
+            outcome = "ok"
+        finally:
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, operation=operation, outcome=outcome)
+            self._release()
+        record_usage(operation, getattr(response, "usage", None))
+        return response
+
+    async def stream(self, operation: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Yields the completion's text deltas. Only opening the stream is retried;
+        a failure after tokens were sent propagates. The concurrency slot is
+        held until the stream ends.
+        """
+        await self._acquire()
+        # Streamed latency is measured to the last chunk; the final chunk carries usage
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._create(
+                operation, stream=True, stream_options={"include_usage": True}, **kwargs
+            )
+            async for chunk in response:
+                record_usage(operation, getattr(chunk, "usage", None))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            outcome = "ok"
+        finally:
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, operation=operation, outcome=outcome)
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "model": self.model,
+            "maxConcurrency": self.max_concurrency,
+            "inFlight": self._in_flight,
+            "waiting": self._waiting,
+            "calls": self._calls,
+            "retries": self._retries,
+            "failures": self._failures,
+        }
+
+
+llm_gateway = LLMGateway.from_env()
@@ -0,0 +1,238 @@
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from config.performance import METRICS_LATENCY_BUCKETS
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Samples = Iterable[Tuple[Dict[str, str], float]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, key)} {_number(v)}" for key, v in values]
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram; `time()` observes the duration of a block in seconds.
+    """
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = METRICS_LATENCY_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., count in +Inf only], sum
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, **labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        lines = self.header()
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class CallbackMetric(_Metric):
+    """
+    Gauge or counter read at scrape time from `func`, which returns a number
+    or (labels, value) pairs; used to expose the existing stats() counters.
+    """
+
+    def __init__(self, name: str, help_text: str, func: Callable[[], object], type: str = "gauge"):
+        super().__init__(name, help_text)
+        self.func = func
+        self.type = type
+
+    def render(self) -> List[str]:
+        try:
+            result = self.func()
+        except Exception as e:
+            print(f"Error collecting metric {self.name}: {e}")
+            return []
+        samples = [({}, result)] if isinstance(result, (int, float)) else result
+        lines = self.header()
+        for labels, value in samples:
+            lines.append(f"{self.name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Dependency-free Prometheus registry rendering the text exposition format.
+    Values are per process: with several server workers each one reports
+    its own series, so scrape the workers individually (or sum in queries).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = METRICS_LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name: str, help_text: str, func: Callable[[], object], type: str = "gauge") -> CallbackMetric:
+        with self._lock:
+            # Re-registration replaces the callback (e.g. a service object was rebuilt)
+            metric = self._metrics[name] = CallbackMetric(name, help_text, func, type)
+            return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "deanalyse_http_request_duration_seconds",
+    "Time until the response starts, by route template, method and status",
+    ("method", "route", "status")
+)
+STAGE_SECONDS = registry.histogram(
+    "deanalyse_stage_duration_seconds",
+    "Duration of pipeline stages (upload: parse, profile, anomalies, kpis)",
+    ("pipeline", "stage", "outcome")
+)
+LLM_REQUEST_SECONDS = registry.histogram(
+    "deanalyse_llm_request_duration_seconds",
+    "Model call latency by operation (plan, synthesis, answer, kpis)",
+    ("operation", "outcome")
+)
+LLM_TOKENS = registry.counter(
+    "deanalyse_llm_tokens_total",
+    "Tokens reported by the model API, by operation and kind (prompt, completion)",
+    ("operation", "kind")
+)
+LLM_RETRIES = registry.counter(
+    "deanalyse_llm_retries_total",
+    "Model calls retried by the LLM gateway, by operation and reason (rate_limit, server_error, timeout, connection)",
+    ("operation", "reason")
+)
+RATE_LIMITED = registry.counter(
+    "deanalyse_rate_limited_requests_total",
+    "Requests rejected with 429 by the per-client rate limiter, by bucket (upload, chat)",
+    ("bucket",)
+)
+ANALYSIS_SECONDS = registry.histogram(
+    "deanalyse_analysis_execution_duration_seconds",
+    "Generated analysis code execution time by engine (pandas, sql)",
+    ("engine", "outcome")
+)
+
+
+def record_usage(operation: str, usage: object) -> None:
+    """Adds the token counts from a completion's `usage` block, when present."""
+    if usage is None:
+        return
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        if tokens:
+            LLM_TOKENS.inc(tokens, operation=operation, kind=kind)
@@ -0,0 +1,85 @@
+import asyncio
+import pandas as pd
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, List
+from config.performance import PROFILING_WORKERS, PROFILING_EXECUTOR
+from services.anomaly_engine import AnomalyEngine
+from services.data_service import DataService
+from services.stats_engine import SummaryAccumulator
+
+
+def _summarize_shard(shard: pd.DataFrame) -> SummaryAccumulator:
+    return SummaryAccumulator(preview_rows=0).update(shard)
+
+
+def _detect_shard_anomalies(shard: pd.DataFrame) -> List[Dict[str, Any]]:
+    return DataService.detect_anomalies(shard)
+
+
+class ProfilingExecutor:
+    """
+    Runs per-column profiling on a worker pool, off the event loop.
+    Columns are split into one shard per worker, each shard is profiled
+    independently and the partial results are reduced in column order.
+    """
+
+    def __init__(self, workers: int = PROFILING_WORKERS, kind: str = PROFILING_EXECUTOR):
+        self.workers = max(1, workers)
+        self.kind = kind
+        self._pool: Executor = None
+
+    @property
+    def pool(self) -> Executor:
+        # Created lazily so importing the module never forks processes
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="profiling")
+        return self._pool
+
+    def _shards(self, columns: List[Any]) -> List[List[Any]]:
+        count = min(self.workers, len(columns)) or 1
+        return [columns[i::count] for i in range(count)]
+
+    async def _map(self, func, df: pd.DataFrame, columns: List[Any], shared: List[Any] = ()) -> list:
+        # `shared` columns are added to every shard (e.g. the time column)
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(self.pool, func, df[shard + list(shared)])
+            for shard in self._shards(columns)
+            if shard
+        ]
+        return await asyncio.gather(*futures)
+
+    async def get_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Parallel equivalent of `DataService.get_summary`.
+        """
+        partials = await self._map(_summarize_shard, df, list(df.columns))
+
+        summary = SummaryAccumulator()
+        summary.update_preview(df)
+        summary.row_count = len(df)
+        for partial in partials:
+            summary.join(partial)
+        summary.columns = {col: summary.columns[col] for col in df.columns if col in summary.columns}
+        return summary.result()
+
+    async def detect_anomalies(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Parallel equivalent of `DataService.detect_anomalies`.
+        """
+        numeric_cols = list(df.select_dtypes(include=['number']).columns)
+        time_column = AnomalyEngine.find_time_column(df)
+        shared = [time_column] if time_column is not None else []
+        partials = await self._map(_detect_shard_anomalies, df, numeric_cols, shared)
+
+        position = {col: i for i, col in enumerate(df.columns)}
+        anomalies = [anomaly for partial in partials for anomaly in partial]
+        return sorted(anomalies, key=lambda anomaly: position[anomaly["column"]])
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
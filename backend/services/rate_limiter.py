@@ -0,0 +1,140 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Slot layout: key hash (0 = empty), tokens, last update (unix seconds)
+SLOT = struct.Struct("<Qdd")
+PROBES = 8  # Slots examined per key before the stalest one is reused
+
+
+def _refill(tokens: float, updated: float, now: float, rate: float, capacity: float) -> float:
+    # Clamped so a clock step backwards never drains a bucket
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+def _take(tokens: float, rate: float, cost: float) -> Tuple[bool, float, float]:
+    """Returns (allowed, tokens left, seconds until `cost` tokens are available)."""
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / rate if rate > 0 else math.inf
+
+
+class TokenBucketStore:
+    """
+    Token buckets kept in this process: each key holds up to `capacity`
+    tokens, refilled at `rate` per second, and a request spends `cost`.
+    Used with a single worker, or where shared memory locking is unavailable.
+    At most `max_keys` buckets are kept; the least recently used is dropped.
+    """
+
+    def __init__(self, max_keys: int = 65536):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """Spends `cost` tokens if available; returns (allowed, retry-after seconds)."""
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            allowed, tokens, retry_after = _take(_refill(tokens, updated, now, rate, capacity), rate, cost)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class SharedTokenBucketStore(TokenBucketStore):
+    """
+    Token buckets in a memory-mapped file, so every worker process on the
+    host (e.g. gunicorn workers) spends from the same buckets. Keys hash into
+    a fixed table of `slots` entries; each check reads and writes one slot
+    under an exclusive flock, so cost is O(1) regardless of client count.
+    When all probed slots are taken by other clients, the stalest is reused
+    and that client starts again from a full bucket (fails open).
+    """
+
+    def __init__(self, path: str, slots: int = 65536):
+        super().__init__(max_keys=0)
+        self.path = path
+        self.slots = slots
+        self._size = slots * SLOT.size
+        self._pid: Optional[int] = None
+        self._fd = -1
+        self._map: Optional[mmap.mmap] = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def _open(self) -> mmap.mmap:
+        # Reopened after fork: flock is tied to the open file, which forked
+        # workers would otherwise share (and so never exclude each other)
+        if self._pid != os.getpid():
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size < self._size:
+                    os.ftruncate(fd, self._size)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            self._fd, self._map, self._pid = fd, mmap.mmap(fd, self._size), os.getpid()
+        return self._map
+
+    @contextmanager
+    def _locked(self) -> Iterator[mmap.mmap]:
+        # flock excludes other processes, the thread lock other threads of this one
+        with self._lock:
+            table = self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield table
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _slot(self, table: mmap.mmap, key_hash: int) -> Tuple[int, bool]:
+        """Offset of the key's slot and whether it already holds the key."""
+        start = key_hash % self.slots
+        reuse, reuse_updated = None, math.inf
+        for probe in range(PROBES):
+            offset = ((start + probe) % self.slots) * SLOT.size
+            slot_key, _, updated = SLOT.unpack_from(table, offset)
+            if slot_key == key_hash:
+                return offset, True
+            if slot_key == 0:
+                updated = -math.inf
+            if updated < reuse_updated:
+                reuse, reuse_updated = offset, updated
+        return reuse, False
+
+    def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        now = time.time()
+        with self._locked() as table:
+            offset, found = self._slot(table, key_hash)
+            if found:
+                _, tokens, updated = SLOT.unpack_from(table, offset)
+                tokens = _refill(tokens, updated, now, rate, capacity)
+            else:
+                tokens = capacity
+            allowed, tokens, retry_after = _take(tokens, rate, cost)
+            SLOT.pack_into(table, offset, key_hash, tokens, now)
+        return allowed, retry_after
+
+
+def create_bucket_store(path: Optional[str], slots: int = 65536) -> TokenBucketStore:
+    """Shared store at `path` when flock is available, else per-process buckets."""
+    if path and fcntl is not None:
+        return SharedTokenBucketStore(path, slots)
+    print("Warning: rate limits are per worker process (no shared bucket store).")
+    return TokenBucketStore(max_keys=slots)
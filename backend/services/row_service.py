@@ -0,0 +1,209 @@
+import base64
+import hashlib
+import hmac
+import json
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional
+from config.performance import ROW_ORDER_CACHE_ENTRIES
+from config.security import ROW_CURSOR_SECRET
+from services.cache import TTLCache
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+FILTER_OPS = ("eq", "ne", "gt", "gte", "lt", "lte", "in", "contains", "isnull", "notnull")
+
+
+class RowService:
+    """
+    Serves pages of a stored DataFrame with projection, filtering and sorting.
+    The filtered/sorted row order for a (dataset, query) is computed once and
+    cached as an array of row positions, so every following page is a cheap
+    positional slice regardless of table size.
+    """
+
+    def __init__(self, order_cache_entries: int = ROW_ORDER_CACHE_ENTRIES):
+        self._orders = TTLCache(order_cache_entries)
+
+    @staticmethod
+    def _column(df: pd.DataFrame, name: str) -> Any:
+        # Excel headers may be non-string labels; match on their string form
+        for col in df.columns:
+            if str(col) == name:
+                return col
+        raise ValueError(f"Unknown column: {name}")
+
+    @staticmethod
+    def fingerprint(sort: Optional[str], descending: bool, filters: List[Dict[str, Any]]) -> str:
+        canonical = json.dumps([sort, descending, filters], sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _sign(payload: str) -> str:
+        digest = hmac.new(ROW_CURSOR_SECRET.encode(), payload.encode(), hashlib.sha256).digest()[:16]
+        return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+    @staticmethod
+    def encode_cursor(offset: int, fingerprint: str) -> str:
+        raw = json.dumps({"offset": offset, "query": fingerprint}).encode()
+        payload = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+        return f"{payload}.{RowService._sign(payload)}"
+
+    @staticmethod
+    def decode_cursor(cursor: str, fingerprint: str) -> int:
+        payload, _, signature = cursor.partition(".")
+        # Security: Cursors are signed, so an edited offset or query is rejected
+        if not hmac.compare_digest(signature.encode(), RowService._sign(payload).encode()):
+            raise ValueError("Invalid cursor")
+        try:
+            data = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+            offset, query = int(data["offset"]), data["query"]
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Invalid cursor")
+        if query != fingerprint or offset < 0:
+            raise ValueError("Cursor does not match this query")
+        return offset
+
+    @staticmethod
+    def _coerce(series: pd.Series, value: Any) -> Any:
+        # Filter values arrive as JSON; compare in the column's own type
+        if pd.api.types.is_bool_dtype(series):
+            return value if isinstance(value, bool) else str(value).lower() == "true"
+        if pd.api.types.is_numeric_dtype(series):
+            return pd.to_numeric(value)
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return pd.Timestamp(value)
+        return value
+
+    @staticmethod
+    def _mask(df: pd.DataFrame, spec: Dict[str, Any]) -> np.ndarray:
+        op = spec["op"]
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        series = df[RowService._column(df, spec["column"])]
+        value = spec.get("value")
+
+        if op == "isnull":
+            mask = series.isna()
+        elif op == "notnull":
+            mask = series.notna()
+        elif op == "contains":
+            mask = series.astype("string").str.contains(str(value), case=False, regex=False)
+        elif op == "in":
+            values = value if isinstance(value, list) else [value]
+            mask = series.isin([RowService._coerce(series, v) for v in values])
+        else:
+            target = RowService._coerce(series, value)
+            mask = {
+                "eq": lambda: series == target,
+                "ne": lambda: series != target,
+                "gt": lambda: series > target,
+                "gte": lambda: series >= target,
+                "lt": lambda: series < target,
+                "lte": lambda: series <= target,
+            }[op]()
+        return mask.fillna(False).to_numpy(dtype=bool)
+
+    def row_order(
+        self,
+        df: pd.DataFrame,
+        dataset_id: str,
+        sort: Optional[str],
+        descending: bool,
+        filters: List[Dict[str, Any]]
+    ) -> Optional[np.ndarray]:
+        """
+        Row positions matching `filters`, in `sort` order (missing values last).
+        Returns None for the unfiltered, unsorted case (plain slicing).
+        """
+        if not sort and not filters:
+            return None
+        key = (dataset_id, self.fingerprint(sort, descending, filters))
+        order = self._orders.get(key)
+        if order is not None:
+            return order
+
+        mask = np.ones(len(df), dtype=bool)
+        for spec in filters:
+            mask &= self._mask(df, spec)
+        order = np.flatnonzero(mask)
+        if sort:
+            values = df[self._column(df, sort)].iloc[order].reset_index(drop=True)
+            ranked = values.sort_values(ascending=not descending, kind="stable", na_position="last")
+            order = order[ranked.index.to_numpy()]
+        self._orders.set(key, order)
+        return order
+
+    @staticmethod
+    def _cells(series: pd.Series) -> list:
+        values = series.tolist()
+        missing = series.isna().to_numpy()
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return [None if m else v.isoformat() for v, m in zip(values, missing)]
+        if missing.any():
+            return [None if m else v for v, m in zip(values, missing)]
+        return values
+
+    def page(
+        self,
+        df: pd.DataFrame,
+        dataset_id: str,
+        columns: Optional[List[str]] = None,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        offset: int = 0,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """
+        One page of rows. Returns the projected frame plus paging metadata;
+        use `to_json_payload` or `to_arrow` to serialize it.
+        """
+        filters = filters or []
+        selected = [self._column(df, name) for name in columns] if columns else list(df.columns)
+        order = self.row_order(df, dataset_id, sort, descending, filters)
+        total = len(df) if order is None else len(order)
+
+        if order is None:
+            frame = df.iloc[offset:offset + limit][selected]
+        else:
+            frame = df.iloc[order[offset:offset + limit]][selected]
+
+        fingerprint = self.fingerprint(sort, descending, filters)
+        end = offset + len(frame)
+        return {
+            "frame": frame,
+            "offset": offset,
+            "total": total,
+            "rowCount": len(df),
+            "nextOffset": end if end < total else None,
+            "nextCursor": self.encode_cursor(end, fingerprint) if end < total else None,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return self._orders.stats()
+
+    @staticmethod
+    def to_json_payload(page: Dict[str, Any]) -> Dict[str, Any]:
+        frame = page["frame"]
+        cells = [RowService._cells(frame.iloc[:, i]) for i in range(frame.shape[1])]
+        payload = {key: value for key, value in page.items() if key != "frame"}
+        payload["columns"] = [str(col) for col in frame.columns]
+        payload["rows"] = [list(row) for row in zip(*cells)]
+        return payload
+
+    @staticmethod
+    def to_arrow(page: Dict[str, Any]) -> bytes:
+        """Serializes the page as an Arrow IPC stream."""
+        if pa is None:
+            raise ValueError("Arrow output requires pyarrow")
+        frame = page["frame"]
+        frame = frame.set_axis([str(col) for col in frame.columns], axis=1)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
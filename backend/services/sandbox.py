@@ -0,0 +1,260 @@
+import functools
+import io
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+from typing import Optional
+import pandas as pd
+from config.performance import (
+    DATASET_CACHE_DIR,
+    SANDBOX_WORKERS,
+    SANDBOX_TIMEOUT_SECONDS,
+    SANDBOX_MEMORY_LIMIT_MB,
+    SANDBOX_MAX_JOBS_PER_WORKER
+)
+from config.security import MAX_DATA_RETENTION_HOURS
+from services.dataset_cache import DatasetDiskCache
+from services.dtype_optimizer import DtypeOptimizer
+
+
+def run_analysis_code(code: str, df: pd.DataFrame) -> str:
+    """
+    Executes generated Python code on the dataframe and describes the outcome.
+    The code is expected to define analyze_data(df) or set a variable 'result'.
+    """
+    try:
+        # Create a localized environment. `print` writes to this call's own
+        # buffer: swapping sys.stdout would mix the output of concurrent calls
+        # when the code runs in-process on the thread pool
+        redirected_output = io.StringIO()
+        df = DtypeOptimizer.for_analysis(df)
+        local_vars = {"df": df, "pd": pd, "result": None, "print": functools.partial(print, file=redirected_output)}
+
+        exec(code, local_vars)
+        result = local_vars["analyze_data"](df) if "analyze_data" in local_vars else local_vars.get("result")
+        captured_output = redirected_output.getvalue()
+
+        if "analyze_data" in local_vars or result is not None:
+            return f"Analysis Result: {result}\nOutput: {captured_output}"
+        return f"Code executed but no result returned. Output: {captured_output}"
+
+    except Exception as e:
+        return f"Error executing code: {str(e)}\n{traceback.format_exc()}"
+
+
+def _load_arrow(path: str) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    with pa.memory_map(path, "r") as source:
+        # Converted once per loaded dataset rather than once per question
+        return DtypeOptimizer.for_analysis(ipc.open_file(source).read_all().to_pandas())
+
+
+def _limit_address_space(limit_bytes: int) -> None:
+    """
+    Caps the worker's virtual memory at its current size plus `limit_bytes`,
+    so an allocation past the limit fails with MemoryError at once instead of
+    waiting for the parent's RSS poll (which stays as a backstop).
+    """
+    if resource is None:
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+        limit = current + limit_bytes
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (OSError, ValueError, IndexError):
+        pass  # Not Linux: rely on the RSS poll
+
+
+def _worker_main(conn, memory_limit_bytes: Optional[int] = None) -> None:
+    """
+    Sandbox worker loop. Keeps the most recently used dataset loaded so
+    follow-up questions on the same upload don't reload it.
+    """
+    if memory_limit_bytes:
+        _limit_address_space(memory_limit_bytes)
+    loaded_path, loaded_df = None, None
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        code, dataset_path, df = job
+        if df is None:
+            if dataset_path != loaded_path:
+                loaded_path, loaded_df = None, None
+                try:
+                    loaded_df = _load_arrow(dataset_path)
+                except Exception as e:
+                    conn.send(f"Error executing code: could not load dataset ({e})")
+                    continue
+                loaded_path = dataset_path
+            # Shallow copy: generated code can't alter the cached frame (copy-on-write)
+            df = loaded_df.copy(deep=False)
+
+        conn.send(run_analysis_code(code, df))
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None  # Not Linux, or the process is gone
+
+
+class SandboxWorker:
+    def __init__(self, context, memory_limit_bytes: Optional[int] = None):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_limit_bytes), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class SandboxPool:
+    """
+    Pool of warm worker processes that run generated analysis code outside
+    the API process. Workers fork from a forkserver with pandas preloaded and
+    read datasets by memory-mapping their Arrow files, so only the code and the
+    result string cross the pipe. Each job is bounded by a wall-clock timeout
+    and a memory limit (an address-space rlimit in the worker, plus an RSS
+    poll); offending workers are killed and replaced, and workers
+    are recycled after `max_jobs_per_worker` jobs.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        timeout_seconds: float,
+        memory_limit_bytes: int,
+        max_jobs_per_worker: int,
+        dataset_cache: DatasetDiskCache
+    ):
+        self.size = size
+        self.dataset_cache = dataset_cache
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_bytes = memory_limit_bytes
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._idle: "queue.Queue[SandboxWorker]" = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._context = None
+        self.jobs = 0
+        self.timeouts = 0
+        self.memory_kills = 0
+        self.crashes = 0
+        self.recycled = 0
+
+    def _ensure_started(self) -> None:
+        with self._start_lock:
+            if self._context is not None:
+                return
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                self._context = multiprocessing.get_context("forkserver")
+                self._context.set_forkserver_preload(["pandas", "pyarrow", "services.sandbox"])
+            else:
+                self._context = multiprocessing.get_context("spawn")
+            for _ in range(self.size):
+                self._idle.put(SandboxWorker(self._context, self.memory_limit_bytes))
+
+    def _replace(self, worker: SandboxWorker) -> None:
+        worker.kill()
+        self._idle.put(SandboxWorker(self._context, self.memory_limit_bytes))
+
+    def run(self, code: str, df: pd.DataFrame, dataset_id: Optional[str] = None) -> str:
+        """
+        Runs `code` against the persisted copy of `dataset_id` when one exists,
+        otherwise against a pickled copy of `df`. Blocking; call it from a
+        worker thread.
+        """
+        dataset_path = None
+        if dataset_id and self.dataset_cache.has(dataset_id):
+            dataset_path = self.dataset_cache.dataset_path(dataset_id)
+
+        self._ensure_started()
+        worker = self._idle.get()
+        self.jobs += 1
+        try:
+            worker.conn.send((code, dataset_path, None if dataset_path else df))
+        except (BrokenPipeError, OSError):
+            self.crashes += 1
+            self._replace(worker)
+            return "Error executing code: analysis worker was unavailable"
+
+        deadline = time.monotonic() + self.timeout_seconds
+        while True:
+            try:
+                if worker.conn.poll(0.05):
+                    output = worker.conn.recv()
+                    break
+            except (EOFError, OSError):
+                self.crashes += 1
+                self._replace(worker)
+                return "Error executing code: analysis worker exited unexpectedly"
+
+            if time.monotonic() > deadline:
+                self.timeouts += 1
+                self._replace(worker)
+                return f"Error executing code: analysis exceeded the {self.timeout_seconds}s time limit"
+
+            rss = _rss_bytes(worker.process.pid)
+            if rss is not None and rss > self.memory_limit_bytes:
+                self.memory_kills += 1
+                self._replace(worker)
+                return f"Error executing code: analysis exceeded the {self.memory_limit_bytes // (1024*1024)}MB memory limit"
+
+        worker.jobs += 1
+        if worker.jobs >= self.max_jobs_per_worker:
+            self.recycled += 1
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+        return output
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.size,
+            "idle": self._idle.qsize(),
+            "jobs": self.jobs,
+            "timeouts": self.timeouts,
+            "memoryKills": self.memory_kills,
+            "crashes": self.crashes,
+            "recycled": self.recycled,
+        }
+
+    def shutdown(self) -> None:
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            worker.kill()
+
+
+# Shared by every AIService instance; worker processes start on first use
+sandbox_pool = SandboxPool(
+    size=SANDBOX_WORKERS,
+    timeout_seconds=SANDBOX_TIMEOUT_SECONDS,
+    memory_limit_bytes=SANDBOX_MEMORY_LIMIT_MB * 1024 * 1024,
+    max_jobs_per_worker=SANDBOX_MAX_JOBS_PER_WORKER,
+    dataset_cache=DatasetDiskCache(DATASET_CACHE_DIR, retention_seconds=MAX_DATA_RETENTION_HOURS * 3600)
+)
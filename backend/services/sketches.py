@@ -0,0 +1,205 @@
+import numpy as np
+from typing import List, Optional
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """
+    Vectorized int.bit_length for uint64 arrays (exact, no float rounding).
+    """
+    x = values.copy()
+    length = np.zeros(len(x), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = x >= np.uint64(1 << shift)
+        length += (big * shift).astype(np.uint8)
+        x = np.where(big, x >> np.uint64(shift), x)
+    length += (x > 0).astype(np.uint8)
+    return length
+
+
+class HyperLogLog:
+    """
+    Bounded-memory distinct counter over 64-bit hashes.
+    Uses 2^precision one-byte registers; the relative standard error is
+    1.04 / sqrt(2^precision) (0.81% at the default precision of 14).
+    Small cardinalities fall back to linear counting and are near exact.
+    """
+    approximate = True
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        rest = hashes << p
+        rank = (np.uint8(64 - self.precision + 1) - _bit_length(rest >> p)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+class ExactDistinct:
+    """
+    Exact distinct counter over 64-bit hashes (memory grows with cardinality).
+    """
+    approximate = False
+
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, hashes: np.ndarray) -> None:
+        if len(hashes):
+            self.hashes = np.union1d(self.hashes, hashes)
+
+    def merge(self, other: "ExactDistinct") -> "ExactDistinct":
+        self.hashes = np.union1d(self.hashes, other.hashes)
+        return self
+
+    def estimate(self) -> int:
+        return int(len(self.hashes))
+
+
+class AdaptiveDistinct:
+    """
+    Exact distinct counter that switches to a HyperLogLog sketch once more
+    than `limit` distinct hashes have been seen, so small and medium columns
+    get exact counts and memory stays bounded (8 bytes per hash up to the limit).
+    """
+
+    def __init__(self, limit: int, precision: int = 14):
+        self.limit = limit
+        self.precision = precision
+        self.exact: Optional[ExactDistinct] = ExactDistinct()
+        self.sketch: Optional[HyperLogLog] = None
+
+    @property
+    def approximate(self) -> bool:
+        return self.sketch is not None
+
+    def _promote(self) -> HyperLogLog:
+        if self.sketch is None:
+            self.sketch = HyperLogLog(self.precision)
+            self.sketch.update(self.exact.hashes)
+            self.exact = None
+        return self.sketch
+
+    def update(self, hashes: np.ndarray) -> None:
+        if self.sketch is not None:
+            self.sketch.update(hashes)
+            return
+        self.exact.update(hashes)
+        if self.exact.estimate() > self.limit:
+            self._promote()
+
+    def merge(self, other: "AdaptiveDistinct") -> "AdaptiveDistinct":
+        if self.sketch is None and other.sketch is None:
+            self.exact.merge(other.exact)
+            if self.exact.estimate() > self.limit:
+                self._promote()
+            return self
+        if other.sketch is None:
+            self._promote().update(other.exact.hashes)
+        else:
+            self._promote().merge(other.sketch)
+        return self
+
+    def estimate(self) -> int:
+        return self.sketch.estimate() if self.sketch is not None else self.exact.estimate()
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (Karnin, Lang & Liberty).
+    Memory is O(k) items regardless of stream length; with k=200 the
+    normalized rank error is about 1.65% (99% confidence).
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item stays behind so weights remain exact
+                keep = items[:1] if len(items) % 2 else items[:0]
+                pairs = items[len(keep):]
+                offset = int(self.rng.integers(2))
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[offset::2]])
+            level += 1
+
+    def update(self, values: np.ndarray) -> None:
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype="float64")])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+        return self
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return [None for _ in qs]
+        weights = np.concatenate([np.full(len(lvl), 2.0 ** i) for i, lvl in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs) * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)
+        return [float(v) for v in items[idx]]
+
+
+class ExactQuantiles:
+    """
+    Exact quantiles; keeps every value, so memory grows with row count.
+    """
+
+    def __init__(self):
+        self.parts: List[np.ndarray] = []
+
+    def update(self, values: np.ndarray) -> None:
+        if len(values):
+            self.parts.append(np.asarray(values, dtype="float64"))
+
+    def merge(self, other: "ExactQuantiles") -> "ExactQuantiles":
+        self.parts.extend(other.parts)
+        return self
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        if not self.parts:
+            return [None for _ in qs]
+        return [float(v) for v in np.quantile(np.concatenate(self.parts), qs)]
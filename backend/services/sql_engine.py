@@ -0,0 +1,164 @@
+import os
+import re
+import threading
+import pandas as pd
+from typing import Dict, Optional, Tuple, Union
+from config.performance import (
+    DATASET_CACHE_DIR,
+    SQL_THREADS,
+    SQL_MEMORY_LIMIT_MB,
+    SQL_TIMEOUT_SECONDS,
+    SQL_MAX_RESULT_ROWS
+)
+
+try:
+    import duckdb
+    HAS_DUCKDB = True
+except ImportError:  # pragma: no cover - optional dependency
+    duckdb = None
+    HAS_DUCKDB = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    ipc = None
+
+# A table is either an on-disk Arrow IPC file (memory-mapped, never fully loaded) or a DataFrame
+TableSource = Union[str, pd.DataFrame]
+
+
+class SQLEngine:
+    """
+    Runs model-written SQL on DuckDB over a session's uploads. Arrow files from
+    the dataset cache are memory-mapped and registered as tables, so queries
+    scan only the columns they touch, run on SQL_THREADS threads and spill
+    large sorts/joins to disk past SQL_MEMORY_LIMIT_MB.
+
+    Security: the database has external access disabled and its configuration
+    locked (no file reads/writes, ATTACH or extension installs), each query
+    gets its own cursor so registered tables are private to it, and only a
+    single SELECT statement is accepted.
+    """
+
+    def __init__(
+        self,
+        threads: int = SQL_THREADS,
+        memory_limit_mb: int = SQL_MEMORY_LIMIT_MB,
+        timeout_seconds: float = SQL_TIMEOUT_SECONDS,
+        max_rows: int = SQL_MAX_RESULT_ROWS,
+        spill_dir: str = os.path.join(DATASET_CACHE_DIR, "sql_spill")
+    ):
+        self.threads = threads
+        self.memory_limit_mb = memory_limit_mb
+        self.timeout_seconds = timeout_seconds
+        self.max_rows = max_rows
+        self.spill_dir = spill_dir
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return HAS_DUCKDB and pa is not None
+
+    def _database(self):
+        # Created lazily and shared; cursors are independent connections to it
+        with self._lock:
+            if self._connection is None:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                connection = duckdb.connect(config={
+                    "threads": self.threads,
+                    "memory_limit": f"{self.memory_limit_mb}MB",
+                })
+                connection.execute(f"SET temp_directory = '{self.spill_dir}'")
+                connection.execute("SET enable_external_access = false")
+                connection.execute("SET lock_configuration = true")
+                self._connection = connection
+            return self._connection
+
+    @staticmethod
+    def table_name(filename: str, sheet: Optional[str] = None) -> str:
+        """SQL identifier for an upload: file stem (plus sheet), lowercased, [a-z0-9_] only."""
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        if sheet and sheet != "*":
+            stem = f"{stem}_{sheet}"
+        name = re.sub(r"[^a-z0-9_]+", "_", stem.lower()).strip("_") or "data"
+        if name[0].isdigit():
+            name = f"t_{name}"
+        return name[:63]
+
+    @staticmethod
+    def validate(sql: str) -> str:
+        sql = sql.strip().rstrip(";").strip()
+        try:
+            statements = duckdb.extract_statements(sql)
+        except duckdb.Error as e:
+            raise ValueError(f"Invalid SQL: {e}")
+        if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+            raise ValueError("Only a single SELECT query is allowed")
+        return sql
+
+    @staticmethod
+    def _open(source: TableSource):
+        if isinstance(source, str):
+            with pa.memory_map(source, "r") as mapped:
+                return ipc.open_file(mapped).read_all()
+        return source
+
+    def _cursor(self, tables: Dict[str, TableSource]):
+        cursor = self._database().cursor()
+        for name, source in tables.items():
+            cursor.register(name, self._open(source))
+        return cursor
+
+    def describe(self, tables: Dict[str, TableSource]) -> str:
+        """Table schemas in SQL types, one line per table, for the planning prompt."""
+        cursor = self._cursor(tables)
+        try:
+            lines = []
+            for name in tables:
+                columns = cursor.execute(f'DESCRIBE "{name}"').fetchall()
+                lines.append(f"{name}(" + ", ".join(f'"{col[0]}" {col[1]}' for col in columns) + ")")
+            return "\n".join(lines)
+        finally:
+            cursor.close()
+
+    def query(self, sql: str, tables: Dict[str, TableSource]) -> Tuple[pd.DataFrame, bool]:
+        """
+        Runs one SELECT and returns at most `max_rows` rows plus whether the
+        result was truncated. Queries running past the timeout are interrupted.
+        """
+        sql = self.validate(sql)
+        cursor = self._cursor(tables)
+        timer = threading.Timer(self.timeout_seconds, cursor.interrupt)
+        timer.start()
+        try:
+            frame = cursor.sql(sql).limit(self.max_rows + 1).df()
+        except duckdb.InterruptException:
+            raise ValueError(f"Query exceeded the {self.timeout_seconds}s time limit")
+        finally:
+            timer.cancel()
+            cursor.close()
+        return frame.head(self.max_rows), len(frame) > self.max_rows
+
+    def run(self, sql: str, tables: Dict[str, TableSource]) -> str:
+        """
+        Executes `sql` and describes the outcome in the same form as
+        run_analysis_code, so the synthesis step treats both engines alike.
+        """
+        try:
+            frame, truncated = self.query(sql, tables)
+        except (ValueError, duckdb.Error) as e:
+            return f"Error executing code: {str(e)}"
+        note = f"\n(first {self.max_rows} rows shown)" if truncated else ""
+        return f"Analysis Result:\n{frame.to_string(index=False)}{note}"
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+sql_engine = SQLEngine()
@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional
+from config.performance import SUMMARY_STATS_MODE, HLL_PRECISION, DISTINCT_EXACT_LIMIT, KLL_K
+from services.sketches import AdaptiveDistinct, ExactDistinct, KLLSketch, ExactQuantiles
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class ColumnAccumulator:
+    """
+    Mergeable per-column statistics.
+    Partial results from separate chunks (or separate workers) are combined
+    with `merge`, using Chan's parallel update for mean and variance.
+    In "approximate" mode quantiles come from a bounded-memory sketch and
+    distinct counts are exact up to DISTINCT_EXACT_LIMIT values, then from a
+    HyperLogLog sketch (see services/sketches.py for error bounds); "exact"
+    mode keeps every hash and value instead.
+    """
+
+    def __init__(self, name: Any, mode: str = SUMMARY_STATS_MODE):
+        self.name = name
+        self.mode = mode
+        self.dtype: Optional[str] = None
+        self.numeric = True
+        self.count = 0
+        self.missing = 0
+        self.min = np.nan
+        self.max = np.nan
+        self.mean = 0.0
+        self.m2 = 0.0
+        if mode == "exact":
+            self.distinct = ExactDistinct()
+            self.quantiles = ExactQuantiles()
+        else:
+            self.distinct = AdaptiveDistinct(DISTINCT_EXACT_LIMIT, HLL_PRECISION)
+            self.quantiles = KLLSketch(KLL_K)
+
+    def _merge_dtype(self, dtype: str) -> None:
+        if self.dtype is None or self.dtype == dtype:
+            self.dtype = dtype
+        elif self.numeric:
+            self.dtype = "float64"
+        else:
+            self.dtype = "object"
+
+    def _merge_moments(self, count: int, mean: float, m2: float) -> None:
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def update_distinct(self, col_data: pd.Series) -> None:
+        """
+        Folds the hashed non-null values of a chunk into the distinct set.
+        """
+        valid = col_data.dropna()
+        if valid.empty:
+            return
+        self.distinct.update(pd.util.hash_array(valid.to_numpy()))
+
+    def merge(self, other: "ColumnAccumulator") -> "ColumnAccumulator":
+        self.numeric = self.numeric and other.numeric
+        if other.dtype is not None:
+            self._merge_dtype(other.dtype)
+        self.missing += other.missing
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._merge_moments(other.count, other.mean, other.m2)
+        self.distinct.merge(other.distinct)
+        self.quantiles.merge(other.quantiles)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        col_info = {
+            "name": self.name,
+            "type": self.dtype,
+            "missing": int(self.missing),
+            # Sketch estimates can overshoot slightly; distinct never exceeds count
+            "unique": min(self.distinct.estimate(), int(self.count)),
+            "uniqueApproximate": self.distinct.approximate,
+            "count": int(self.count),
+        }
+
+        if self.numeric:
+            has_values = self.count > 0
+            p50, p95, p99 = self.quantiles.quantiles(list(QUANTILES))
+            col_info["stats"] = {
+                "min": float(self.min) if has_values else None,
+                "max": float(self.max) if has_values else None,
+                "mean": float(self.mean) if has_values else None,
+                "std": float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else None,
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+            }
+
+        return col_info
+
+
+class SummaryAccumulator:
+    """
+    Builds the `DataService.get_summary` payload one chunk at a time.
+    Numeric columns are reduced together as a single 2-D array per chunk.
+    """
+
+    def __init__(self, preview_rows: int = 5, mode: str = SUMMARY_STATS_MODE):
+        self.preview_rows = preview_rows
+        self.mode = mode
+        self.row_count = 0
+        self.columns: Dict[Any, ColumnAccumulator] = {}
+        self.preview: List[Dict[str, Any]] = []
+
+    def _column(self, name: Any) -> ColumnAccumulator:
+        if name not in self.columns:
+            self.columns[name] = ColumnAccumulator(name, self.mode)
+        return self.columns[name]
+
+    def update_preview(self, df: pd.DataFrame) -> None:
+        if len(self.preview) < self.preview_rows:
+            head = df.head(self.preview_rows - len(self.preview))
+            # Native scalars; NaN/NaT/Timestamps are left to the response encoder
+            self.preview.extend(head.to_dict(orient='records'))
+
+    def update(self, df: pd.DataFrame) -> "SummaryAccumulator":
+        self.update_preview(df)
+        self.row_count += len(df)
+        numeric_cols = []
+
+        for col in df.columns:
+            col_data = df[col]
+            acc = self._column(col)
+            is_numeric = pd.api.types.is_numeric_dtype(col_data)
+            acc.numeric = acc.numeric and is_numeric
+            acc._merge_dtype(str(col_data.dtype))
+            acc.update_distinct(col_data)
+            if is_numeric:
+                numeric_cols.append(col)
+            else:
+                valid = int(col_data.notna().sum())
+                acc.count += valid
+                acc.missing += len(col_data) - valid
+
+        if numeric_cols:
+            self._update_numeric(df, numeric_cols)
+
+        return self
+
+    def _update_numeric(self, df: pd.DataFrame, numeric_cols: List[Any]) -> None:
+        block = df[numeric_cols].to_numpy(dtype="float64", na_value=np.nan)
+        valid = ~np.isnan(block)
+        counts = valid.sum(axis=0)
+        filled = np.where(valid, block, 0.0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sums = filled.sum(axis=0)
+            means = np.where(counts > 0, sums / np.maximum(counts, 1), 0.0)
+            m2s = (np.where(valid, block - means, 0.0) ** 2).sum(axis=0)
+            mins = np.where(valid, block, np.inf).min(axis=0, initial=np.inf)
+            maxs = np.where(valid, block, -np.inf).max(axis=0, initial=-np.inf)
+
+        for i, col in enumerate(numeric_cols):
+            acc = self.columns[col]
+            count = int(counts[i])
+            acc.missing += len(block) - count
+            if count == 0:
+                continue
+            acc.min = np.fmin(acc.min, mins[i])
+            acc.max = np.fmax(acc.max, maxs[i])
+            acc._merge_moments(count, float(means[i]), float(m2s[i]))
+            acc.quantiles.update(block[valid[:, i], i])
+
+    def merge(self, other: "SummaryAccumulator") -> "SummaryAccumulator":
+        """
+        Combines partial results for row chunks of the same dataset.
+        `other` must cover rows that come after the rows seen by `self`.
+        """
+        self.row_count += other.row_count
+        if len(self.preview) < self.preview_rows:
+            self.preview.extend(other.preview[:self.preview_rows - len(self.preview)])
+        for name, acc in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(acc)
+            else:
+                self.columns[name] = acc
+        return self
+
+    def join(self, other: "SummaryAccumulator") -> "SummaryAccumulator":
+        """
+        Combines partial results for disjoint column shards of the same rows.
+        """
+        self.row_count = max(self.row_count, other.row_count)
+        self.columns.update(other.columns)
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "rowCount": self.row_count,
+            "columnCount": len(self.columns),
+            "columns": [acc.to_dict() for acc in self.columns.values()],
+            "preview": self.preview,
+            "statsMode": self.mode,
+        }
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import datasets
+from routers.upload import dataset_store
+from services.aggregation_service import AggregationService
+
+SESSION = "aggregate-test-session"
+
+
+def sales():
+    return pd.DataFrame({
+        "date": ["2024-01-01 09:00", "2024-01-01 17:00", "2024-01-02 10:00", "2024-01-04 12:00", "bad"],
+        "region": ["north", "south", "north", "east", "west"],
+        "revenue": [10.0, 5.0, 7.0, 3.0, 1.0],
+    })
+
+
+def test_timeseries_buckets_by_interval():
+    result = AggregationService.aggregate(sales(), {"kind": "timeseries", "column": "date", "value": "revenue", "agg": "sum", "interval": "day"})
+    # Unparseable dates are dropped; empty days between still get a bucket
+    assert [(p["key"][:10], p["value"]) for p in result["series"]] == [
+        ("2024-01-01", 15.0), ("2024-01-02", 7.0), ("2024-01-03", 0.0), ("2024-01-04", 3.0)
+    ]
+    counts = AggregationService.aggregate(sales(), {"kind": "timeseries", "column": "date", "interval": "day"})
+    assert [p["value"] for p in counts["series"]] == [2, 1, 0, 1]
+
+
+def test_topn_returns_largest_groups_and_the_remainder():
+    result = AggregationService.aggregate(sales(), {"kind": "topn", "column": "region", "value": "revenue", "agg": "sum", "limit": 2})
+    assert result["series"] == [{"key": "north", "value": 17.0}, {"key": "south", "value": 5.0}]
+    assert (result["groups"], result["truncated"], result["other"]) == (4, True, 4.0)
+
+
+@pytest.mark.parametrize("query, message", [
+    ({"kind": "topn", "column": "missing"}, "Unknown column"),
+    ({"kind": "topn", "column": "region", "value": "missing"}, "Unknown column"),
+    ({"kind": "topn", "column": "region", "value": "revenue", "agg": "variance"}, "Unsupported aggregation"),
+    ({"kind": "topn", "column": "region", "value": "region", "agg": "mean"}, "not numeric"),
+    ({"kind": "timeseries", "column": "region"}, "does not contain dates"),
+    ({"kind": "pivot", "column": "region"}, "Unsupported aggregate kind"),
+])
+def test_invalid_queries_are_rejected(query, message):
+    with pytest.raises(ValueError, match=message):
+        AggregationService.aggregate(sales(), query)
+
+
+def test_aggregate_endpoint_validates_columns_and_functions():
+    app = FastAPI()
+    app.include_router(datasets.router, prefix="/api")
+    client = TestClient(app, headers={"X-Session-ID": SESSION})
+    dataset_store.put(SESSION, {}, sales(), dataset_id="d1")
+    try:
+        url = "/api/datasets/d1/aggregate"
+        ok = client.post(url, json={"kind": "topn", "column": "region", "value": "revenue", "limit": 1})
+        assert ok.status_code == 200 and ok.json()["series"] == [{"key": "north", "value": 17.0}]
+        unknown_column = client.post(url, json={"kind": "groupby", "column": "nope"})
+        assert unknown_column.status_code == 400 and "Unknown column" in unknown_column.json()["detail"]
+        assert client.post(url, json={"kind": "groupby", "column": "region", "agg": "variance"}).status_code == 422
+        assert client.post(url, json={"kind": "pivot", "column": "region"}).status_code == 422
+        assert client.post("/api/datasets/other/aggregate", json={"kind": "groupby", "column": "region"}).status_code == 404
+    finally:
+        dataset_store.discard(SESSION)
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.anomaly_engine import AnomalyEngine, Detector
+
+
+def test_detector_requires_severity():
+    with pytest.raises(TypeError):
+        Detector()
+
+
+def test_detect_chunks_closes_every_stream():
+    opened, closed = [], []
+    values = np.r_[np.zeros(200), 50.0]
+
+    def chunks():
+        # The previous pass's stream is closed before the next one opens
+        assert len(closed) == len(opened)
+        opened.append(True)
+        try:
+            for start in range(0, len(values), 100):
+                yield pd.DataFrame({"x": values[start:start + 100]})
+        finally:
+            closed.append(True)
+
+    anomalies = AnomalyEngine(methods=["zscore"]).detect_chunks(chunks)
+    assert [a["rows"][0]["row"] for a in anomalies] == [200]
+    assert len(opened) == len(closed) == 3
@@ -0,0 +1,74 @@
+import pandas as pd
+
+from services.dataset_store import DatasetStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def frame(rows=100):
+    return pd.DataFrame({"x": range(rows)})
+
+
+FRAME_BYTES = int(frame().memory_usage(deep=True).sum())
+
+
+def make_store(clock, entries=3, ttl=3600, idle=600):
+    return DatasetStore(max_bytes=entries * FRAME_BYTES, ttl_seconds=ttl, idle_seconds=idle, clock=clock)
+
+
+def test_least_recently_used_session_is_evicted_first():
+    store = make_store(Clock())
+    for session_id in ("a", "b", "c"):
+        store.put(session_id, {}, frame())
+    store.get("a")  # "b" is now the least recently used
+    store.put("d", {}, frame())
+    assert store.get("b") is None
+    assert all(store.get(session_id) is not None for session_id in ("a", "c", "d"))
+    stats = store.stats()
+    assert (stats["entries"], stats["evictions"], stats["bytes"]) == (3, 1, 3 * FRAME_BYTES)
+
+
+def test_newest_entry_is_kept_even_over_budget():
+    store = make_store(Clock(), entries=1)
+    store.put("a", {}, frame())
+    store.put("b", {}, frame(1000))
+    assert store.get("a") is None
+    assert store.get("b") is not None
+
+
+def test_entries_expire_after_ttl_and_idle_time():
+    clock = Clock()
+    store = make_store(clock, ttl=100, idle=30)
+    store.put("active", {}, frame())
+    store.put("idle", {}, frame())
+    for _ in range(4):
+        clock.now += 20
+        assert store.get("active") is not None
+    # "idle" was last touched 80s ago; "active" is within its idle window
+    assert store.get("idle") is None
+    clock.now += 21
+    # 101s after upload, regardless of recent access
+    assert store.get("active") is None
+    stats = store.stats()
+    assert (stats["entries"], stats["expirations"], stats["bytes"]) == (0, 2, 0)
+
+
+def test_sessions_are_isolated():
+    store = make_store(Clock())
+    store.put("a", {"rowCount": 1}, frame(1), dataset_id="d1")
+    store.put("b", {"rowCount": 2}, frame(2), dataset_id="d2")
+    assert store.get("a").summary == {"rowCount": 1} and store.get("a").dataset_id == "d1"
+    assert len(store.get("b").df) == 2
+    # Re-uploading replaces only that session's dataset
+    store.put("a", {"rowCount": 3}, frame(3))
+    assert store.get("a").summary == {"rowCount": 3}
+    assert store.get("b").summary == {"rowCount": 2}
+    store.discard("b")
+    assert store.get("b") is None and store.get("a") is not None
+    assert store.get("c") is None
@@ -0,0 +1,49 @@
+import pandas as pd
+from services.dtype_optimizer import DtypeOptimizer
+
+
+def test_numeric_columns_keep_64_bit_dtypes():
+    df = pd.DataFrame({"Qty": [10, 12, 120], "Units": [15, 15, 100], "Price": [1.5, 2.25, 3.0]})
+    optimized, _ = DtypeOptimizer.optimize(df)
+    assert optimized["Qty"].dtype == "int64"
+    assert optimized["Price"].dtype == "float64"
+
+
+def test_arithmetic_on_small_int_columns_does_not_overflow():
+    df = pd.DataFrame({"Qty": [10, 12, 120], "Units": [15, 15, 100]})
+    optimized, _ = DtypeOptimizer.optimize(df)
+    assert (optimized.Qty * optimized.Units).tolist() == [150, 180, 12000]
+    assert (optimized.Qty * 1000).tolist() == [10000, 12000, 120000]
+
+
+def test_text_columns_are_still_compacted():
+    df = pd.DataFrame({
+        "Region": ["north", "south"] * 50,
+        "Date": ["2024-01-01", "2024-02-01"] * 50,
+    })
+    optimized, report = DtypeOptimizer.optimize(df)
+    assert isinstance(optimized["Region"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(optimized["Date"])
+    assert report["afterBytes"] < report["beforeBytes"]
+
+
+def test_generated_code_sees_plain_text_columns():
+    from services.sandbox import run_analysis_code
+
+    df = pd.DataFrame({"Region": ["north", "south"] * 50, "Sales": range(100)})
+    optimized, _ = DtypeOptimizer.optimize(df)
+    assert isinstance(optimized["Region"].dtype, pd.CategoricalDtype)
+
+    code = """
+def analyze_data(df):
+    df.loc[df['Sales'] > 90, 'Region'] = 'west'
+    upper = df['Region'].str.upper()
+    merged = pd.concat([df, pd.DataFrame({'Region': ['east'], 'Sales': [1]})])
+    groups = merged.groupby('Region')['Sales'].count()
+    return (sorted(groups.index), upper.iloc[-1], str(merged['Region'].dtype))
+"""
+    output = run_analysis_code(code, optimized)
+    assert output.startswith("Analysis Result: (['east', 'north', 'south', 'west'], 'WEST'"), output
+    assert "category" not in output
+    # The stored frame keeps its compact dtype
+    assert isinstance(optimized["Region"].dtype, pd.CategoricalDtype)
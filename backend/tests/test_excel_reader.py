@@ -0,0 +1,32 @@
+import io
+
+import pandas as pd
+import pytest
+from services.excel_reader import ExcelReader
+
+
+def workbook(rows: int, columns: int = 2) -> io.BytesIO:
+    buffer = io.BytesIO()
+    pd.DataFrame({f"c{i}": range(rows) for i in range(columns)}).to_excel(buffer, index=False, sheet_name="Data")
+    return buffer
+
+
+def test_sheet_at_the_row_limit_is_read():
+    assert len(ExcelReader.read_sheet(workbook(5), "data.xlsx", "Data", max_rows=5)) == 5
+
+
+def test_rows_past_the_limit_are_rejected_not_dropped():
+    with pytest.raises(ValueError, match="rows. Maximum is 5"):
+        ExcelReader.read_sheet(workbook(6), "data.xlsx", "Data", max_rows=5)
+
+
+def test_columns_past_the_limit_are_rejected():
+    with pytest.raises(ValueError, match="3 columns. Maximum is 2"):
+        ExcelReader.read_sheet(workbook(2, columns=3), "data.xlsx", "Data", max_columns=2)
+
+
+def test_read_reuses_an_existing_sheet_listing():
+    source = workbook(3)
+    sheets = ExcelReader.list_sheets(source, "data.xlsx")
+    assert sheets == [{"name": "Data", "rows": 3, "columns": 2}]
+    assert len(ExcelReader.read(source, "data.xlsx", sheets=sheets)) == 3
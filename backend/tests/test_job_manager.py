@@ -0,0 +1,73 @@
+import asyncio
+import json
+import os
+
+from services.job_manager import JobManager
+
+
+def make_manager(tmp_path, **options):
+    return JobManager(max_jobs=100, ttl_seconds=3600, concurrency=2, state_dir=str(tmp_path), **options)
+
+
+def read_state(tmp_path, job_id):
+    with open(os.path.join(tmp_path, f"{job_id}.json")) as f:
+        return json.load(f)
+
+
+def test_state_changes_are_coalesced_into_few_writes(tmp_path):
+    manager = make_manager(tmp_path, persist_interval=0.05)
+    writes = []
+    write = manager._write
+    manager._write = lambda job_id, data: (writes.append(job_id), write(job_id, data))
+
+    async def main():
+        job = manager.create(["parse", "profile"], session_id="s1")
+
+        async def work():
+            for name in ("parse", "profile"):
+                with job.stage(name):
+                    await asyncio.sleep(0)
+                job.publish(**{name: "ok"})
+            return {"summary": {"rowCount": 3}}
+
+        manager.submit(job, work, error_message="failed")
+        while manager._tasks or manager._writes:
+            await asyncio.sleep(0.01)
+        return job
+
+    job = asyncio.run(main())
+    # Creation, then one debounced write for the burst of stage changes
+    assert len(writes) <= 3
+    state = read_state(tmp_path, job.job_id)
+    assert state["status"] == "done"
+    assert state["result"]["summary"] == {"rowCount": 3}
+    assert state["session_id"] == "s1"
+
+
+def test_new_job_is_on_disk_before_its_first_poll(tmp_path):
+    manager = make_manager(tmp_path)
+    other_worker = make_manager(tmp_path)
+
+    async def main():
+        job = manager.create(["parse"], session_id="s1")
+        while manager._writes:
+            await asyncio.sleep(0.01)
+        return job
+
+    job = asyncio.run(main())
+    assert other_worker.get(job.job_id)["status"] == "queued"
+
+
+def test_prune_runs_on_an_interval_not_every_create(tmp_path):
+    manager = make_manager(tmp_path, prune_interval=3600)
+    prunes = []
+    manager.prune = lambda: prunes.append(1)
+
+    async def main():
+        for _ in range(5):
+            manager.create(["parse"])
+        while manager._writes:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert len(prunes) == 1
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from routers.limits import RouteLimiter
+
+
+async def enter(limiter):
+    dependency = limiter()
+    await dependency.__anext__()
+    return dependency
+
+
+async def leave(dependency):
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+
+
+def test_queued_request_times_out_with_retry_after():
+    async def main():
+        limiter = RouteLimiter(limit=1, wait_seconds=0.05)
+        held = await enter(limiter)
+        with pytest.raises(HTTPException) as rejected:
+            await enter(limiter)
+        assert rejected.value.status_code == 503
+        assert rejected.value.headers["Retry-After"] == "1"
+        await leave(held)
+        assert limiter.semaphore._value == 1
+
+    asyncio.run(main())
+
+
+def test_queued_request_gets_the_released_permit():
+    async def main():
+        limiter = RouteLimiter(limit=1, wait_seconds=1)
+        held = await enter(limiter)
+        waiting = asyncio.ensure_future(enter(limiter))
+        await asyncio.sleep(0.01)
+        await leave(held)
+        await leave(await waiting)
+        assert limiter.semaphore._value == 1
+
+    asyncio.run(main())
+
+
+def test_permit_granted_to_an_abandoned_wait_is_returned():
+    async def main():
+        limiter = RouteLimiter(limit=1, wait_seconds=1)
+        acquire = asyncio.ensure_future(limiter.semaphore.acquire())
+        await acquire
+        # The timeout fired after the permit was granted but before it was used
+        limiter._abandon(acquire)
+        await asyncio.sleep(0)
+        assert limiter.semaphore._value == 1
+
+    asyncio.run(main())
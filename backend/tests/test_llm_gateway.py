@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+from services.llm_gateway import LLMGateway
+
+
+def api_error(cls, status, retry_after=None):
+    """An SDK status error without depending on the SDK's HTTP client classes."""
+    error = cls.__new__(cls)
+    Exception.__init__(error, f"HTTP {status}")
+    error.status_code = status
+    error.response = SimpleNamespace(status_code=status, headers={"retry-after": retry_after} if retry_after else {})
+    return error
+
+
+class FakeCompletions:
+    """Raises the queued outcomes in turn (sleeping on a number), then answers 'ok'."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def create(self, model, messages, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else None
+        if isinstance(outcome, (int, float)):
+            await asyncio.sleep(outcome)
+        elif outcome is not None:
+            raise outcome
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=None)
+
+
+def make_gateway(*outcomes, **options):
+    completions = FakeCompletions(*outcomes)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    options = {"max_retries": 2, "retry_base_seconds": 0.001, "timeout_seconds": 1, **options}
+    return LLMGateway(client=client, **options), completions
+
+
+def ask(gateway):
+    return asyncio.run(gateway.chat("test", messages=[{"role": "user", "content": "hi"}]))
+
+
+@pytest.mark.parametrize("error", [
+    api_error(openai.RateLimitError, 429, retry_after="0"),
+    api_error(openai.InternalServerError, 503),
+])
+def test_retriable_errors_are_retried(error):
+    gateway, completions = make_gateway(error)
+    assert ask(gateway).choices[0].message.content == "ok"
+    stats = gateway.stats()
+    assert (completions.calls, stats["retries"], stats["failures"], stats["inFlight"]) == (2, 1, 0, 0)
+
+
+def test_client_errors_are_not_retried():
+    gateway, completions = make_gateway(api_error(openai.BadRequestError, 400))
+    with pytest.raises(openai.BadRequestError):
+        ask(gateway)
+    stats = gateway.stats()
+    assert (completions.calls, stats["retries"], stats["failures"], stats["inFlight"]) == (1, 0, 1, 0)
+
+
+def test_timeouts_are_retried_then_raised():
+    gateway, completions = make_gateway(5, 5, 5, timeout_seconds=0.05, max_retries=1)
+    with pytest.raises(asyncio.TimeoutError):
+        ask(gateway)
+    stats = gateway.stats()
+    assert (completions.calls, stats["retries"], stats["failures"], stats["inFlight"]) == (2, 1, 1, 0)
+
+
+def test_timed_out_attempt_is_followed_by_a_successful_retry():
+    gateway, completions = make_gateway(5, timeout_seconds=0.05)
+    assert ask(gateway).choices[0].message.content == "ok"
+    assert completions.calls == 2
+
+
+def test_backoff_honours_retry_after_up_to_the_cap():
+    gateway, _ = make_gateway(retry_max_seconds=8)
+    assert gateway._backoff(0, api_error(openai.RateLimitError, 429, retry_after="3")) == 3
+    assert gateway._backoff(0, api_error(openai.RateLimitError, 429, retry_after="120")) == 8
+    assert 0 <= gateway._backoff(10, api_error(openai.InternalServerError, 500)) <= 8
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from routers import monitoring
+
+
+def make_client():
+    router = APIRouter()
+
+    @router.get("/jobs/stats", dependencies=[Depends(monitoring.require_metrics_token)])
+    def stats():
+        return {}
+
+    @router.get("/jobs/{job_id}")
+    def job(job_id: str, request: Request):
+        return {"route": monitoring.route_template(request.scope)}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    return TestClient(app)
+
+
+def test_route_template_keeps_the_router_prefix():
+    assert make_client().get("/api/jobs/abc").json() == {"route": "/api/jobs/{job_id}"}
+
+
+def test_stats_require_the_token(monkeypatch):
+    client = make_client()
+    monkeypatch.setattr(monitoring, "METRICS_PUBLIC", False)
+    monkeypatch.setattr(monitoring, "METRICS_TOKEN", None)
+    assert client.get("/api/jobs/stats").status_code == 401
+
+    monkeypatch.setattr(monitoring, "METRICS_TOKEN", "s3cret")
+    assert client.get("/api/jobs/stats", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/api/jobs/stats", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+    monkeypatch.setattr(monitoring, "METRICS_TOKEN", None)
+    monkeypatch.setattr(monitoring, "METRICS_PUBLIC", True)
+    assert client.get("/api/jobs/stats").status_code == 200
@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+
+import pandas as pd
+from services.ai_service import AIService
+from services.llm_gateway import LLMGateway
+
+PLAN = "```python\ndef analyze_data(df):\n    return df['Qty'].sum()\n```"
+
+
+class FakeCompletions:
+    """Answers planning prompts with `plan` and everything else with 'ok'."""
+
+    def __init__(self, plan: str = PLAN):
+        self.plan = plan
+        self.plans = 0
+        self.calls = 0
+
+    async def create(self, model, messages, **kwargs):
+        self.calls += 1
+        content = messages[-1]["content"]
+        if "Determine if you need to run Python code" in content:
+            self.plans += 1
+            content = self.plan
+        else:
+            content = "ok"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+def make_service(plan: str = PLAN):
+    completions = FakeCompletions(plan)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return AIService(gateway=LLMGateway(client=client)), completions
+
+
+def test_plan_key_ignores_exact_dtypes():
+    service, _ = make_service()
+    small = pd.DataFrame({
+        "Qty": pd.array([1, 2], dtype="int8"),
+        "Price": pd.array([1.5, 2.5], dtype="float32"),
+        "Region": pd.Categorical(["north", "south"]),
+    })
+    large = pd.DataFrame({
+        "Qty": [1000, 200000],
+        "Price": [1.5, None],
+        "Region": ["north", "south"],
+    })
+    assert service._plan_key(small, "Total qty?") == service._plan_key(large, "total   QTY")
+
+
+def test_plan_key_changes_with_column_kind():
+    service, _ = make_service()
+    numeric = pd.DataFrame({"Qty": [1, 2]})
+    text = pd.DataFrame({"Qty": ["one", "two"]})
+    assert service._plan_key(numeric, "total qty") != service._plan_key(text, "total qty")
+
+
+def test_uploads_with_different_value_ranges_share_one_plan():
+    service, completions = make_service()
+    monday = pd.DataFrame({"Qty": pd.array([1, 2, 3], dtype="int8"), "Region": pd.Categorical(["a", "b", "a"])})
+    tuesday = pd.DataFrame({"Qty": [1000, 20000, 300000], "Region": ["a", "b", "c"]})
+
+    async def ask():
+        for df in (monday, tuesday):
+            await service.generate_response("summary", "What is the total Qty?", df=df)
+
+    asyncio.run(ask())
+    assert completions.plans == 1
+
+
+def test_answers_from_failed_code_are_not_cached():
+    failing = "```python\ndef analyze_data(df):\n    return df['Missing'].sum()\n```"
+    service, completions = make_service(failing)
+    df = pd.DataFrame({"Qty": [1, 2, 3]})
+
+    async def ask():
+        for _ in range(2):
+            await service.generate_response("summary", "What is the total Qty?", df=df, dataset_id="d1")
+
+    asyncio.run(ask())
+    # Both questions went upstream: plan + synthesis each time
+    assert completions.plans == 2
+    assert service.response_cache.stats()["entries"] == 0
+
+
+def test_successful_answers_are_cached():
+    service, completions = make_service()
+    df = pd.DataFrame({"Qty": [1, 2, 3]})
+
+    async def ask():
+        return [await service.generate_response("summary", "What is the total Qty?", df=df, dataset_id="d1") for _ in range(2)]
+
+    assert asyncio.run(ask()) == ["ok", "ok"]
+    assert completions.calls == 2  # One plan and one synthesis, then the cache
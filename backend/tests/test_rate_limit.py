@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers.rate_limit import RateLimitMiddleware, client_address
+from services import rate_limiter
+from services.rate_limiter import SharedTokenBucketStore, TokenBucketStore
+
+needs_flock = pytest.mark.skipif(rate_limiter.fcntl is None, reason="needs flock")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+@needs_flock
+def test_shared_buckets_refill_and_are_seen_by_every_worker(tmp_path, clock):
+    path = str(tmp_path / "buckets.bin")
+    worker_a, worker_b = SharedTokenBucketStore(path, slots=64), SharedTokenBucketStore(path, slots=64)
+    take = dict(rate=0.5, capacity=3)
+    assert [worker_a.take("chat:1.2.3.4", **take)[0] for _ in range(2)] == [True, True]
+    assert worker_b.take("chat:1.2.3.4", **take) == (True, 0.0)
+    assert worker_a.take("chat:1.2.3.4", **take) == (False, 2.0)
+    # Other clients have their own bucket
+    assert worker_b.take("chat:5.6.7.8", **take) == (True, 0.0)
+
+    clock.now += 2
+    assert worker_b.take("chat:1.2.3.4", **take) == (True, 0.0)
+    assert worker_a.take("chat:1.2.3.4", **take)[0] is False
+
+
+@needs_flock
+def test_full_table_reuses_the_stalest_slot(tmp_path, clock):
+    store = SharedTokenBucketStore(str(tmp_path / "buckets.bin"), slots=1)
+    assert store.take("old", rate=0.01, capacity=1) == (True, 0.0)
+    assert store.take("old", rate=0.01, capacity=1)[0] is False
+    clock.now += 1
+    # The new client takes over the only slot and starts from a full bucket
+    assert store.take("new", rate=0.01, capacity=1) == (True, 0.0)
+    assert store.take("old", rate=0.01, capacity=1) == (True, 0.0)
+
+
+@pytest.mark.parametrize("forwarded, trusted, expected", [
+    (None, 0, "10.0.0.1"),
+    ("1.1.1.1", 0, "10.0.0.1"),  # Untrusted header is ignored
+    ("1.1.1.1", 1, "1.1.1.1"),
+    ("6.6.6.6, 1.1.1.1", 1, "1.1.1.1"),  # Spoofed entries before the proxy's own
+    ("6.6.6.6, 1.1.1.1, 172.16.0.2", 2, "1.1.1.1"),
+    (" 1.1.1.1 ,, ", 1, "1.1.1.1"),
+    ("1.1.1.1", 2, "10.0.0.1"),  # Fewer hops than trusted proxies
+])
+def test_client_address_trusts_only_configured_proxies(forwarded, trusted, expected):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded is not None else []
+    scope = {"type": "http", "client": ("10.0.0.1", 5000), "headers": headers}
+    assert client_address(scope, trusted) == expected
+
+
+def test_limited_requests_get_429_with_retry_after():
+    app = FastAPI()
+
+    @app.post("/api/chat")
+    def chat():
+        return {"ok": True}
+
+    @app.get("/api/health")
+    def health():
+        return {"ok": True}
+
+    rules = {("POST", "/api/chat"): ("chat", 2)}
+    client = TestClient(RateLimitMiddleware(app, TokenBucketStore(), rules=rules, trusted_proxies=1))
+    first = {"X-Forwarded-For": "1.1.1.1"}
+    assert [client.post("/api/chat", headers=first).status_code for _ in range(2)] == [200, 200]
+    limited = client.post("/api/chat", headers=first)
+    assert limited.status_code == 429
+    # One token refills in 60 / 2 seconds
+    assert 29 <= int(limited.headers["Retry-After"]) <= 30
+    assert client.get("/api/health", headers=first).status_code == 200
+    assert client.post("/api/chat", headers={"X-Forwarded-For": "2.2.2.2"}).status_code == 200
@@ -0,0 +1,42 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from services.dataset_cache import DatasetDiskCache
+from services.sandbox import SandboxPool, run_analysis_code
+
+PRINTING_CODE = """
+import time
+def analyze_data(df):
+    for _ in range(20):
+        print(df['name'].iloc[0])
+        time.sleep(0.001)
+    return len(df)
+"""
+
+
+def test_concurrent_in_process_runs_keep_their_own_output():
+    frames = [pd.DataFrame({"name": [f"run{i}"]}) for i in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        outputs = list(pool.map(lambda df: run_analysis_code(PRINTING_CODE, df), frames))
+    for i, output in enumerate(outputs):
+        printed = output.split("Output: ", 1)[1].split()
+        assert printed == [f"run{i}"] * 20
+
+
+def test_worker_allocation_past_the_limit_fails_fast():
+    pool = SandboxPool(
+        size=1,
+        timeout_seconds=30,
+        memory_limit_bytes=256 * 1024 * 1024,
+        max_jobs_per_worker=10,
+        dataset_cache=DatasetDiskCache(tempfile.mkdtemp(), retention_seconds=60)
+    )
+    try:
+        output = pool.run("import numpy as np\nresult = np.ones(1024 ** 3).sum()", pd.DataFrame({"a": [1]}))
+        assert output.startswith("Error executing code")
+        assert "MemoryError" in output or "memory limit" in output
+        # The worker is still usable afterwards
+        assert pool.run("result = int(df['a'].sum())", pd.DataFrame({"a": [1, 2]})).startswith("Analysis Result: 3")
+    finally:
+        pool.shutdown()
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from services.cache import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["answer"] * 5
+    assert calls == 1
+    assert flights.stats() == {"inFlight": 0, "leaders": 1, "coalesced": 4}
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "answer"
+
+    async def main():
+        leader = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0)
+
+        leader.cancel()  # e.g. the first client disconnected
+        await asyncio.sleep(0)
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(main()) == "answer"
+    assert flights.stats()["inFlight"] == 0
+
+
+def test_work_is_cancelled_once_nobody_waits():
+    flights = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def main():
+        callers = [asyncio.create_task(flights.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    asyncio.run(main())
+    assert flights.stats()["inFlight"] == 0
+
+
+def test_failure_reaches_every_caller():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
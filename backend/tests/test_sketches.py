@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.sketches import AdaptiveDistinct, HyperLogLog, KLLSketch
+
+# Stated bounds: HLL relative standard error 1.04 / sqrt(2^14) (0.81%), checked
+# at four standard errors; KLL normalized rank error 1.65% at k=200
+HLL_TOLERANCE = 4 * 1.04 / np.sqrt(1 << 14)
+KLL_RANK_ERROR = 0.0165
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def hashes(values):
+    return pd.util.hash_array(np.asarray(values))
+
+
+def rank_errors(sketch, values):
+    ordered = np.sort(values)
+    estimates = sketch.quantiles(QUANTILES)
+    return [abs(np.searchsorted(ordered, v, side="right") / len(ordered) - q) for q, v in zip(QUANTILES, estimates)]
+
+
+@pytest.mark.parametrize("cardinality", [100, 10_000, 200_000])
+def test_hyperloglog_estimates_known_cardinalities(cardinality):
+    sketch = HyperLogLog()
+    values = np.arange(cardinality)
+    # Repeats must not count twice
+    sketch.update(hashes(values))
+    sketch.update(hashes(values[: cardinality // 2]))
+    assert abs(sketch.estimate() - cardinality) <= HLL_TOLERANCE * cardinality
+
+
+def test_hyperloglog_merge_equals_one_sketch_over_both_inputs():
+    left, right, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    a, b = np.arange(0, 60_000), np.arange(40_000, 150_000)
+    left.update(hashes(a))
+    right.update(hashes(b))
+    both.update(hashes(np.concatenate([a, b])))
+    merged = left.merge(right)
+    assert np.array_equal(merged.registers, both.registers)
+    assert merged.estimate() == both.estimate()
+
+
+def test_hyperloglog_rejects_mismatched_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(14))
+
+
+def test_adaptive_distinct_is_exact_up_to_its_limit():
+    counter = AdaptiveDistinct(limit=1000)
+    counter.update(hashes(np.arange(1000)))
+    assert (counter.estimate(), counter.approximate) == (1000, False)
+
+    other = AdaptiveDistinct(limit=1000)
+    other.update(hashes(np.arange(1000, 1500)))
+    counter.merge(other)
+    assert counter.approximate
+    assert abs(counter.estimate() - 1500) <= HLL_TOLERANCE * 1500
+
+
+def test_kll_quantiles_stay_within_the_rank_error():
+    values = np.random.default_rng(1).lognormal(size=100_000)
+    sketch = KLLSketch(seed=1)
+    for chunk in np.array_split(values, 37):
+        sketch.update(chunk)
+    assert max(rank_errors(sketch, values)) <= KLL_RANK_ERROR
+    assert sum(len(items) for items in sketch.levels) < 2_000
+
+
+def test_kll_merge_matches_one_sketch_over_both_inputs():
+    rng = np.random.default_rng(2)
+    a, b = rng.normal(size=60_000), rng.normal(loc=3, size=40_000)
+    left, right, both = KLLSketch(seed=3), KLLSketch(seed=4), KLLSketch(seed=5)
+    left.update(a)
+    right.update(b)
+    both.update(np.concatenate([a, b]))
+    merged = left.merge(right)
+
+    def weight(sketch):
+        return sum(len(items) * 2 ** level for level, items in enumerate(sketch.levels))
+
+    # Compaction keeps total weight exact, so both describe all 100k values
+    assert weight(merged) == weight(both) == 100_000
+    values = np.concatenate([a, b])
+    assert max(rank_errors(merged, values)) <= KLL_RANK_ERROR
+    assert max(rank_errors(both, values)) <= KLL_RANK_ERROR
+
+
+def test_kll_empty_sketch_has_no_quantiles():
+    assert KLLSketch().quantiles([0.5]) == [None]
@@ -0,0 +1,78 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from services.data_service import DataService
+from services.profiling_executor import ProfilingExecutor
+from services.sketches import AdaptiveDistinct
+from services.stats_engine import SummaryAccumulator
+
+
+def column(summary, name):
+    return next(c for c in summary["columns"] if c["name"] == name)
+
+
+def test_distinct_counts_are_exact_below_the_limit():
+    df = pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=2000).astype(str).tolist() * 3,
+        "id": np.arange(6000),
+    })
+    summary = DataService.get_summary(df)
+    assert column(summary, "date")["unique"] == 2000
+    assert column(summary, "id")["unique"] == 6000
+    assert not column(summary, "id")["uniqueApproximate"]
+
+
+def test_distinct_counter_switches_to_the_sketch_past_the_limit():
+    counter = AdaptiveDistinct(limit=1000)
+    counter.update(pd.util.hash_array(np.arange(800)))
+    assert not counter.approximate and counter.estimate() == 800
+    counter.update(pd.util.hash_array(np.arange(800, 5000)))
+    assert counter.approximate
+    assert abs(counter.estimate() - 5000) / 5000 < 0.05
+
+
+def sample_frame(rows=5000):
+    rng = np.random.default_rng(7)
+    values = rng.normal(50, 12, rows)
+    values[rng.random(rows) < 0.1] = np.nan
+    return pd.DataFrame({
+        "value": values,
+        "qty": rng.integers(-20, 400, rows),
+        "city": rng.choice(["Oslo", "Lima", "Pune", None], rows),
+    })
+
+
+def assert_same_summary(actual, expected):
+    assert actual["rowCount"] == expected["rowCount"]
+    assert [c["name"] for c in actual["columns"]] == [c["name"] for c in expected["columns"]]
+    for want in expected["columns"]:
+        got = column(actual, want["name"])
+        assert (got["missing"], got["count"], got["unique"]) == (want["missing"], want["count"], want["unique"])
+        for stat in ("min", "max", "mean", "std"):
+            if "stats" in want:
+                assert got["stats"][stat] == pytest.approx(want["stats"][stat], rel=1e-9)
+
+
+def test_merged_chunk_summaries_match_the_whole_frame():
+    df = sample_frame()
+    merged = SummaryAccumulator()
+    for start in range(0, len(df), 700):
+        merged.merge(SummaryAccumulator().update(df.iloc[start:start + 700]))
+    assert_same_summary(merged.result(), DataService.get_summary(df))
+
+
+def test_streamed_csv_summary_matches_the_whole_frame():
+    df = sample_frame()
+    source = df.to_csv(index=False).encode()
+    streamed = DataService.summarize_chunks(DataService.iter_chunks(source, "data.csv", chunksize=600))
+    assert_same_summary(streamed, DataService.get_summary(DataService.read_file(source, "data.csv")))
+
+
+def test_joined_column_shards_match_the_whole_frame():
+    df = sample_frame()
+    executor = ProfilingExecutor(workers=2)
+    summary = asyncio.run(executor.get_summary(df))
+    executor.shutdown()
+    assert_same_summary(summary, DataService.get_summary(df))
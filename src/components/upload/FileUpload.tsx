@@ -8,16 +8,21 @@ import { Button } from '../ui/Button';
 interface FileUploadProps {
     onFileSelect: (file: File) => void;
     isProcessing: boolean;
+    // 0-1 while a background upload job runs
+    progress?: number | null;
     acceptedFileTypes?: Record<string, string[]>;
 }
 
 export function FileUpload({
     onFileSelect,
     isProcessing,
+    progress = null,
     acceptedFileTypes = {
         'text/csv': ['.csv'],
         'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ['.xlsx'],
-        'application/vnd.ms-excel': ['.xls']
+        'application/vnd.ms-excel': ['.xls'],
+        'application/gzip': ['.gz'],
+        'application/zstd': ['.zst']
     }
 }: FileUploadProps) {
     const [dragError, setDragError] = useState<string | null>(null);
@@ -71,10 +76,12 @@ export function FileUpload({
 
                     <div className="space-y-1">
                         <p className="text-lg font-medium text-slate-700">
-                            {isDragActive ? 'Drop your file here' : 'Click to upload or drag and drop'}
+                            {isProcessing
+                                ? `Processing${progress !== null ? ` (${Math.round(progress * 100)}%)` : ''}...`
+                                : isDragActive ? 'Drop your file here' : 'Click to upload or drag and drop'}
                         </p>
                         <p className="text-sm text-slate-500">
-                            Excel (.xlsx, .xls) or CSV files up to 5,000 rows
+                            Excel (.xlsx, .xls) or CSV files (also .csv.gz, .csv.zst) up to 5,000 rows
                         </p>
                     </div>
 
@@ -9,6 +9,18 @@ const api = axios.create({
     },
 });
 
+// The backend keeps each upload under the session ID it hands back
+const SESSION_STORAGE_KEY = 'deanalyse_session_id';
+const DATASET_STORAGE_KEY = 'deanalyse_dataset_id';
+
+api.interceptors.request.use((config) => {
+    const sessionId = sessionStorage.getItem(SESSION_STORAGE_KEY);
+    if (sessionId) {
+        config.headers.set('X-Session-ID', sessionId);
+    }
+    return config;
+});
+
 export interface BackendSummary {
     rowCount: number;
     columnCount: number;
@@ -17,18 +29,34 @@ export interface BackendSummary {
         type: string;
         missing: number;
         unique: number;
+        // True when `unique` is a sketch estimate (very high-cardinality columns)
+        uniqueApproximate?: boolean;
+        count?: number;
         stats?: {
             min?: number;
             max?: number;
             mean?: number;
+            std?: number;
+            p50?: number;
+            p95?: number;
+            p99?: number;
         };
     }[];
     preview: Record<string, unknown>[];
+    statsMode?: 'approximate' | 'exact';
+    memory?: {
+        beforeBytes: number;
+        afterBytes: number;
+        savedPercent: number;
+    };
     anomalies?: {
         column: string;
         count: number;
         examples: unknown[];
         reason: string;
+        method?: 'zscore' | 'mad' | 'iqr' | 'rolling';
+        severity?: number;
+        rows?: { row: number; value: unknown; severity: number }[];
     }[];
     ai_kpis?: {
         title: string;
@@ -37,17 +65,75 @@ export interface BackendSummary {
     }[];
 }
 
-export const uploadFile = async (file: File): Promise<BackendSummary> => {
+export interface JobStage {
+    name: 'parse' | 'profile' | 'anomalies' | 'kpis';
+    status: 'pending' | 'running' | 'done' | 'cached' | 'failed';
+    durationMs: number | null;
+}
+
+export interface UploadJob {
+    job_id: string;
+    status: 'queued' | 'running' | 'done' | 'failed';
+    progress: number;
+    stages: JobStage[];
+    error: string | null;
+    result: {
+        dataset_id?: string;
+        summary?: BackendSummary;
+        anomalies?: BackendSummary['anomalies'];
+        cache?: 'hit' | 'miss';
+    };
+}
+
+// `sheet` picks an Excel sheet by name ('*' stacks sheets that share columns)
+export const startUploadJob = async (file: File, sheet?: string): Promise<string> => {
     const formData = new FormData();
     formData.append('file', file);
+    if (sheet) {
+        formData.append('sheet', sheet);
+    }
 
-    const response = await api.post('/upload', formData, {
+    const response = await api.post('/jobs', formData, {
         headers: {
             'Content-Type': 'multipart/form-data',
         },
     });
 
-    return response.data.summary;
+    if (response.data.session_id) {
+        sessionStorage.setItem(SESSION_STORAGE_KEY, response.data.session_id);
+    }
+    return response.data.job_id;
+};
+
+export const fetchJob = async (jobId: string): Promise<UploadJob> => {
+    const response = await api.get(`/jobs/${jobId}`);
+    if (response.data.result?.dataset_id) {
+        sessionStorage.setItem(DATASET_STORAGE_KEY, response.data.result.dataset_id);
+    }
+    return response.data;
+};
+
+const JOB_POLL_INTERVAL_MS = 500;
+
+// Uploads as a background job and polls it until the full summary is ready;
+// `onProgress` receives each poll (0-1 progress plus per-stage status)
+export const uploadFileInBackground = async (
+    file: File,
+    onProgress?: (job: UploadJob) => void,
+    sheet?: string
+): Promise<BackendSummary> => {
+    const jobId = await startUploadJob(file, sheet);
+    for (;;) {
+        const job = await fetchJob(jobId);
+        onProgress?.(job);
+        if (job.status === 'done' && job.result.summary) {
+            return job.result.summary;
+        }
+        if (job.status === 'failed' || job.status === 'done') {
+            throw new Error(job.error || 'Failed to process file with backend.');
+        }
+        await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
 };
 
 export const sendChatQuery = async (query: string): Promise<string> => {
@@ -55,4 +141,84 @@ export const sendChatQuery = async (query: string): Promise<string> => {
     return response.data.response;
 };
 
+// The dataset of the latest upload in this tab; the dataset routes need one
+const currentDatasetId = (): string => {
+    const datasetId = sessionStorage.getItem(DATASET_STORAGE_KEY);
+    if (!datasetId) {
+        throw new Error('No dataset loaded. Please upload a file first.');
+    }
+    return datasetId;
+};
+
+export interface AggregateQuery {
+    kind: 'groupby' | 'topn' | 'timeseries' | 'histogram';
+    column: string;
+    value?: string;
+    agg?: 'sum' | 'mean' | 'median' | 'min' | 'max' | 'count';
+    interval?: 'hour' | 'day' | 'week' | 'month' | 'quarter' | 'year';
+    limit?: number;
+    bins?: number;
+}
+
+export interface AggregateResult {
+    series?: { key: string | number | null; value: number | null }[];
+    bins?: { start: number; end: number; count: number }[];
+    groups?: number;
+    buckets?: number;
+    truncated?: boolean;
+    other?: number;
+    count?: number;
+    query: AggregateQuery;
+}
+
+// Server-side aggregate of the current upload, already binned for charting
+export const fetchAggregate = async (query: AggregateQuery): Promise<AggregateResult> => {
+    const datasetId = currentDatasetId();
+    const response = await api.post(`/datasets/${datasetId}/aggregate`, query);
+    return response.data;
+};
+
+export interface RowsQuery {
+    columns?: string[];
+    sort?: string;
+    descending?: boolean;
+    filters?: {
+        column: string;
+        op: 'eq' | 'ne' | 'gt' | 'gte' | 'lt' | 'lte' | 'in' | 'contains' | 'isnull' | 'notnull';
+        value?: unknown;
+    }[];
+    offset?: number;
+    cursor?: string;
+    limit?: number;
+}
+
+export interface RowsPage {
+    columns: string[];
+    rows: unknown[][];
+    offset: number;
+    total: number;
+    rowCount: number;
+    nextOffset: number | null;
+    nextCursor: string | null;
+}
+
+// One page of the current upload's rows, filtered and sorted server-side
+export const fetchRows = async (query: RowsQuery): Promise<RowsPage> => {
+    const datasetId = currentDatasetId();
+    const response = await api.post(`/datasets/${datasetId}/rows`, query);
+    return response.data;
+};
+
+export interface SessionTable {
+    name: string;
+    dataset_id: string;
+    current: boolean;
+}
+
+// Uploads in this session by SQL table name (joinable when SQL analysis is enabled)
+export const fetchSessionTables = async (): Promise<SessionTable[]> => {
+    const response = await api.get('/datasets/tables');
+    return response.data.tables;
+};
+
 export default api;
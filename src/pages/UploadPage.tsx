@@ -4,7 +4,7 @@ import { FileUpload } from '../components/upload/FileUpload';
 import { FilePreview } from '../components/upload/FilePreview';
 import { DataTable } from '../components/data/DataTable';
 import { Alert } from '../components/ui/Alert';
-import { uploadFile, type BackendSummary } from '../lib/api';
+import { uploadFileInBackground, type BackendSummary } from '../lib/api';
 // Keeping DataSet type for compatibility for now, or we can adapt
 // Actually, let's look at how DataSet is used in DataTable/FilePreview.
 // It expects: { fileName, headers, rows, rowCount }
@@ -30,15 +30,17 @@ export function UploadPage() {
     const navigate = useNavigate();
     const [dataSet, setDataSet] = useState<DataSet | null>(null);
     const [isProcessing, setIsProcessing] = useState(false);
+    const [progress, setProgress] = useState<number | null>(null);
     const [error, setError] = useState<string | null>(null);
 
     const handleFileSelect = async (file: File) => {
         setIsProcessing(true);
+        setProgress(null);
         setError(null);
 
         try {
-            // Use Backend API
-            const summary = await uploadFile(file);
+            // Use Backend API (background job, polled for progress)
+            const summary = await uploadFileInBackground(file, (job) => setProgress(job.progress));
 
             // Map to Frontend Structure
             const data = mapBackendToDataSet(file.name, summary);
@@ -57,6 +59,7 @@ export function UploadPage() {
             // but let's strictly test backend integration.
         } finally {
             setIsProcessing(false);
+            setProgress(null);
         }
     };
 
@@ -75,7 +78,7 @@ export function UploadPage() {
                 </p>
             </div>
 
-            <FileUpload onFileSelect={handleFileSelect} isProcessing={isProcessing} />
+            <FileUpload onFileSelect={handleFileSelect} isProcessing={isProcessing} progress={progress} />
 
             {error && (
                 <Alert variant="error" title="Processing Error">